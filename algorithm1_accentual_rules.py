@@ -25,13 +25,12 @@ Result:
 '''
 
 import re
-import csv
-import unicodedata
 
-from utils import Colors, DICHRONA, only_bases, all_vowels
+from utils import Colors
 from erics_syllabifier import patterns
-from prepare_tokens.filter_dichrona import ultima, properispomenon, proparoxytone
-from collate_macrons import collate_macrons
+from macron_table import MacronTable
+from macron_rules import Rule, last_vowel, apply_rule, apply_rules
+from word_analysis import analyze, real_dichrona_positions
 
 
 ### AUXILIARY FUNCTIONS ###
@@ -64,21 +63,7 @@ def word_with_real_dichrona(s):
     Determines if a given string contains at least one character from the DICHRONA set 
     that does not form a diphthong with its neighboring character and does not have an adscriptum.
     """
-    for i, char in enumerate(s):
-        if char in DICHRONA:
-
-            # Form pairs to check for diphthongs and adscriptum
-            prev_pair = s[i-1:i+1] if i > 0 else ''
-            next_pair = s[i:i+2] if i < len(s) - 1 else ''
-
-            # Check if the character is part of a diphthong or has adscriptum
-            if (prev_pair and (is_diphthong(prev_pair) or has_iota_adscriptum(prev_pair))) or \
-               (next_pair and (is_diphthong(next_pair) or has_iota_adscriptum(next_pair))):
-                continue  # Skip if any of these conditions are true
-
-            return True
-
-    return False
+    return bool(real_dichrona_positions(s))
 
 
 def properispomenon_with_dichronon_in_ultima(word):
@@ -88,15 +73,8 @@ def properispomenon_with_dichronon_in_ultima(word):
     - The ultima is recognized by `word_with_real_dichrona`.
     """
 
-    if not properispomenon(word):
-        return False
-    
-    ultima_str = ultima(word)
-
-    if not word_with_real_dichrona(ultima_str):
-        return False
-
-    return True
+    wa = analyze(word)
+    return wa.properispomenon and wa.ultima_real_dichrona
 
 
 def proparoxytone_with_dichronon_in_ultima(string):
@@ -106,15 +84,8 @@ def proparoxytone_with_dichronon_in_ultima(string):
     - The ultima of the string is recognized by `word_with_real_dichrona`.
     """
 
-    if not proparoxytone(string):
-        return False
-    
-    ultima_str = ultima(string)
-
-    if not word_with_real_dichrona(ultima_str):
-        return False
-
-    return True
+    wa = analyze(string)
+    return wa.proparoxytone and wa.ultima_real_dichrona
 
 
 ### MAIN FUNCTIONS ###
@@ -127,13 +98,20 @@ def ordinal_last_vowel(word):
     >>> ordinal_last_vowel('ἄγαν')
     >>> 3
     """
-    base_word = only_bases(word)
-    ordinal = len(base_word)
-    for char in reversed(word):  # Iterate through the word backwards
-        if re.search(all_vowels, char):
-            return ordinal
-        ordinal -= 1
-    return None  # In case there are no vowels
+    return analyze(word).last_vowel_ordinal
+
+
+def free_breve_ultima(analysis):
+    '''
+    The condition of breve_ultima: properispomenon_with_dichronon_in_ultima or proparoxytone_with_dichronon_in_ultima.
+    '''
+    return (analysis.properispomenon or analysis.proparoxytone) and analysis.ultima_real_dichrona
+
+
+# see macron_rules.py
+BREVE_ULTIMA_RULES = [
+    Rule('breve_ultima', source='breve_ultima', length='^', position=last_vowel, condition=free_breve_ultima),
+]
 
 
 def breve_ultima(word):
@@ -146,50 +124,24 @@ def breve_ultima(word):
     >>> breve_ultima('ἄγαν')
     >>> None
     '''
-    if word:
-        if properispomenon_with_dichronon_in_ultima(word) or proparoxytone_with_dichronon_in_ultima(word):
-            breve = f"^{ordinal_last_vowel(word)}"
-            return breve
-    return None
+    return apply_rule(BREVE_ULTIMA_RULES[0], word)
+
+
+def brevize_ultimae(table):
+    '''
+    Applies breve_ultima to the rows of a MacronTable in place;
+    used by brevize_ultimae_in_tsv. macronize_pipeline.py applies it together with the rules of algorithms 2 and 3.
+    Rows with fewer than four columns are dropped and all rows are given at least five columns.
+    Returns the number of rows whose source was updated.
+    '''
+    return apply_rules(table, BREVE_ULTIMA_RULES)['breve_ultima']
 
 
 def brevize_ultimae_in_tsv(input_tsv, output_tsv):
-    updated_source_count = 0
-    first_line = True  # Flag to identify the header
-
-    with open(input_tsv, mode='r', encoding='utf-8', newline='') as infile, \
-         open(output_tsv, mode='w', encoding='utf-8', newline='') as outfile:
-        reader = csv.reader(infile, delimiter='\t')
-        writer = csv.writer(outfile, delimiter='\t')
-
-        for row in reader:
-            if first_line:
-                # Write the header unchanged
-                writer.writerow(row)
-                first_line = False
-                continue
-
-            if row and len(row) >= 4:
-                token_in, tag_in, lemma_in, macron_in = row[:4]
-                source_in = row[4] if len(row) > 4 else ''
-
-                normalized_token = unicodedata.normalize('NFC', token_in)
-                new_macron = breve_ultima(normalized_token)
-                
-                if new_macron:
-                    macron_out = collate_macrons(macron_in, new_macron)
-                    # Check if the collated macron differs from the input
-                    if macron_out != macron_in:
-                        source_out = f"{source_in},breve_ultima" if source_in else "breve_ultima"
-                        updated_source_count += 1
-                    else:
-                        source_out = source_in
-                else:
-                    macron_out = macron_in
-                    source_out = source_in
-                
-                output_row = [token_in, tag_in, lemma_in, macron_out, source_out]
-                writer.writerow(output_row)
+    table = MacronTable.read_tsv(input_tsv)
+    updated_source_count = brevize_ultimae(table)
+
+    table.write_tsv(output_tsv)
 
     print(f"{Colors.GREEN}Total sources updated due to breve ultima: {updated_source_count}{Colors.ENDC}")
 
@@ -47,13 +47,11 @@ Total forms updated by short_dat: 82
 
 '''
 
-import re
-import csv
-import unicodedata
-
-from utils import Colors, DICHRONA, only_bases, all_vowels
-from algorithm1_accentual_rules import is_diphthong, has_iota_adscriptum, ordinal_last_vowel
-from collate_macrons import collate_macrons
+from utils import Colors
+from algorithm1_accentual_rules import is_diphthong, has_iota_adscriptum
+from macron_table import MacronTable
+from macron_rules import Rule, last_vowel, last_vowel_of_bases, apply_rule, apply_rules
+from pos_tags import tag_mask
 
 
 ### ALGORITHMS RE NOMINAL FORMS
@@ -61,125 +59,87 @@ from collate_macrons import collate_macrons
 # short_masc_neut_alpha(token, tag)
 # short_dat(token, tag)
 
-def long_fem_alpha(token, tag, lemma):
-    tag_pattern_acc = re.compile(r'^[na].p...fa.$')
-    tag_pattern_gen = re.compile(r'^[na].s...fg.$')
-    
-    base_token = only_bases(token)
-    base_lemma = only_bases(lemma)
-    endings = ('η', 'α', 'ος') # 'ος' is to allow fem adj of 2D
-    
-    if base_token.endswith('ας') and (tag_pattern_acc.match(tag) or tag_pattern_gen.match(tag)) and base_lemma.endswith(endings):
-        macron = f"_{ordinal_last_vowel(token)}"
-        return macron
-    
-    return None
-
-print(long_fem_alpha('ὁπλίτας', 'n-p---ma-', 'ὁπλίτης'))
-print(long_fem_alpha('οὐρείας', 'a-p---fa-', 'οὐρεῖος'))
-print(long_fem_alpha('παιδείας', 'n-s---fg-', 'παιδεία'))
-print(long_fem_alpha('παιδείας', 'n-p---fa-', 'παιδεία'))
+# the tags to which each rule can apply, as masks of pos_tags
+long_fem_alpha_tags = (
+    tag_mask(part_of_speech='na', number='p', gender='f', case='a'),  # ^[na].p...fa.$
+    tag_mask(part_of_speech='na', number='s', gender='f', case='g'),  # ^[na].s...fg.$
+)
+short_masc_neut_alpha_tags = tag_mask(part_of_speech='n', gender='mn')  # ^n.....[mn]..$
+short_dat_tags = tag_mask(part_of_speech='n', case='d')  # ^n......d.$
 
 
-def short_masc_neut_alpha(token, tag):
-    tag_pattern = re.compile(r'^n.....[mn]..$')
+def lone_final_iota(analysis):
+    '''
+    Whether the last ι of the token is neither part of a diphthong nor has an adscriptum,
+    so as to avoid brevizing the iota of e.g. ἁβροσύνηι.
+    '''
+    base_form = analysis.bases
+    last_iota_index = base_form.rfind('ι')
+    prev_pair = base_form[last_iota_index - 1: last_iota_index + 1] if last_iota_index > 0 else ''
+    next_pair = base_form[last_iota_index: last_iota_index + 2] if last_iota_index < len(base_form) - 1 else ''
 
-    base_form = only_bases(token)
+    return not (is_diphthong(prev_pair) or is_diphthong(next_pair) or has_iota_adscriptum(prev_pair) or has_iota_adscriptum(next_pair))
 
-    if base_form.endswith('α') and tag_pattern.match(tag):
-        last_vowel_position = ordinal_last_vowel(token)
-        breve = f"^{last_vowel_position}"
-        return breve
 
-    return None
+# see macron_rules.py; the endings are those of only_bases(token)
+NOMINAL_RULES = [
+    Rule('long_fem_alpha', source='nominal', length='_', position=last_vowel, tags=long_fem_alpha_tags,
+         endings=('ας',), lemma_endings=('η', 'α', 'ος')),  # 'ος' is to allow fem adj of 2D
+    Rule('short_masc_neut_alpha', source='nominal', length='^', position=last_vowel, tags=short_masc_neut_alpha_tags,
+         endings=('α',)),
+    Rule('short_dat', source='nominal', length='^', position=last_vowel_of_bases, tags=short_dat_tags,
+         endings=('ι',), condition=lone_final_iota),
+]
+long_fem_alpha_rule, short_masc_neut_alpha_rule, short_dat_rule = NOMINAL_RULES
 
-print(f"Short neut alpha: {short_masc_neut_alpha('ἀγάλματα', 'n-p---na-')}")
 
-def short_dat(token, tag):
+def long_fem_alpha(token, tag, lemma):
     '''
-    Avoiding brevizing the iota of e.g. ἁβροσύνηι
+    >>long_fem_alpha('ὁπλίτας', 'n-p---ma-', 'ὁπλίτης')
+    >>None
+    >>long_fem_alpha('οὐρείας', 'a-p---fa-', 'οὐρεῖος')
+    >>_6
+    >>long_fem_alpha('παιδείας', 'n-s---fg-', 'παιδεία')
+    >>_7
     '''
-    tag_pattern = re.compile(r'^n......d.$')
-    base_form = only_bases(token)
-
-    if base_form.endswith('ι') and tag_pattern.match(tag):
-        # Find the position of the last vowel
-        last_vowel_position = ordinal_last_vowel(base_form)
+    return apply_rule(long_fem_alpha_rule, token, tag, lemma)
 
-        # Check if the last 'ι' is part of a diphthong or has adscriptum
-        last_iota_index = base_form.rfind('ι')
-        prev_pair = base_form[last_iota_index - 1: last_iota_index + 1] if last_iota_index > 0 else ''
-        next_pair = base_form[last_iota_index: last_iota_index + 2] if last_iota_index < len(base_form) - 1 else ''
 
-        if not (is_diphthong(prev_pair) or is_diphthong(next_pair) or has_iota_adscriptum(prev_pair) or has_iota_adscriptum(next_pair)):
-            breve = f"^{last_vowel_position}"
-            return breve
+def short_masc_neut_alpha(token, tag):
+    '''
+    >>short_masc_neut_alpha('ἀγάλματα', 'n-p---na-')
+    >>^8
+    '''
+    return apply_rule(short_masc_neut_alpha_rule, token, tag)
 
-    return None
 
-print(f"Short dat iota: {short_dat('ἀγάλμασι', 'n-p---nd-')}")
+def short_dat(token, tag):
+    '''
+    Avoiding brevizing the iota of e.g. ἁβροσύνηι
+    >>short_dat('ἀγάλμασι', 'n-p---nd-')
+    >>^8
+    '''
+    return apply_rule(short_dat_rule, token, tag)
 
 
 ### MACRONIZE
 
 
+def macronize_nominal_forms(table):
+    '''
+    Applies long_fem_alpha, short_masc_neut_alpha and short_dat to the rows of a MacronTable in place;
+    used by macronize_nominal_forms_in_tsv. macronize_pipeline.py applies them together with the rules of algorithms 1 and 3.
+    Returns the number of forms updated by each function.
+    '''
+    hits = apply_rules(table, NOMINAL_RULES)
+    return hits['long_fem_alpha'], hits['short_masc_neut_alpha'], hits['short_dat']
+
+
 def macronize_nominal_forms_in_tsv(input_tsv, output_tsv):
-    # Counters for each macronizing function
-    long_fem_alpha_count = 0
-    short_masc_neut_alpha_count = 0
-    short_dat_count = 0
-
-    first_line = True  # Flag to identify the header
-
-    with open(input_tsv, mode='r', encoding='utf-8', newline='') as infile, \
-         open(output_tsv, mode='w', encoding='utf-8', newline='') as outfile:
-        reader = csv.reader(infile, delimiter='\t')
-        writer = csv.writer(outfile, delimiter='\t')
-
-        for row in reader:
-            if first_line:
-                # Write the header unchanged
-                writer.writerow(row)
-                first_line = False
-                continue
-
-            if row and len(row) >= 4:
-                token_in, tag_in, lemma_in, macron_in = row[:4]
-                source_in = row[4] if len(row) > 4 else ''
-
-                normalized_token = unicodedata.normalize('NFC', token_in)
-                original_macron = macron_in
-
-                # Apply the long_fem_alpha function
-                new_macron = long_fem_alpha(normalized_token, tag_in, lemma_in)
-                if new_macron:
-                    macron_in = collate_macrons(macron_in, new_macron)
-                    if macron_in != original_macron:
-                        long_fem_alpha_count += 1
-
-                # Apply the short_masc_neut_alpha function
-                new_macron = short_masc_neut_alpha(normalized_token, tag_in)
-                if new_macron:
-                    macron_in = collate_macrons(macron_in, new_macron)
-                    if macron_in != original_macron:
-                        short_masc_neut_alpha_count += 1
-
-                # Apply the short_dat function
-                new_macron = short_dat(normalized_token, tag_in)
-                if new_macron:
-                    macron_in = collate_macrons(macron_in, new_macron)
-                    if macron_in != original_macron:
-                        short_dat_count += 1
-
-                # Update the source field only if the macron value changed
-                if macron_in != original_macron:
-                    source_out = f"{source_in},nominal" if source_in else "nominal"
-                else:
-                    source_out = source_in
-
-                # Write the updated row to the output TSV
-                output_row = [token_in, tag_in, lemma_in, macron_in, source_out]
-                writer.writerow(output_row)
+    table = MacronTable.read_tsv(input_tsv)
+    long_fem_alpha_count, short_masc_neut_alpha_count, short_dat_count = macronize_nominal_forms(table)
+
+    table.write_tsv(output_tsv)
 
     # Print statistics about how many updates were made by each function
     print(f"{Colors.GREEN}Total forms updated by long_fem_alpha: {long_fem_alpha_count}{Colors.ENDC}")
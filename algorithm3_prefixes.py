@@ -10,65 +10,51 @@ Total tokens updated by brevize_syn: 273
 
 '''
 
-import csv
-import unicodedata
+from utils import Colors
+from macron_table import MacronTable
+from macron_rules import Rule, apply_rule, apply_rules
 
-from utils import Colors, only_bases
-from collate_macrons import collate_macrons
 
+def syn_prefix(analysis):
+    return analysis.bases.startswith('συν')
+
+
+def syn_upsilon(analysis):
+    return 2  # σ-υ-ν
 
-def brevize_syn(word):
-    base_form = only_bases(word)
-    if base_form.startswith('συν'):
-        return '^2'
-    return None
 
-# Example usage
-print(brevize_syn('συνεργάτης'))  # Outputs: ^2
-print(brevize_syn('σύνδεσμος'))   # Outputs: ^2
-print(brevize_syn('διασυνδέσεις'))  # Outputs: None
+# see macron_rules.py
+PREFIX_RULES = [
+    Rule('brevize_syn', source='prefix', length='^', position=syn_upsilon, condition=syn_prefix),
+]
+
+
+def brevize_syn(word):
+    '''
+    >>brevize_syn('συνεργάτης')
+    >>^2
+    >>brevize_syn('σύνδεσμος')
+    >>^2
+    >>brevize_syn('διασυνδέσεις')
+    >>None
+    '''
+    return apply_rule(PREFIX_RULES[0], word)
+
+
+def brevize_prefixes(table):
+    '''
+    Applies brevize_syn to the rows of a MacronTable in place;
+    used by macronize_prefixes. macronize_pipeline.py applies it together with the rules of algorithms 1 and 2.
+    Returns the number of tokens updated.
+    '''
+    return apply_rules(table, PREFIX_RULES)['brevize_syn']
 
 
 def macronize_prefixes(input_tsv, output_tsv):
-    prefix_count = 0
-    first_line = True  # Flag to identify the header
-
-    with open(input_tsv, mode='r', encoding='utf-8', newline='') as infile, \
-         open(output_tsv, mode='w', encoding='utf-8', newline='') as outfile:
-        reader = csv.reader(infile, delimiter='\t')
-        writer = csv.writer(outfile, delimiter='\t')
-
-        for row in reader:
-            if first_line:
-                # Write the header unchanged
-                writer.writerow(row)
-                first_line = False
-                continue
-
-            if row and len(row) >= 4:
-                token_in, tag_in, lemma_in, macron_in = row[:4]
-                source_in = row[4] if len(row) > 4 else ''
-
-                normalized_token = unicodedata.normalize('NFC', token_in)
-                original_macron = macron_in
-
-                # Apply brevize_syn to the token
-                new_macron = brevize_syn(normalized_token)
-                if new_macron:
-                    macron_in = collate_macrons(macron_in, new_macron)
-                    if macron_in != original_macron:
-                        if 'prefix' not in source_in:
-                            source_out = f"{source_in},prefix" if source_in else "prefix"
-                        prefix_count += 1
-                    else:
-                        source_out = source_in
-                else:
-                    source_out = source_in
-
-                # Write the updated row to the output TSV
-                output_row = [token_in, tag_in, lemma_in, macron_in, source_out]
-                writer.writerow(output_row)
+    table = MacronTable.read_tsv(input_tsv)
+    prefix_count = brevize_prefixes(table)
 
+    table.write_tsv(output_tsv)
 
     # Print statistics
     print(f"{Colors.GREEN}Total tokens updated by brevize_syn: {prefix_count}{Colors.ENDC}")
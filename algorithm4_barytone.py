@@ -6,7 +6,9 @@ import re
 import csv
 
 from utils import Colors, only_bases, graves, acutes
+from macron_table import MacronTable
 from erics_syllabifier import syllabifier
+from word_analysis import analyze
 
 
 def ultima(word):
@@ -14,10 +16,7 @@ def ultima(word):
     >> ultima('ποτιδέρκομαι')
     >> μαι
     '''
-    list_of_syllables = syllabifier(word)
-    ultima = list_of_syllables[-1]
-
-    return ultima
+    return analyze(word).ultima
 
 
 def barytone(token):
@@ -28,22 +27,21 @@ def barytone(token):
 
 
 def should_share_macrons(line1, line2):
+    '''
+    >>should_share_macrons('μεγίστης	a-s---fgs	μέγας		','μέγιστον	a-s---nas	μέγας	^4	wiktionary')
+    >>True
+    '''
     columns1 = line1.split('\t')
     columns2 = line2.split('\t')
 
     token_1, tag_1, lemma_1, macron_1 = columns1[:4]
     token_2, tag_2, lemma_2, macron_2 = columns2[:4]
 
-    list_of_syllables1 = syllabifier(token_1)
-    list_of_syllables2 = syllabifier(token_2)
-
-    except_ultima1 = list_of_syllables1[:-1]
-    except_ultima2 = list_of_syllables2[:-1]
+    except_ultima1 = list(analyze(token_1).syllables[:-1])
+    except_ultima2 = list(analyze(token_2).syllables[:-1])
 
     return except_ultima1 and except_ultima2 and lemma_1 == lemma_2 and only_bases(except_ultima1) == only_bases(except_ultima2)
 
-print(should_share_macrons('μεγίστης	a-s---fgs	μέγας		','μέγιστον	a-s---nas	μέγας	^4	wiktionary'))
-
 
 def replace_grave_with_acute(token):
     '''
@@ -58,51 +56,47 @@ def replace_grave_with_acute(token):
     return re.sub(graves, replace, token)
 
 
-def macronize_barytones(input_tsv, output_tsv):
-    print('hello world')
-    lines = []
+def inherit_barytone_macrons(table):
+    '''
+    Lets the barytones among the rows of a MacronTable inherit the macrons
+    of their oxytone counterparts, in place;
+    used both by macronize_barytones and macronize_pipeline.py.
+    Returns the number of barytones macronized.
+    '''
     barytones_macronized = 0
-    
-    # Read the input TSV file
-    with open(input_tsv, mode='r', encoding='utf-8', newline='') as infile:
-        reader = csv.reader(infile, delimiter='\t')
-        lines = [row for row in reader]
 
     # Create a dictionary for quick lookup
     token_to_macron = {}
-    for row in lines:
-        if row and len(row) >= 4:
-            token_in, tag_in, lemma_in, macron_in = row[:4]
-            source_in = row[4] if len(row) > 4 else ''
-            token_to_macron[token_in] = (macron_in, source_in)
+    for i in range(len(table)):
+        if table.width(i) >= 4:
+            token_to_macron[table.token(i)] = table.macrons(i)
 
     # Process each line
-    for row in lines:
-        if row and len(row) >= 4:
-            token_in, tag_in, lemma_in, macron_in = row[:4]
-            source_in = row[4] if len(row) > 4 else ''
-            
+    for i in range(len(table)):
+        if table.width(i) >= 4:
+            token_in = table.token(i)
+
             if barytone(token_in):
                 acute_token = replace_grave_with_acute(token_in)
                 if acute_token in token_to_macron:
-                    macron_out, source_out = token_to_macron[acute_token]
-                    row[3] = macron_out
-                    if 'barytone' not in source_in:
-                        row[4] = f"{source_in},barytone" if source_in else "barytone"
+                    table.set_macrons(i, token_to_macron[acute_token])
+                    table.add_source(i, 'barytone', once=True)
                     barytones_macronized += 1
-                else:
-                    row[4] = source_in
 
-    # Write the updated lines to the output TSV file
-    with open(output_tsv, mode='w', encoding='utf-8', newline='') as outfile:
-        writer = csv.writer(outfile, delimiter='\t')
-        writer.writerows(lines)
+    return barytones_macronized
+
+
+def macronize_barytones(input_tsv, output_tsv):
+    table = MacronTable.read_tsv(input_tsv)
+    barytones_macronized = inherit_barytone_macrons(table)
+    table.write_tsv(output_tsv)
 
     # Print summary information
     print(f"{Colors.GREEN}Processed file saved as: {output_tsv}{Colors.ENDC}")
     print(f"{Colors.GREEN}Total number of barytones macronized: {barytones_macronized}{Colors.ENDC}")
 
 
-input_tsv = 'macrons_alg3_prefix2.tsv'
-output_tsv = 'macrons_alg4_barytone.tsv'
-macronize_barytones(input_tsv, output_tsv)
\ No newline at end of file
+if __name__ == '__main__':
+    input_tsv = 'macrons_alg3_prefix.tsv'
+    output_tsv = 'macrons_alg4_barytone.tsv'
+    macronize_barytones(input_tsv, output_tsv)
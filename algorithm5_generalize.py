@@ -22,6 +22,7 @@ from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils import Colors, only_bases, graves, acutes
 from erics_syllabifier import syllabifier
+from word_analysis import analyze
 
 from algorithm1_accentual_rules import ordinal_last_vowel
 from collate_macrons import collate_macrons
@@ -32,10 +33,7 @@ def ultima(word):
     >> ultima('ποτιδέρκομαι')
     >> μαι
     '''
-    list_of_syllables = syllabifier(word)
-    ultima = list_of_syllables[-1]
-
-    return ultima
+    return analyze(word).ultima
 
 
 def should_share_macrons(line1, line2):
@@ -51,11 +49,8 @@ def should_share_macrons(line1, line2):
     token_1, tag_1, lemma_1, macron_1 = columns1[:4]
     token_2, tag_2, lemma_2, macron_2 = columns2[:4]
 
-    list_of_syllables1 = syllabifier(token_1)
-    list_of_syllables2 = syllabifier(token_2)
-
-    except_ultima1 = list_of_syllables1[:-1]
-    except_ultima2 = list_of_syllables2[:-1]
+    except_ultima1 = list(analyze(token_1).syllables[:-1])
+    except_ultima2 = list(analyze(token_2).syllables[:-1])
 
     return len(token_1) > 2 and len(token_2) > 2 and except_ultima1 and except_ultima2 and lemma_1 == lemma_2 and only_bases(except_ultima1) == only_bases(except_ultima2)
 
@@ -116,6 +111,7 @@ def macronize_cognates(input_tsv, output_tsv):
     print(f"{Colors.GREEN}Total number of cognates with updated macron columns: {cognates}{Colors.ENDC}")
 
 
-input_tsv = 'macrons_alg4_barytone.tsv'
-output_tsv = 'macrons_alg5_generalize.tsv'
-macronize_cognates(input_tsv, output_tsv)
+if __name__ == '__main__':
+    input_tsv = 'macrons_alg4_barytone.tsv'
+    output_tsv = 'macrons_alg5_generalize.tsv'
+    macronize_cognates(input_tsv, output_tsv)
@@ -18,17 +18,25 @@ First run:
 Finished 29 May, ran for 49:28:44
 Total number of cognates with updated macron columns: 4630
 
-'''
-import re
-import csv
+The pairwise scan has since been replaced by bucketing the lines on (lemma, only_bases of the syllables before the ultima),
+which is exactly the condition of should_share_macrons, so that propagation only happens within each bucket.
+This makes the pass linear in the number of lines.
+
+The result depends on the order in which the lines of a bucket are visited, since the first line to propagate wins.
+The old scan ran in 4 threads over 4 chunks of the file, and its order is a scheduling artifact of that setup.
+scan_order reproduces this order on purpose (num_workers=4, the default), so that macrons_alg5_generalize_threads.tsv
+stays byte for byte the same as the file that the old scan produced. With num_workers=1 the lines are visited in
+file order. This is the cleaner choice, but on macrons_alg4_barytone.tsv it changes one row (4628 cognates updated
+instead of 4630), and the TSV would have to be regenerated.
 
+'''
+from collections import defaultdict
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from utils import Colors, only_bases, graves, acutes
-from erics_syllabifier import syllabifier
+from utils import Colors, only_bases
+from word_analysis import analyze
 
-from algorithm1_accentual_rules import ordinal_last_vowel
 from collate_macrons import collate_macrons
+from macron_table import MacronTable
 
 
 def ultima(word):
@@ -36,10 +44,7 @@ def ultima(word):
     >> ultima('ποτιδέρκομαι')
     >> μαι
     '''
-    list_of_syllables = syllabifier(word)
-    ultima = list_of_syllables[-1]
-
-    return ultima
+    return analyze(word).ultima
 
 
 def should_share_macrons(line1, line2):
@@ -55,87 +60,131 @@ def should_share_macrons(line1, line2):
     token_1, tag_1, lemma_1, macron_1 = columns1[:4]
     token_2, tag_2, lemma_2, macron_2 = columns2[:4]
 
-    list_of_syllables1 = syllabifier(token_1)
-    list_of_syllables2 = syllabifier(token_2)
-
-    except_ultima1 = list_of_syllables1[:-1]
-    except_ultima2 = list_of_syllables2[:-1]
+    except_ultima1 = list(analyze(token_1).syllables[:-1])
+    except_ultima2 = list(analyze(token_2).syllables[:-1])
 
     return len(token_1) > 2 and len(token_2) > 2 and except_ultima1 and except_ultima2 and lemma_1 == lemma_2 and only_bases(except_ultima1) == only_bases(except_ultima2)
 
 
-def process_pairs(data_lines, start, end):
-    cognates = 0
-    for i in tqdm(range(start, end), desc="Processing chunk", leave=False):
-        line1 = data_lines[i]
-        if len(line1) < 4:
-            continue
+def cognate_key(token, lemma):
+    '''
+    Hash key under which should_share_macrons holds for two lines, i.e. two lines
+    share macrons iff they have the same (non-None) key:
+    the lemma and the only_bases of the syllables before the ultima.
+    >> cognate_key('μεγίστης', 'μέγας')
+    >> ('μέγας', 'μγ')
+    '''
+    if len(token) <= 2:
+        return None
+
+    except_ultima = analyze(token).syllables[:-1]
+    if not except_ultima:
+        return None
 
-        token_1, tag_1, lemma_1, macron_1 = line1[:4]
-        source_1 = line1[4] if len(line1) > 4 else ''
+    return lemma, only_bases(except_ultima)
 
-        for j in range(i + 1, len(data_lines)):
-            line2 = data_lines[j]
-            if len(line2) < 4:
+
+def bucket_cognates(table):
+    '''
+    Groups the row indices of a MacronTable by cognate_key, keeping the original order within each bucket.
+    Since the key starts with the lemma, the rows are taken lemma by lemma.
+    '''
+    buckets = defaultdict(list)
+    for lemma, indices in tqdm(table.group_by_lemma().items(), desc="Bucketing cognates", unit="lemma"):
+        for i in indices:
+            if table.width(i) < 4:
                 continue
+            key = cognate_key(table.token(i), lemma)
+            if key:
+                buckets[key].append(i)
+    return buckets
 
-            token_2, tag_2, lemma_2, macron_2 = line2[:4]
-            source_2 = line2[4] if len(line2) > 4 else ''
 
-            if should_share_macrons('\t'.join(line1), '\t'.join(line2)):
-                macron_count_1 = len(re.findall(r'[\^_]\d+', macron_1))
-                macron_count_2 = len(re.findall(r'[\^_]\d+', macron_2))
+def scan_order(n, num_workers=4):
+    '''
+    Rank of each line in the order in which the old threaded pairwise scan propagated macrons.
+    Every worker scanned its own chunk, and line i cost one comparison per later line,
+    so line i was reached after sum(n - k) comparisons from the start of its chunk.
+    Replaying the lines in that order reproduces macrons_alg5_generalize_threads.tsv byte for byte;
+    with num_workers=1 it is simply the sequential order.
+    '''
+    chunk_size = n // num_workers
+    chunks = [(i * chunk_size, (i + 1) * chunk_size) for i in range(num_workers)]
+    chunks[-1] = (chunks[-1][0], n)  # Ensure the last chunk goes to the end
+
+    reached_after = [0] * n
+    for start, end in chunks:
+        comparisons = 0
+        for i in range(start, end):
+            comparisons += n - i
+            reached_after[i] = comparisons
 
-                if macron_count_1 > macron_count_2:
-                    last_vowel_pos_1 = ordinal_last_vowel(token_1)
-                    updated_macron_2 = collate_macrons(macron_2, macron_1)
+    order = sorted(range(n), key=lambda i: (reached_after[i], i))
+    rank = [0] * n
+    for position, i in enumerate(order):
+        rank[i] = position
+    return rank
 
-                    line2[3] = updated_macron_2
-                    if 'cognate' not in source_2:
-                        line2[4] = f"{source_2},cognate" if source_2 else "cognate"
-                    cognates += 1
+
+def process_bucket(table, bucket, rank):
+    '''
+    Same propagation as the old pairwise scan (every line against every later line),
+    but only among the lines of one bucket, which are known to share macrons.
+    '''
+    cognates = 0
+    for i in sorted(bucket, key=lambda i: rank[i]):
+        macron_1 = table.macrons(i)
+        macron_count_1 = len(macron_1)
+
+        for j in bucket:
+            if j <= i:
+                continue
+            macron_2 = table.macrons(j)
+            macron_count_2 = len(macron_2)
+
+            if macron_count_1 > macron_count_2:
+                table.set_macrons(j, collate_macrons(macron_2, macron_1))
+                table.add_source(j, 'cognate', once=True)
+                cognates += 1
     return cognates
 
-def macronize_cognates(input_tsv, output_tsv, num_workers=4):
-    lines = []
+
+def generalize_cognates(table, num_workers=4):
+    '''
+    Propagates macrons among the cognates in the rows of a MacronTable in place;
+    used both by macronize_cognates and macronize_pipeline.py.
+    Returns the number of cognates with updated macron columns.
+    '''
     total_cognates = 0
-    
-    # Read the input TSV file
-    with open(input_tsv, mode='r', encoding='utf-8', newline='') as infile:
-        reader = csv.reader(infile, delimiter='\t')
-        lines = [row for row in reader]
 
-    if not lines:
-        print(f"{Colors.RED}Error: The file {input_tsv} is empty or invalid.{Colors.ENDC}")
-        return
+    # Only lines within the same bucket can share macrons, so there is no need to compare all pairs
+    buckets = bucket_cognates(table)
+    rank = scan_order(len(table), num_workers)
+    for bucket in tqdm(buckets.values(), desc="Processing buckets", unit="bucket"):
+        total_cognates += process_bucket(table, bucket, rank)
 
-    # Skip the header line
-    header = lines[0]
-    data_lines = lines[1:]
+    return total_cognates
 
-    # Partition the data
-    chunk_size = len(data_lines) // num_workers
-    chunks = [(i * chunk_size, (i + 1) * chunk_size) for i in range(num_workers)]
-    chunks[-1] = (chunks[-1][0], len(data_lines))  # Ensure the last chunk goes to the end
 
-    # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        futures = [executor.submit(process_pairs, data_lines, start, end) for start, end in chunks]
+def macronize_cognates(input_tsv, output_tsv, num_workers=4):
+    # Read the input TSV file
+    try:
+        table = MacronTable.read_tsv(input_tsv)
+    except ValueError:
+        print(f"{Colors.RED}Error: The file {input_tsv} is empty or invalid.{Colors.ENDC}")
+        return
 
-        for future in tqdm(as_completed(futures), total=len(futures), desc="Processing chunks", unit="chunk"):
-            total_cognates += future.result()
+    total_cognates = generalize_cognates(table, num_workers)
 
     # Write the updated lines to the output TSV file
-    with open(output_tsv, mode='w', encoding='utf-8', newline='') as outfile:
-        writer = csv.writer(outfile, delimiter='\t')
-        writer.writerow(header)
-        writer.writerows(data_lines)
+    table.write_tsv(output_tsv)
 
     # Print summary information
     print(f"{Colors.GREEN}Processed file saved as: {output_tsv}{Colors.ENDC}")
     print(f"{Colors.GREEN}Total number of cognates with updated macron columns: {total_cognates}{Colors.ENDC}")
 
 
-input_tsv = 'macrons_alg4_barytone.tsv'
-output_tsv = 'macrons_alg5_generalize_threads.tsv'
-macronize_cognates(input_tsv, output_tsv)
+if __name__ == '__main__':
+    input_tsv = 'macrons_alg4_barytone.tsv'
+    output_tsv = 'macrons_alg5_generalize_threads.tsv'
+    macronize_cognates(input_tsv, output_tsv)
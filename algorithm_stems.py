@@ -30,12 +30,9 @@ from prepare_tokens.filter_dichrona import ultima, properispomenon, proparoxyton
 from collate_macrons import collate_macrons
 
 
-from greek_inflexion_interface import get_stem
+from greek_inflexion_interface import get_stem, load_stem_index, save_stem_index
 
 
-print(get_stem('φέρω', 'v1spia---'))
-print(get_stem('λέγεις', 'v2spia---'))
-
 def process_stem(token, tag):
     result = get_stem(token, tag)
     return result is not None
@@ -50,6 +47,9 @@ def count_found_stems(filepath):
             if len(row) >= 2:
                 data.append((row[0], row[1]))
     
+    # Lookups made by earlier runs are read from the stem index, if the lexica have not changed since
+    load_stem_index()
+
     # Process data in parallel
     count = 0
     with ThreadPoolExecutor() as executor:
@@ -61,10 +61,11 @@ def count_found_stems(filepath):
             if future.result():
                 count += 1
 
-    return count
+    save_stem_index()
 
-print(count_found_stems('macrons_alg1_ultima.tsv'))
+    return count
 
-#if __name__ == '__main__':
-#    input_tsv = 'macrons_wiki_hypo_ifth_lsj.tsv'
-#    output_tsv = 'macrons_alg1_ultima.tsv'
\ No newline at end of file
+if __name__ == '__main__':
+    print(get_stem('φέρω', 'v1spia---'))
+    print(get_stem('λέγεις', 'v2spia---'))
+    print(count_found_stems('macrons_alg1_ultima.tsv'))
@@ -1,16 +1,14 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, g
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.io as pio
-from plotly.subplots import make_subplots
-import csv
 import sqlite3
 from werkzeug.security import check_password_hash
 
 from utils import DICHRONA
 from prepare_tokens.filter_dichrona import is_diphthong, has_iota_adscriptum
+from macron_store import MacronStore
+
+# pandas and plotly are imported by the functions of the stats page, so that starting the app
+# (and importing it, e.g. from macronizer.py) does not wait for them
 
 ################################
 ########## LOGIN ###############
@@ -84,11 +82,34 @@ def logout():
     return redirect(url_for('login'))
 
 ################################
-########## PIE CHARTS ##########
+########## MACRONS DB ##########
 ################################
 
+MACRONS_DATABASE = 'macrons.db'
+macron_store = None
+
+def get_macron_store():
+    # One MacronStore, i.e. one connection, shared by all requests
+    global macron_store
+    if macron_store is None:
+        macron_store = MacronStore(MACRONS_DATABASE)
+    return macron_store
+
+# read by the charts until macrons.db has been filled by the collation (the committed one only has the token list)
 input_tsv = 'macrons_alg1_ultima.tsv'
 
+def load_macrons():
+    # The same columns as pd.read_csv used to give for the macron TSVs, with empty cells as NaN
+    import pandas as pd
+    if not get_macron_store().has_macrons():
+        return pd.read_csv(input_tsv, delimiter='\t')
+    rows = [[value or None for value in row] for row in get_macron_store().read_rows()]
+    return pd.DataFrame(rows, columns=['token', 'tag', 'lemma', 'macron', 'source'])
+
+################################
+########## PIE CHARTS ##########
+################################
+
 @app.route('/stats')
 def stats_page():
     # This function will act as the orchestrator for generating all charts
@@ -100,7 +121,11 @@ def stats_page():
     return render_template('stats.html', pie_chart1=pie_html1, pie_chart2=pie_html2, pie_chart3=pie_html3)
 
 def source_distribution_chart():
-    data = pd.read_csv(input_tsv, delimiter='\t')
+    import pandas as pd
+    import plotly.express as px
+    import plotly.io as pio
+
+    data = load_macrons()
     data['segment'] = data['macron'].apply(lambda x: 'empty' if pd.isna(x) or x == '' else 'non-empty')
     data.loc[data['segment'] == 'non-empty', 'segment'] = data['source'].fillna('no source')
     summary = data['segment'].value_counts()
@@ -110,7 +135,11 @@ def source_distribution_chart():
     return pie_html
 
 def macronized_dichrona_chart():
-    data = pd.read_csv(input_tsv, delimiter='\t')
+    import pandas as pd
+    import plotly.express as px
+    import plotly.io as pio
+
+    data = load_macrons()
     data['dichrona_count'] = data['token'].apply(lambda x: sum(1 for char in x if char in DICHRONA and not (is_diphthong(x) or has_iota_adscriptum(x))))
     total_dichrona = data['dichrona_count'].sum()
     data['macron_digit_count'] = data['macron'].fillna('').apply(lambda x: sum(char.isdigit() for char in x))
@@ -122,7 +151,11 @@ def macronized_dichrona_chart():
     return pie_html
 
 def word_class_distribution_chart():
-    data = pd.read_csv(input_tsv, delimiter='\t')
+    import pandas as pd
+    import plotly.express as px
+    import plotly.io as pio
+
+    data = load_macrons()
     tag_class_map = {
         'n': 'noun', 'v': 'verb', 't': 'participle', 'a': 'adjective',
         'd': 'adverb', 'l': 'article', 'g': 'particle', 'c': 'conjunction',
@@ -149,27 +182,18 @@ def add_macrons():
     if request.method == 'POST':
         token = request.form['token']
         new_macron = request.form['macron']
-        update_tsv('macrons_wiki_and_hypo_collated.tsv', token, new_macron)
+        if update_macrons(token, new_macron):
+            flash(f'Updated the macrons of the first row of {token}')
+        else:
+            flash(f'{token} is not in the token list; nothing was updated')
         return redirect(url_for('add_macrons'))
     
     return render_template('add_macrons.html')
 
-def update_tsv(file_path, token, new_macron):
-    data = []
-    updated = False
-    with open(file_path, mode='r', newline='', encoding='utf-8') as file:
-        reader = csv.reader(file, delimiter='\t')
-        for row in reader:
-            if row[2] == token and not updated:  # Assuming the token is in the third column
-                row[3] = new_macron  # Update macron
-                row[4] = 'manual'   # Update source
-                updated = True
-            data.append(row)
-    
-    if updated:
-        with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file, delimiter='\t')
-            writer.writerows(data)
+def update_macrons(token, new_macron):
+    # Only the first row of the token (the lowest id) gets the new macrons and the source 'manual'; the other rows of
+    # the same token are left as they are. Returns whether the token was found.
+    return get_macron_store().update_first_row(token, new_macron, 'manual')
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -22,7 +22,9 @@ def append_elision_char(input_file_path, output_file_path):
 
     print(f"{Colors.GREEN}Elision characters appended: {elision_appended_count}{Colors.ENDC}")
 
-# Example usage
-input_file_path = 'tokens_elided.txt'
-output_file_path = 'tokens_elided_fixed.txt'
-append_elision_char(input_file_path, output_file_path)
+
+if __name__ == '__main__':
+    # Example usage
+    input_file_path = 'tokens_elided.txt'
+    output_file_path = 'tokens_elided_fixed.txt'
+    append_elision_char(input_file_path, output_file_path)
@@ -0,0 +1,396 @@
+'''
+/build.py
+
+The token → macron pipeline of the readme as a graph of stages. It is rebuilt like make, but by content rather than by date:
+
+    tragedies_300595_....txt ==> tokens ==> tokens.txt ==> tokens_nfc ==> tokens_nfc.tsv
+    crawl_lsj/macrons_lsj_raw_old_filter.tsv ==> lsj_format ==> macrons_lsj.tsv
+    crawl_ifthimos/macrons_ifthimos_raw_filter.tsv ==> ifthimos_format ==> macrons_ifthimos.tsv
+    crawl_hypotactic/hypotactic_htmls_greek ==> hypotactic_patterns ==> metrical_patterns.db
+        ==> hypotactic_macronize (+ tokens.txt) ==> macrons_hypotactic.db ==> hypotactic_tsv ==> macrons_hypotactic.tsv
+    macrons_empty.tsv + the sources of collation.macrons_collate.SOURCES ==> collate ==> macrons_wiki_hypo_ifth_lsj.tsv
+        ==> algorithms ==> macrons_alg5_generalize_threads.tsv ==> stats ==> macrons_stats.txt
+
+Each Stage in STAGES declares the function it runs ('script path:function name', called with args),
+its input files (or folders) and its output files. Its code version is the content of its script
+and of every module of the repository that the script imports, directly or not (see code_files).
+
+The key of a stage is the sha256 of its function, args, code version and the content of its inputs. The build
+    - skips the stage if its key, and the content of its outputs, are what they were after its last run;
+    - else restores the outputs from build_cache/outputs/<key> if the stage has been run with that key before
+      (e.g. before a change that has since been reverted);
+    - else runs the stage and stores its outputs there.
+So after a change to a file or a rule module, only the stages downstream of it run, and only as far as the change reaches:
+a stage whose outputs come out the same as before does not make the stages after it run.
+
+Each stage is run in a process of its own (python build.py --run-stage <name>, as if its script had been started),
+up to --jobs at a time, as soon as the stages it depends on are done, so that e.g. the crawl formatters run in parallel.
+The outputs of a stage are deleted before it runs, except for incremental stages, which bring their outputs up to date
+themselves (hypotactic_patterns, cf. the ingested_files manifest of crawl_hypotactic_preprocessing.py).
+
+The crawls themselves (crawl_lsj_thread.py, macronize_ifthimos_raw.py, the wiktionary crawl) are not stages,
+as they take hours of network; their raw output files are inputs of the graph, like the corpus of the tokens stage.
+A stage with a missing input whose outputs are all there (e.g. collate without crawl_wiktionary/macrons_wiktionary.tsv)
+is kept as it is, with a warning, and the stages after it use its outputs.
+
+The sha256 of every file is remembered together with its size and mtime in build_cache/manifest.db, as git's index does,
+so that unchanged files are not read again. Delete build_cache to start afresh (or to reclaim the space of old outputs).
+
+Usage:
+    python build.py                      # all stages
+    python build.py algorithms stats     # these stages and those they depend on
+    python build.py --force collate      # run collate even if it is up to date
+    python build.py --jobs 4
+'''
+
+import os
+import sys
+import ast
+import json
+import shutil
+import sqlite3
+import hashlib
+import argparse
+import importlib
+import threading
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils import Colors
+from crawl_journal import sha256_file
+from collation.macrons_collate import SOURCES
+
+# incremental: the stage updates its outputs in place, so they are not deleted before it runs
+Stage = namedtuple('Stage', ['name', 'function', 'args', 'inputs', 'outputs', 'incremental'], defaults=(False,))
+
+CORPUS = 'tragedies_300595_fix_elision_hyphen_manualfix.txt'  # in prepare_tokens/tokens, like the other file names of main_tokens.main
+
+STAGES = [
+    Stage('tokens', 'prepare_tokens/main_tokens.py:main',
+          (CORPUS, 'tokens.txt', 'lines_filtered_out.txt', 'lines_x.txt'),
+          inputs=[f'prepare_tokens/tokens/{CORPUS}'],
+          outputs=['prepare_tokens/tokens/tokens.txt', 'prepare_tokens/tokens/lines_filtered_out.txt', 'prepare_tokens/tokens/lines_x.txt']),
+    Stage('tokens_nfc', 'normalize_to_nfc.py:normalize_tsv_to_nfc',
+          ('prepare_tokens/tokens/tokens.txt', 'prepare_tokens/tokens/tokens_nfc.tsv'),
+          inputs=['prepare_tokens/tokens/tokens.txt'],
+          outputs=['prepare_tokens/tokens/tokens_nfc.tsv']),
+    Stage('lsj_format', 'crawl_lsj/crawl_lsj_format_macrons.py:process_file',
+          ('crawl_lsj/macrons_lsj_raw_old_filter.tsv', 'macrons_lsj.tsv'),
+          inputs=['crawl_lsj/macrons_lsj_raw_old_filter.tsv'],
+          outputs=['macrons_lsj.tsv']),
+    Stage('ifthimos_format', 'crawl_ifthimos/macronize_ifthimos_format.py:process_tsv_file',
+          ('crawl_ifthimos/macrons_ifthimos_raw_filter.tsv', 'macrons_ifthimos.tsv'),
+          inputs=['crawl_ifthimos/macrons_ifthimos_raw_filter.tsv'],
+          outputs=['macrons_ifthimos.tsv']),
+    Stage('hypotactic_patterns', 'crawl_hypotactic/crawl_hypotactic_preprocessing.py:ingest_html_files',
+          ('crawl_hypotactic/hypotactic_htmls_greek', 'crawl_hypotactic/metrical_patterns.db'),
+          inputs=['crawl_hypotactic/hypotactic_htmls_greek'],
+          outputs=['crawl_hypotactic/metrical_patterns.db'],
+          incremental=True),
+    Stage('hypotactic_macronize', 'crawl_hypotactic/crawl_hypotactic_db.py:macronize_tokens',
+          ('crawl_hypotactic/metrical_patterns.db', 'crawl_hypotactic/macrons_hypotactic.db', 'prepare_tokens/tokens/tokens.txt'),
+          inputs=['crawl_hypotactic/metrical_patterns.db', 'prepare_tokens/tokens/tokens.txt'],
+          outputs=['crawl_hypotactic/macrons_hypotactic.db']),
+    Stage('hypotactic_tsv', 'crawl_hypotactic/convert_db_to_tsv.py:export_sql_to_tsv',
+          ('crawl_hypotactic/macrons_hypotactic.db', 'annotated_tokens', 'macrons_hypotactic.tsv', 4),
+          inputs=['crawl_hypotactic/macrons_hypotactic.db'],
+          outputs=['macrons_hypotactic.tsv']),
+    Stage('collate', 'collation/macrons_collate.py:collate_sources',
+          ('macrons_empty.tsv', 'macrons_wiki_hypo_ifth_lsj.tsv'),
+          inputs=['macrons_empty.tsv'] + [source_tsv for source, source_tsv, macron_column in SOURCES],
+          outputs=['macrons_wiki_hypo_ifth_lsj.tsv']),
+    Stage('algorithms', 'macronize_pipeline.py:run_pipeline',
+          ('macrons_wiki_hypo_ifth_lsj.tsv', 'macrons_alg5_generalize_threads.tsv'),
+          inputs=['macrons_wiki_hypo_ifth_lsj.tsv'],
+          outputs=['macrons_alg5_generalize_threads.tsv']),
+    Stage('stats', 'stats.py:write_stats',
+          ('macrons_alg5_generalize_threads.tsv', 'macrons_stats.txt'),
+          inputs=['macrons_alg5_generalize_threads.tsv'],
+          outputs=['macrons_stats.txt']),
+]
+
+CACHE_DIR = 'build_cache'
+
+root_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class BuildError(Exception):
+    pass
+
+
+### CODE VERSIONS
+
+
+def find_module_file(module_name, script_dir):
+    '''
+    The file of a module of the repository, looked for next to the script and at the root as the scripts' sys.path does, or None.
+    '''
+    relative_path = module_name.replace('.', os.sep)
+    for base_dir in (script_dir, ''):
+        for candidate in (f"{relative_path}.py", os.path.join(relative_path, '__init__.py')):
+            path = os.path.normpath(os.path.join(base_dir, candidate))
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def imported_module_names(tree):
+    for node in ast.walk(tree):  # also the imports inside functions, which the lazy imports are
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            yield node.module
+            yield from (f"{node.module}.{alias.name}" for alias in node.names)  # from package import module
+
+
+def code_files(script_path):
+    '''
+    The script and the modules of the repository that it imports, directly or through other modules.
+    '''
+    found = set()
+    to_read = [os.path.normpath(script_path)]
+    while to_read:
+        path = to_read.pop()
+        if path in found:
+            continue
+        found.add(path)
+        with open(path, 'rb') as file:
+            try:
+                tree = ast.parse(file.read(), path)
+            except SyntaxError:
+                continue  # hashed all the same, but its imports are not followed
+        for module_name in imported_module_names(tree):
+            module_path = find_module_file(module_name, os.path.dirname(path))
+            if module_path is not None:
+                to_read.append(module_path)
+    return sorted(found)
+
+
+### THE BUILD
+
+
+class Build:
+    def __init__(self, stages=STAGES, cache_dir=CACHE_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.producers = {output: stage.name for stage in stages for output in stage.outputs}
+        self.cache_dir = cache_dir
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'manifest.db'), check_same_thread=False)
+        self.lock = threading.Lock()  # the stages are built in threads, and share the connection
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS file_hashes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS stages (name TEXT PRIMARY KEY, key TEXT, outputs TEXT)')
+
+    ### HASHES
+
+    def hash_file(self, path):
+        '''
+        sha256 of a file, read again only if its size or mtime has changed since it was last hashed.
+        '''
+        stat = os.stat(path)
+        with self.lock:
+            found = self.conn.execute('SELECT size, mtime_ns, sha256 FROM file_hashes WHERE path = ?', (path,)).fetchone()
+        if found and found[:2] == (stat.st_size, stat.st_mtime_ns):
+            return found[2]
+
+        sha256 = sha256_file(path)
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)',
+                              (path, stat.st_size, stat.st_mtime_ns, sha256))
+        return sha256
+
+    def hash_path(self, path):
+        '''
+        sha256 of a file, or of the names and contents of the files in a folder.
+        '''
+        if not os.path.isdir(path):
+            return self.hash_file(path)
+        digest = hashlib.sha256()
+        for folder, subfolders, file_names in os.walk(path):
+            subfolders.sort()
+            for file_name in sorted(file_names):
+                file_path = os.path.join(folder, file_name)
+                digest.update(f"{os.path.relpath(file_path, path)}\0{self.hash_file(file_path)}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def stage_key(self, stage):
+        script_path = stage.function.split(':')[0]
+        description = {
+            'function': stage.function,
+            'args': list(stage.args),
+            'inputs': {path: self.hash_path(path) for path in stage.inputs},
+            'code': {path: self.hash_file(path) for path in code_files(script_path)},
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def output_hashes(self, stage):
+        if not all(os.path.exists(path) for path in stage.outputs):
+            return None
+        return {path: self.hash_path(path) for path in stage.outputs}
+
+    ### MANIFEST AND OUTPUT CACHE
+
+    def recorded(self, name):
+        with self.lock:
+            found = self.conn.execute('SELECT key, outputs FROM stages WHERE name = ?', (name,)).fetchone()
+        return (found[0], json.loads(found[1])) if found else (None, None)
+
+    def record(self, stage, key):
+        outputs = json.dumps(self.output_hashes(stage))
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO stages (name, key, outputs) VALUES (?, ?, ?)', (stage.name, key, outputs))
+
+    def cached_output_path(self, key, index, path):
+        return os.path.join(self.cache_dir, 'outputs', key[:2], key, f"{index}_{os.path.basename(path)}")
+
+    def store_outputs(self, stage, key):
+        # copied under a temporary name and renamed, so that an interrupted build never leaves half an output in the cache
+        for index, path in enumerate(stage.outputs):
+            cached_path = self.cached_output_path(key, index, path)
+            os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+            shutil.copyfile(path, f"{cached_path}.tmp")
+            os.replace(f"{cached_path}.tmp", cached_path)
+
+    def restore_outputs(self, stage, key):
+        '''
+        Copies the outputs of an earlier run with the same key back into place. Returns False if there are none.
+        '''
+        cached_paths = [self.cached_output_path(key, index, path) for index, path in enumerate(stage.outputs)]
+        if not all(os.path.isfile(cached_path) for cached_path in cached_paths):
+            return False
+        for cached_path, path in zip(cached_paths, stage.outputs):
+            shutil.copyfile(cached_path, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+        return True
+
+    ### STAGES
+
+    def build_stage(self, name, force=False):
+        '''
+        Brings the outputs of a stage up to date. Returns what was done: 'up to date', 'restored', 'ran' or 'kept'.
+        '''
+        stage = self.stages[name]
+        missing = [path for path in stage.inputs if not os.path.exists(path)]
+        if missing:
+            if all(os.path.exists(path) for path in stage.outputs):
+                return f"kept (missing input: {', '.join(missing)})"
+            raise BuildError(f"missing input: {', '.join(missing)}")
+
+        key = self.stage_key(stage)
+        if not force:
+            if self.recorded(name) == (key, self.output_hashes(stage)):
+                return 'up to date'
+            if self.restore_outputs(stage, key):
+                self.record(stage, key)
+                return 'restored'
+
+        if not stage.incremental:
+            for path in stage.outputs:
+                if os.path.isfile(path):
+                    os.remove(path)
+
+        print(f"{Colors.CYAN}{name}: running {stage.function}{Colors.ENDC}")
+        result = subprocess.run([sys.executable, os.path.join(root_dir, 'build.py'), '--run-stage', name], cwd=root_dir)
+        if result.returncode != 0:
+            raise BuildError(f"{stage.function} exited with {result.returncode}")
+        missing = [path for path in stage.outputs if not os.path.exists(path)]
+        if missing:
+            raise BuildError(f"{stage.function} did not write {', '.join(missing)}")
+
+        self.store_outputs(stage, key)
+        self.record(stage, key)
+        return 'ran'
+
+    def dependencies(self, name):
+        return {self.producers[path] for path in self.stages[name].inputs if path in self.producers}
+
+    def upstream(self, targets):
+        '''
+        The targets and the stages they depend on, in the order of STAGES.
+        '''
+        needed = set()
+        to_visit = list(targets)
+        while to_visit:
+            name = to_visit.pop()
+            if name not in needed:
+                needed.add(name)
+                to_visit.extend(self.dependencies(name))
+        return [name for name in self.stages if name in needed]
+
+    def build(self, targets=None, force=(), jobs=None):
+        '''
+        Builds the targets (default: all stages) and the stages they depend on, running up to jobs stages at a time
+        (default: one per core). Returns True if no stage failed.
+        '''
+        pending = self.upstream(targets or list(self.stages))
+        done = set()
+        failed = set()
+
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+            running = {}
+            while pending or running:
+                for name in list(pending):
+                    dependencies = self.dependencies(name)
+                    if dependencies & failed:
+                        pending.remove(name)
+                        failed.add(name)
+                        print(f"{Colors.RED}{name}: skipped, as {', '.join(sorted(dependencies & failed))} failed{Colors.ENDC}")
+                    elif dependencies <= done:
+                        pending.remove(name)
+                        running[executor.submit(self.build_stage, name, name in force)] = name
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        status = future.result()
+                    except BuildError as error:
+                        failed.add(name)
+                        print(f"{Colors.RED}{name}: failed: {error}{Colors.ENDC}")
+                    else:
+                        done.add(name)
+                        print(f"{Colors.GREEN}{name}: {status}{Colors.ENDC}")
+
+        return not failed
+
+    def close(self):
+        self.conn.close()
+
+
+def run_stage(name):
+    '''
+    Runs the function of a stage in this process, with the folder of its script first in sys.path as if the script had been started.
+    '''
+    stage = {stage.name: stage for stage in STAGES}[name]
+    script_path, function_name = stage.function.split(':')
+    sys.path.insert(0, os.path.join(root_dir, os.path.dirname(script_path)))
+    module = importlib.import_module(os.path.splitext(os.path.basename(script_path))[0])
+    getattr(module, function_name)(*stage.args)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild the stages of the pipeline whose inputs or code have changed.')
+    parser.add_argument('targets', nargs='*', help=f"Stages to build, with those they depend on (default: all): {', '.join(stage.name for stage in STAGES)}.")
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE', help='Run these stages even if they are up to date.')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of stages run at a time (default: one per core).')
+    parser.add_argument('--run-stage', default=None, help=argparse.SUPPRESS)  # the process of a single stage
+
+    args = parser.parse_args()
+    os.chdir(root_dir)
+
+    if args.run_stage:
+        run_stage(args.run_stage)
+        sys.exit()
+
+    unknown = [name for name in args.targets + args.force if name not in {stage.name for stage in STAGES}]
+    if unknown:
+        parser.error(f"unknown stage: {', '.join(unknown)}")
+
+    build = Build()
+    succeeded = build.build(args.targets + args.force, set(args.force), args.jobs)
+    build.close()
+    sys.exit(0 if succeeded else 1)
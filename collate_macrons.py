@@ -25,13 +25,113 @@ To see all functionality, run test_collate_macrons!
 '''
 
 import re
+import csv
+from functools import lru_cache
 
 from utils import Colors
 
 
+# MacronSet
+# parse_macrons
 # ordinal_in_existing
 # insert_macron_in_order
 # collate_macrons
+# read_macron_tsv, write_macron_tsv
+
+
+class MacronSet:
+    """
+    Parsed form of a macron column such as '_4^6', as a pair of bitmasks:
+    bit n of `longs` stands for _n and bit n of `shorts` for ^n.
+    A position is never in both. Instances are treated as immutable, so they can be shared between rows.
+
+    Strings are parsed once (parse_macrons) when a TSV is read and serialized once (str) when it is written;
+    in between, collating is a set operation:
+    >>> str(parse_macrons('_1^3^7') | parse_macrons('^2_5'))
+    >>> '_1^2^3_5^7'
+    >>> len(parse_macrons('_4^6'))
+    >>> 2
+    >>> 6 in parse_macrons('_4^6')
+    >>> True
+    """
+    __slots__ = ('longs', 'shorts')
+
+    def __init__(self, longs=0, shorts=0):
+        self.longs = longs
+        self.shorts = shorts
+
+    def __or__(self, other):
+        """
+        Collates other into self without overwriting: only positions that self does not have are added.
+        other may also be a macron string.
+        """
+        if isinstance(other, str):
+            other = parse_macrons(other)
+        new = (other.longs | other.shorts) & ~(self.longs | self.shorts)
+        if not new:
+            return self
+        return MacronSet(self.longs | (other.longs & new), self.shorts | (other.shorts & new))
+
+    def __contains__(self, ordinal):
+        return bool((self.longs | self.shorts) >> ordinal & 1)
+
+    def __len__(self):
+        return (self.longs | self.shorts).bit_count()
+
+    def __bool__(self):
+        return bool(self.longs | self.shorts)
+
+    def __eq__(self, other):
+        return isinstance(other, MacronSet) and self.longs == other.longs and self.shorts == other.shorts
+
+    def __hash__(self):
+        return hash((self.longs, self.shorts))
+
+    def __repr__(self):
+        return f"MacronSet('{self}')"
+
+    def __str__(self):
+        parts = []
+        remaining = self.longs | self.shorts
+        while remaining:
+            lowest = remaining & -remaining
+            parts.append(f"{'_' if self.longs & lowest else '^'}{lowest.bit_length() - 1}")
+            remaining ^= lowest
+        return ''.join(parts)
+
+    def positions(self):
+        """
+        >>> parse_macrons('_4^6').positions()
+        >>> [4, 6]
+        """
+        positions = []
+        remaining = self.longs | self.shorts
+        while remaining:
+            lowest = remaining & -remaining
+            positions.append(lowest.bit_length() - 1)
+            remaining ^= lowest
+        return positions
+
+
+macron_pattern = re.compile(r'([\^_])(\d+)')
+
+
+@lru_cache(maxsize=4096)
+def parse_macrons(macrons):
+    """
+    '_4^6' -> MacronSet. Anything that is not a ^n or _n part is ignored,
+    and if an ordinal occurs twice the first occurrence wins.
+    """
+    longs = shorts = 0
+    for symbol, number in macron_pattern.findall(macrons or ''):
+        bit = 1 << int(number)
+        if (longs | shorts) & bit:
+            continue
+        if symbol == '_':
+            longs |= bit
+        else:
+            shorts |= bit
+    return MacronSet(longs, shorts)
 
 
 def ordinal_in_existing(existing_macrons, new_macron):
@@ -43,14 +143,10 @@ def ordinal_in_existing(existing_macrons, new_macron):
     >>> True
     """
     if existing_macrons and new_macron:
-        # Use regular expression to split the string at both '^' and '_'
-        existing_ordinals = [int(''.join(filter(str.isdigit, macron))) for macron in re.split(r'[\^_]', existing_macrons) if macron.isdigit()]
-        
         # Extract the numeric part from the new_macron and convert to int
         new_digits = ''.join(filter(str.isdigit, new_macron))
         if new_digits:  # Ensure that new_macron contains digits
-            new_ordinal = int(new_digits)
-            return new_ordinal in existing_ordinals
+            return int(new_digits) in parse_macrons(existing_macrons)
     return False
 
 
@@ -72,55 +168,59 @@ def insert_macron_in_order(existing_macrons, new_macron):
     if not new_macron or not new_macron[1:].isdigit():  # Check if new_macron is properly formatted
         return existing_macrons
 
-    new_symbol, new_number = new_macron[0], int(new_macron[1:])
-
-    if ordinal_in_existing(existing_macrons, new_macron):
-        return existing_macrons  # If the new macron's ordinal is already present, return as is
-
-    # Extract parts and their types (prefixes) while keeping them paired
-    parts = re.findall(r'([\^_]\d+)', existing_macrons)
-    parts = [(part[0], int(part[1:])) for part in parts]  # Split into (symbol, number)
-
-    # Insert new macron in the correct position based on its ordinal
-    inserted = False
-    for i, (symbol, number) in enumerate(parts):
-        if new_number < number:
-            parts.insert(i, (new_symbol, new_number))
-            inserted = True
-            break
-    if not inserted:
-        parts.append((new_symbol, new_number))
-
-    # Reconstruct the macrons string from sorted parts
-    parts.sort(key=lambda x: x[1])  # Sort by number
-    result = ''.join(f'{symbol}{number}' for symbol, number in parts)
-    return result
+    return collate_macrons(existing_macrons, new_macron)
 
 
 def collate_macrons(existing_macrons, new_macrons):
     """
     Collates new macrons into existing macrons, handling complex macron inputs.
-    See unit-test function below for the many cases this function can handle
+    See unit-test function below for the many cases this function can handle.
+    Works on strings as before; if existing_macrons is a MacronSet, the result is a MacronSet too.
+    An existing string to which nothing is added is returned as is.
     """
+    if isinstance(existing_macrons, MacronSet):
+        return existing_macrons | new_macrons
+
     if not existing_macrons:
         return new_macrons  # Return new macrons directly if no existing macrons
 
     if not new_macrons:
         return existing_macrons  # Return existing if no new macrons to add
 
-    # Handle case where new_macrons contains multiple macron parts
-    new_macron_parts = re.findall(r'[\^_]\d+', new_macrons)
-    result_macrons = existing_macrons
-
-    if len(new_macron_parts) == 1:
-        # If only one macron part in new_macrons, process it directly
-        return insert_macron_in_order(existing_macrons, new_macrons)
-    else:
-        # Iterate over each macron part in new_macrons and collate it into existing_macrons
-        for macron in new_macron_parts:
-            if not ordinal_in_existing(result_macrons, macron):
-                result_macrons = insert_macron_in_order(result_macrons, macron)
-        return result_macrons
+    existing = parse_macrons(existing_macrons)
+    result = existing | new_macrons
+    if result == existing:
+        return existing_macrons
+    return str(result)
+
+
+def read_macron_tsv(input_tsv):
+    """
+    Reads a macron TSV and parses the macron column (fourth) of every row but the header into a MacronSet.
+    Returns the header and the rows.
+    """
+    with open(input_tsv, mode='r', encoding='utf-8', newline='') as infile:
+        reader = csv.reader(infile, delimiter='\t')
+        lines = [row for row in reader]
+
+    header, rows = lines[0], lines[1:]
+    for row in rows:
+        if len(row) >= 4:
+            row[3] = parse_macrons(row[3])
+    return header, rows
+
+
+def write_macron_tsv(output_tsv, header, rows):
+    """
+    Inverse of read_macron_tsv: the MacronSets are serialized back into strings as the rows are written.
+    """
+    with open(output_tsv, mode='w', encoding='utf-8', newline='') as outfile:
+        writer = csv.writer(outfile, delimiter='\t')
+        writer.writerow(header)
+        for row in rows:
+            if len(row) >= 4 and isinstance(row[3], MacronSet):
+                row = row[:3] + [str(row[3])] + row[4:]
+            writer.writerow(row)
 
 
 def test_collate_macrons():
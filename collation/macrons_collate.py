@@ -6,16 +6,43 @@ We start with macrons_empty.tsv, which is just a copy of tokens.tsv
 The columns are referred to as token, tag, lemma, macron, source,
 and the goal is to fill in the macron and source columns. 
 
-    Step 1) Collating all sources of macrons into a single db, in order of quality precedence:
+    Step 1) Collating all sources of macrons into a single db. The sources are:
         - LSJ (only lemmata, little/no pos)
-        - Ifthimos (macrons_ifthimos.tsv) (only endings, full pos compatibility) => 
-        - Wiktionary (no pos) => macrons_collate_wiktionary.py (older)
-        - Hypotactic (no pos) => macrons_collate_hypotactic.py (best collation script)
+        - Ifthimos (macrons_ifthimos.tsv) (only endings, full pos compatibility)
+        - Wiktionary (no pos)
+        - Hypotactic (no pos)
 
     A token will be macronized according to the highest source it appears in,
     and not overwritten if it appears in a subsequent source.
     However, any unmacronized dichrona may be filled in by appending macrons.
 
+    This is done by collate_sources below, in one pass over the base TSV, with the sources in the order of SOURCES.
+    (It replaced one script per source, macrons_collate_wiktionary.py, _hypotactic.py, _ifthimos.py and _lsj.py,
+    which each read and wrote the whole TSV and had to be run in that order.) For example, the base rows
+
+    ὠφελία	v1sria---	ὠφελία	^5	wiktionary
+    ὠφέλιμον	a-s---ma-	ὠφέλιμος	^5	wiktionary
+    ὤχμασεν	v3saia---	ὤχμασεν		
+
+    collated with the source
+
+    ὠφελία	v1sria---	ὠφελία	^5_6	
+    ὠφέλιμον	a-s---ma-	ὠφέλιμος		
+    ὤχμασεν	v3saia---	ὤχμασεν	^3	
+
+    become
+
+    ὠφελία	v1sria---	ὠφελία	^5_6	hypotactic	^5:wiktionary _6:hypotactic
+    ὠφέλιμον	a-s---ma-	ὠφέλιμος	^5	wiktionary	^5:wiktionary
+    ὤχμασεν	v3saia---	ὤχμασεν	^3	hypotactic	^3:hypotactic
+
+    The source column is the last source that added a macron to the row, as before;
+    the sixth column, provenance, has the source of each macron.
+
+    For token lists too large for the sources to be held in memory (e.g. all of the TLG), collate_sources_streaming
+    gives the same output with memory bounded by chunk_rows: the base and each source are sorted externally by NFC token,
+    merged in one pass, and the collated rows sorted back into the order of the base.
+
     Step 2) Using the macronized entries, we try to fill in the remaining ones by extrapolation.
     For example, in the below situation 
 
@@ -43,11 +70,24 @@ I will consequently build a web interface which will show only entries with fewe
 
 '''
 
-import sqlite3
 import csv
-import logging
-from tqdm import tqdm
+import argparse
+import unicodedata
+from itertools import groupby
 from utils import Colors
+from prepare_tokens.alphabetize_unicode import external_sort
+from collate_macrons import parse_macrons
+from macron_store import MacronStore
+
+
+# (source, macron TSV, column of the macrons) in order of precedence: a source only fills in the positions
+# that the sources before it left empty. This is the order in which the per-source scripts were run.
+SOURCES = [
+    ('wiktionary', 'crawl_wiktionary/macrons_wiktionary.tsv', 1),  # token, macrons
+    ('hypotactic', 'macrons_hypotactic.tsv', 3),
+    ('ifthimos', 'macrons_ifthimos.tsv', 3),
+    ('lsj', 'macrons_lsj.tsv', 3),
+]
 
 
 def print_ascii_art():
@@ -61,5 +101,174 @@ def print_ascii_art():
     print(cyan + "|_| |_| |_|\\__,_|\\___|_|  \\___/|_| |_|___(_)__,_|_.__/ " + endc)
 
 
+def load_source(source_tsv, macron_column=3):
+    """
+    NFC token => MacronSet of a source. If a token occurs more than once, its last row counts.
+    """
+    index = {}
+    with open(source_tsv, 'r', encoding='utf-8') as file:
+        for row in csv.reader(file, delimiter='\t'):
+            if len(row) > macron_column:
+                index[unicodedata.normalize('NFC', row[0].strip())] = parse_macrons(row[macron_column].strip())
+    return index
+
+
+def format_provenance(provenance):
+    """
+    {3: ('_', 'wiktionary'), 5: ('^', 'hypotactic')} => '_3:wiktionary ^5:hypotactic'
+    """
+    return ' '.join(f"{mark}{ordinal}:{source}" for ordinal, (mark, source) in sorted(provenance.items()))
+
+
+def collate_row(base_row, added_macrons):
+    """
+    Collates the macrons of the sources into a base row; added_macrons are (source, MacronSet or None) in order of precedence.
+    Returns the output row, with provenance, and the names of the sources that added macrons.
+    """
+    token_in, tag_in, lemma_in = (base_row + [''] * 3)[:3]
+    macron_out = base_row[3] if len(base_row) > 3 else ''
+    source_out = base_row[4] if len(base_row) > 4 else ''
+
+    macrons = parse_macrons(macron_out)
+    provenance = {ordinal: ('_' if macrons.longs >> ordinal & 1 else '^', source_out or 'base') for ordinal in macrons.positions()}
+
+    contributors = []
+    for name, added in added_macrons:
+        if added is None:
+            continue
+        updated = macrons | added
+        if updated != macrons:
+            for ordinal in updated.positions():
+                if ordinal not in macrons:
+                    provenance[ordinal] = ('_' if updated.longs >> ordinal & 1 else '^', name)
+            macrons = updated
+            macron_out = str(updated)
+            source_out = name
+            contributors.append(name)
+
+    return [token_in, tag_in, lemma_in, macron_out, source_out, format_provenance(provenance)], contributors
+
+
+def nfc_token(row):
+    return unicodedata.normalize('NFC', row[0].strip())
+
+
+def output_header(header):
+    return (header + [''] * 5)[:5] + ['provenance']
+
+
+def print_counts(counts):
+    for name, count in counts.items():
+        print(f"{Colors.GREEN}{name}: macrons added to {count} rows{Colors.ENDC}")
+
+
+def collate_sources(base_tsv_path, output_tsv_path, sources=SOURCES, has_header=True):
+    """
+    Collates the macrons of all sources into the rows of base_tsv_path (token, tag, lemma, and possibly macrons and source),
+    looking each token up in every source in order of precedence, and writes the rows with the provenance of each macron.
+    Returns the number of rows to which each source added macrons.
+    """
+    indices = [(name, load_source(path, macron_column)) for name, path, macron_column in sources]
+    counts = {name: 0 for name, path, macron_column in sources}
+
+    with open(base_tsv_path, 'r', encoding='utf-8') as base_file, \
+         open(output_tsv_path, 'w', newline='', encoding='utf-8') as output_file:
+        reader = csv.reader(base_file, delimiter='\t')
+        writer = csv.writer(output_file, delimiter='\t')
+
+        if has_header:
+            writer.writerow(output_header(next(reader)))
+
+        for base_row in reader:
+            if not base_row:
+                continue
+            token = nfc_token(base_row)
+            output_row, contributors = collate_row(base_row, [(name, index.get(token)) for name, index in indices])
+            for name in contributors:
+                counts[name] += 1
+            writer.writerow(output_row)
+
+    print_counts(counts)
+    return counts
+
+
+### STREAMING COLLATION
+
+
+def sorted_source(source_tsv, macron_column, chunk_rows, temp_dir):
+    """
+    (NFC token, MacronSet) of a source in token order, one per token: the last row, as in load_source.
+    """
+    with open(source_tsv, 'r', encoding='utf-8') as file:
+        rows = ([nfc_token(row), row[macron_column].strip()] for row in csv.reader(file, delimiter='\t') if len(row) > macron_column)
+        for token, group in groupby(external_sort(rows, key=lambda row: row[0], chunk_rows=chunk_rows, temp_dir=temp_dir), key=lambda row: row[0]):
+            for row in group:
+                last = row
+            yield token, parse_macrons(last[1])
+
+
+def collate_sources_streaming(base_tsv_path, output_tsv_path, sources=SOURCES, has_header=True, chunk_rows=100000, temp_dir=None):
+    """
+    Does what collate_sources does with at most about chunk_rows rows in memory, whatever the size of the files.
+    The base rows, numbered, and each source are sorted by NFC token (alphabetize_unicode.external_sort),
+    and walked together in a single merge pass, as in a merge join; the collated rows are then sorted back by number.
+    """
+    counts = {name: 0 for name, path, macron_column in sources}
+
+    with open(base_tsv_path, 'r', encoding='utf-8') as base_file, \
+         open(output_tsv_path, 'w', newline='', encoding='utf-8') as output_file:
+        reader = csv.reader(base_file, delimiter='\t')
+        writer = csv.writer(output_file, delimiter='\t')
+
+        if has_header:
+            writer.writerow(output_header(next(reader)))
+
+        # each base row as [NFC token, number, row...]
+        numbered_rows = ([nfc_token(row), str(number)] + row for number, row in enumerate(reader) if row)
+        sorted_rows = external_sort(numbered_rows, key=lambda row: row[0], chunk_rows=chunk_rows, temp_dir=temp_dir)
+
+        # one cursor per source, at its first token that is not smaller than the current base token
+        cursors = [[name, sorted_source(path, macron_column, chunk_rows, temp_dir), None] for name, path, macron_column in sources]
+        for cursor in cursors:
+            cursor[2] = next(cursor[1], None)
+
+        def merged_rows():
+            for row in sorted_rows:
+                token = row[0]
+                added_macrons = []
+                for cursor in cursors:
+                    while cursor[2] is not None and cursor[2][0] < token:
+                        cursor[2] = next(cursor[1], None)
+                    found = cursor[2] is not None and cursor[2][0] == token
+                    added_macrons.append((cursor[0], cursor[2][1] if found else None))
+                output_row, contributors = collate_row(row[2:], added_macrons)
+                for name in contributors:
+                    counts[name] += 1
+                yield [row[1]] + output_row
+
+        for row in external_sort(merged_rows(), key=lambda row: int(row[0]), chunk_rows=chunk_rows, temp_dir=temp_dir):
+            writer.writerow(row[1:])
+
+    print_counts(counts)
+    return counts
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Collate all sources of macrons into the token list in one pass.')
+    parser.add_argument('--base', default='macrons_empty.tsv', help='Token, tag, lemma TSV with a header.')
+    parser.add_argument('--output', default='macrons_wiki_hypo_ifth_lsj.tsv', help='Collated TSV, the input of macronize_pipeline.py.')
+    parser.add_argument('--db', default='macrons.db', help='macrons.db into which the collated rows are loaded.')
+    parser.add_argument('--streaming', action='store_true', help='Sort and merge instead of holding the sources in memory, for very large token lists.')
+    parser.add_argument('--chunk-rows', type=int, default=100000, help='Rows held in memory per sorted run in --streaming mode.')
+
+    args = parser.parse_args()
 
+    print_ascii_art()
+    if args.streaming:
+        collate_sources_streaming(args.base, args.output, chunk_rows=args.chunk_rows)
+    else:
+        collate_sources(args.base, args.output)
 
+    # The fully collated macrons are what macrons.db serves to the app and the algorithms
+    store = MacronStore(args.db)
+    print(f"{Colors.GREEN}Rows loaded into macrons.db: {store.import_tsv(args.output)}{Colors.ENDC}")
+    store.close()
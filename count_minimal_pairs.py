@@ -38,5 +38,7 @@ def find_minimal_pairs(input_file_path, output_file_path):
 
 #if __name__ == "__main__":
 #    main()
-        
-find_minimal_pairs('crawl/macrons_wiktionary.txt', 'crawl/minimal_pairs.txt')
+
+
+if __name__ == '__main__':
+    find_minimal_pairs('crawl/macrons_wiktionary.txt', 'crawl/minimal_pairs.txt')
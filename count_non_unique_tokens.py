@@ -36,4 +36,6 @@ def count_non_unique_tokens(input_file_path):
 #if __name__ == "__main__":
 #    main()
 
-count_non_unique_tokens('prepare_tokens/tokens/tokens.txt')
\ No newline at end of file
+
+if __name__ == '__main__':
+    count_non_unique_tokens('prepare_tokens/tokens/tokens.txt')
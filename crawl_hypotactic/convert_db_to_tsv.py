@@ -27,9 +27,11 @@ def export_sql_to_tsv(db_path, table_name, output_file_path, macrons_column_inde
 
     print(f"Data successfully written to {output_file_path}")
 
-# Example usage:
-db_path = 'crawl_hypotactic/macrons_hypotactic.db'  # Path to the SQLite database
-table_name = 'annotated_tokens'  # Table to export
-output_file_path = 'macrons_hypotactic.tsv'  # TSV output file path
-macrons_column_index = 4  # Index of the 'macrons' column, the fifth column out of five
-export_sql_to_tsv(db_path, table_name, output_file_path, macrons_column_index)
\ No newline at end of file
+
+if __name__ == '__main__':
+    # Example usage:
+    db_path = 'crawl_hypotactic/macrons_hypotactic.db'  # Path to the SQLite database
+    table_name = 'annotated_tokens'  # Table to export
+    output_file_path = 'macrons_hypotactic.tsv'  # TSV output file path
+    macrons_column_index = 4  # Index of the 'macrons' column, the fifth column out of five
+    export_sql_to_tsv(db_path, table_name, output_file_path, macrons_column_index)
@@ -128,29 +128,14 @@ def open_syllable_with_real_dichrona(syllable):
 ###
 
 
-def collate_metrical_information(db_path, token):
+def annotate_metrical_patterns(metrical_patterns):
     """
-    Fetches and analyzes metrical patterns for a given token from the SQLite database.
-    metrical_patterns.db entries look like this:
-    token   metrical_pattern
-        ὦ	    ὦ_
-        παῖ,	παῖ,_
-        τέλος	τέ^,λος_
-    Returned annotated_positions is a list of length + position like ['^1', '_4']
+    Collates the metrical patterns found for one token, in the order they were stored.
+    Returns None if there are none or if their metrical indicators disagree,
+    otherwise the annotated positions of the DICHRONA, read off the last pattern.
     """
-    # Connect to the database and fetch metrical patterns for the token
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT metrical_pattern FROM metrical_patterns WHERE token = ?", (token,))
-        rows = cursor.fetchall()
-
-    # Parse the fetched metrical patterns
-    all_matches = []
-    for row in rows:
-        # Split each metrical pattern string into a list of syllables and indicators
-        metrical_pattern = row[0].split(',')
-        syllables_with_indicators = [syll[-1] for syll in metrical_pattern]  # Extracting metrical indicators
-        all_matches.append(syllables_with_indicators)
+    # Split each metrical pattern string into a list of syllables and extract the metrical indicators
+    all_matches = [[syll[-1] for syll in metrical_pattern.split(',')] for metrical_pattern in metrical_patterns]
 
     # Immediate return if all_matches is empty
     if not all_matches:
@@ -162,10 +147,9 @@ def collate_metrical_information(db_path, token):
 
     # If all metrical patterns are consistent, prepare to annotate DICHRONA positions
     annotated_positions = []
-    full_word = ''.join(syll[:-1] for syll in row[0].split(','))  # Reconstruct the full word without indicators
     current_position = 1
 
-    for syll in row[0].split(','):
+    for syll in metrical_patterns[-1].split(','):
         syllable, indicator = syll[:-1], syll[-1]  # Split syllable from its indicator
         for char in syllable:
             if char in DICHRONA:
@@ -176,6 +160,38 @@ def collate_metrical_information(db_path, token):
     return annotated_positions
 
 
+def collate_metrical_information(db_path, token):
+    """
+    Fetches and analyzes metrical patterns for a given token from the SQLite database.
+    metrical_patterns.db entries look like this:
+    token   metrical_pattern
+        ὦ	    ὦ_
+        παῖ,	παῖ,_
+        τέλος	τέ^,λος_
+    Returned annotated_positions is a list of length + position like ['^1', '_4']
+    For whole token lists, macronize_tokens uses load_metrical_patterns instead of calling this per token.
+    """
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT metrical_pattern FROM metrical_patterns WHERE token = ? ORDER BY id", (token,))
+        rows = cursor.fetchall()
+
+    return annotate_metrical_patterns([row[0] for row in rows])
+
+
+def load_metrical_patterns(db_path):
+    """
+    Reads metrical_patterns.db in one query and groups the patterns by token,
+    in the order they were stored, e.g. {'τέλος': ['τέ^,λος_', 'τέ^,λος_'], ...}
+    """
+    metrical_patterns = {}
+    with sqlite3.connect(db_path) as conn:
+        for token, metrical_pattern in conn.execute("SELECT token, metrical_pattern FROM metrical_patterns ORDER BY token, id"):
+            metrical_patterns.setdefault(token, []).append(metrical_pattern)
+
+    return metrical_patterns
+
+
 def get_syllable_spans(list_of_syllables):
     """
     Returns a list of tuples, each representing the start and end character positions of a syllable
@@ -245,65 +261,67 @@ def create_output_database(db_path):
         conn.commit()
 
 
-# Configure logging
-logging.basicConfig(filename='crawl_hypotactic/crawl_hypotactic.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-
 def macronize_tokens(input_db_path, output_db_path, input_tsv_path):
     """
-    Processes tokens to filter those that can be disambiguated metrically, queries for their metrical patterns,
+    Processes tokens to filter those that can be disambiguated metrically, looks up their metrical patterns,
     and stores the results in the output database, including token, tag, lemma, and macrons.
+    All metrical patterns are loaded into memory at once, and the results are inserted in a single transaction.
     """
     total_tokens = 0
     macronized_tokens = 0
+    annotated_rows = []
 
     # Ensure the output database is set up
     create_output_database(output_db_path)
-    
-    with sqlite3.connect(input_db_path) as input_conn, sqlite3.connect(output_db_path) as output_conn:
-        input_cursor = input_conn.cursor()
-        output_cursor = output_conn.cursor()
-
-        with open(input_tsv_path, 'r', encoding='utf-8') as infile:
-            lines = infile.readlines()
-
-        # Wrap the line processing with tqdm for progress indication
-        for line in tqdm(lines, desc="Processing tokens", total=len(lines)):
-            parts = line.strip().split('\t')
-            if len(parts) >= 3:  # Ensure there are enough parts
-                total_tokens += 1
-                token, tag, lemma = parts[0], parts[1], parts[2]
-                list_of_syllables = syllabifier(token)
-
-                # Check if any syllable in the token meets the criteria for filtering
-                if any(open_syllable_with_real_dichrona(syllable) for syllable in list_of_syllables):
-                    # Fetch consistent metrical annotations for the token
-                    consistent_metrical_annotations = collate_metrical_information(input_db_path, token)
-                    
-                    # Proceed to filter these annotations based on syllable criteria
-                    if consistent_metrical_annotations:
-                        filtered_annotations = filter_syllables(consistent_metrical_annotations, token)
-                        if filtered_annotations:
-                            # Insert the token, tag, lemma, and filtered macrons into the output database
-                            output_cursor.execute('INSERT INTO annotated_tokens (token, tag, lemma, macrons) VALUES (?, ?, ?, ?)', 
-                                                  (token, tag, lemma, ','.join(filtered_annotations)))
-                            output_conn.commit()
-                            macronized_tokens += 1
-                        else:
-                            logging.info(f"Filtered all metrical information for token: {token}")
+
+    metrical_patterns = load_metrical_patterns(input_db_path)
+
+    with open(input_tsv_path, 'r', encoding='utf-8') as infile:
+        lines = infile.readlines()
+
+    # Wrap the line processing with tqdm for progress indication
+    for line in tqdm(lines, desc="Processing tokens", total=len(lines)):
+        parts = line.strip().split('\t')
+        if len(parts) >= 3:  # Ensure there are enough parts
+            total_tokens += 1
+            token, tag, lemma = parts[0], parts[1], parts[2]
+            list_of_syllables = syllabifier(token)
+
+            # Check if any syllable in the token meets the criteria for filtering
+            if any(open_syllable_with_real_dichrona(syllable) for syllable in list_of_syllables):
+                # Collate the consistent metrical annotations for the token
+                consistent_metrical_annotations = annotate_metrical_patterns(metrical_patterns.get(token, []))
+
+                # Proceed to filter these annotations based on syllable criteria
+                if consistent_metrical_annotations:
+                    filtered_annotations = filter_syllables(consistent_metrical_annotations, token)
+                    if filtered_annotations:
+                        annotated_rows.append((token, tag, lemma, ','.join(filtered_annotations)))
+                        macronized_tokens += 1
                     else:
-                        logging.info(f"No consistent metrical information found for token: {token}")
+                        logging.info(f"Filtered all metrical information for token: {token}")
                 else:
-                    logging.info(f"No syllable meets criteria for token: {token}")
-                    
+                    logging.info(f"No consistent metrical information found for token: {token}")
+            else:
+                logging.info(f"No syllable meets criteria for token: {token}")
+
+    # Insert the token, tag, lemma, and filtered macrons into the output database
+    with sqlite3.connect(output_db_path) as output_conn:
+        output_conn.executemany('INSERT INTO annotated_tokens (token, tag, lemma, macrons) VALUES (?, ?, ?, ?)', annotated_rows)
+        output_conn.commit()
+
     # Calculate and print the metrics
     percentage = (macronized_tokens / total_tokens) * 100 if total_tokens > 0 else 0
     logging.info(f"{Colors.RED}Tokens metrically macronized: {macronized_tokens}, which is {percentage:.2f}% of total tokens{Colors.ENDC}")
     print(f"{Colors.RED}Tokens metrically macronized: {macronized_tokens}, which is {percentage:.2f}% of total tokens{Colors.ENDC}")
 
 
-# Example usage
-input_db_path = 'crawl_hypotactic/metrical_patterns.db'
-output_db_path = 'crawl_hypotactic/macrons_hypotactic.db'
-input_tsv_path = 'prepare_tokens/tokens/tokens.txt'
-macronize_tokens(input_db_path, output_db_path, input_tsv_path)
\ No newline at end of file
+if __name__ == '__main__':
+    # Configure logging
+    logging.basicConfig(filename='crawl_hypotactic/crawl_hypotactic.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Example usage
+    input_db_path = 'crawl_hypotactic/metrical_patterns.db'
+    output_db_path = 'crawl_hypotactic/macrons_hypotactic.db'
+    input_tsv_path = 'prepare_tokens/tokens/tokens.txt'
+    macronize_tokens(input_db_path, output_db_path, input_tsv_path)
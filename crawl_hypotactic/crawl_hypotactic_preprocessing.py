@@ -1,12 +1,49 @@
-import concurrent.futures
-from bs4 import BeautifulSoup
+'''
+Parses the scanned verse of the Hypotactic HTML files into metrical_patterns.db:
+one row per word, e.g. ('Κύπριδος,', 'Κύ_,πρι^,δος,^').
+
+The files are parsed in a pool of processes, and the main process is the only one writing to the database:
+it inserts the words of each file with executemany, all files in one transaction.
+
+The ingest is incremental: the table ingested_files records the sha256 of each file and the ids of its rows,
+so a re-run only parses the files that are new or have changed (whose old rows are deleted first),
+and deletes the rows of files that are no longer in the folder. Adding a text costs the parse of that one file.
+
+The words are extracted with extract_metrical_patterns, a streaming scan of the tags (no parse tree), since the markup
+of a word is always the same:
+    <span class="word"><span class="syll long">Κύ</span><span class="syll short">πρι</span><span class="syll short">δος,</span></span>
+It gives the same rows as the BeautifulSoup version it replaced (extract_metrical_patterns_soup):
+the text of every span in the word, long if its class has "long" and short otherwise.
+The few files with malformed words (a word span left unclosed, so that the next word is inside it) are still parsed
+with BeautifulSoup, whose way of repairing the markup the rows of those files depend on.
+'''
+
 import os
+import re
+import html
 import sqlite3
+import hashlib
+import concurrent.futures
 from tqdm import tqdm
 
+# tags, comments etc., or the text between them
+markup_pattern = re.compile(r'<(/?)([a-zA-Z][^\s/>]*)([^>]*)>|<[^>]*>|([^<]+)')
+class_pattern = re.compile(r'''\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''')
+word_start_pattern = re.compile(r'''<span\b[^>]*\bclass\s*=\s*["']?[^"'>]*\bword\b''')
+
+
+def classes(attributes):
+    match = class_pattern.search(attributes)
+    if not match:
+        return []
+    return (match.group(1) or match.group(2) or match.group(3) or '').split()
+
+
 def create_database(db_path):
     """
-    Creates a SQLite database with the necessary table for storing tokens and their metrical patterns.
+    Creates a SQLite database with the necessary table for storing tokens and their metrical patterns,
+    and the manifest of the files they come from.
+    A database made before the manifest existed is emptied, since its rows cannot be traced to their files.
     """
     with sqlite3.connect(db_path) as conn:
         cursor = conn.cursor()
@@ -17,45 +54,164 @@ def create_database(db_path):
             metrical_pattern TEXT NOT NULL
         )
         ''')
+        # indexes the tokens for crawl_hypotactic_db.collate_metrical_information, here so that its reader never writes to the database
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_metrical_patterns_token ON metrical_patterns (token)')
+        has_manifest = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ingested_files'").fetchone()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ingested_files (
+            file TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            first_id INTEGER,
+            last_id INTEGER
+        )
+        ''')
+        if not has_manifest and cursor.execute('SELECT 1 FROM metrical_patterns LIMIT 1').fetchone():
+            print("No manifest of ingested files; the existing rows are deleted and every file is parsed anew.")
+            cursor.execute('DELETE FROM metrical_patterns')
         conn.commit()
     print("Database created and initialized.")
 
-def process_html_file(file_path, db_path):
+
+def sha256_file(file_path):
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def delete_file_rows(cursor, file_name):
+    """
+    Deletes the rows of a file, and the file from the manifest.
+    """
+    found = cursor.execute('SELECT first_id, last_id FROM ingested_files WHERE file = ?', (file_name,)).fetchone()
+    if found and found[0] is not None:
+        cursor.execute('DELETE FROM metrical_patterns WHERE id BETWEEN ? AND ?', found)
+    cursor.execute('DELETE FROM ingested_files WHERE file = ?', (file_name,))
+
+
+def format_word(syllables):
+    '''
+    [('Κύ', 'long'), ('πρι', 'short')] => ('Κύπρι', 'Κύ_,πρι^')
+    '''
+    reconstructed_word = ''.join(syll[0] for syll in syllables)
+    metrical_pattern = ','.join(syll[0] + ('_' if syll[1] == 'long' else '^') for syll in syllables)
+    return reconstructed_word, metrical_pattern
+
+
+def extract_metrical_patterns(html_content):
     """
-    Processes a single HTML file, extracts metrical patterns, and inserts them into the database.
-    Each thread uses its own database connection.
+    (word, metrical pattern) of every element with the class "word", in document order.
+    Returns None for a file in which a word is opened inside another, for which see extract_metrical_patterns_soup.
     """
     word_data = []
-    with open(file_path, 'r', encoding='utf-8') as file:
-        html_content = file.read()
+    position = 0
+    while True:
+        word_start = word_start_pattern.search(html_content, position)
+        if not word_start:
+            return word_data
+
+        # scan from the word's opening tag to its closing tag, keeping the text of each span that is open
+        open_spans = []  # [text parts, 'long' or 'short'] of the spans inside the word that are open, innermost last
+        syllables = []
+        depth = 0
+        for match in markup_pattern.finditer(html_content, word_start.start()):
+            closing, tag_name, attributes, text = match.groups()
+            if text is not None:
+                text = html.unescape(text)
+                for span in open_spans:
+                    span[0].append(text)
+            elif tag_name is None or tag_name.lower() != 'span' or attributes.endswith('/'):
+                continue  # comments and other tags; the words consist only of spans
+            elif not closing:
+                depth += 1
+                if depth > 1:
+                    span_classes = classes(attributes)
+                    if 'word' in span_classes:
+                        return None  # an unclosed word, which BeautifulSoup resolves in its own way
+                    span = [[], 'long' if 'long' in span_classes else 'short']
+                    open_spans.append(span)
+                    syllables.append(span)
+            else:
+                depth -= 1
+                if depth == 0:
+                    break
+                open_spans.pop()
+        position = match.end()
+
+        word_data.append(format_word([(''.join(parts), length) for parts, length in syllables]))
+
+
+def extract_metrical_patterns_soup(html_content):
+    """
+    The BeautifulSoup version of extract_metrical_patterns, about 12 times slower.
+    bs4 is only imported for the few files that need it.
+    """
+    from bs4 import BeautifulSoup
+
+    word_data = []
     soup = BeautifulSoup(html_content, 'html.parser')
-    
     for word_div in soup.find_all(class_="word"):
         syllables = [(syll.text, 'long' if 'long' in syll.get('class', []) else 'short') for syll in word_div.find_all('span')]
-        reconstructed_word = ''.join(syll[0] for syll in syllables)
-        formatted_syllables = [[syll[0], '_' if syll[1] == 'long' else '^'] for syll in syllables]
-        metrical_pattern = ','.join([''.join(pair) for pair in formatted_syllables])
-        word_data.append((reconstructed_word, metrical_pattern))
-    
-    # Insert data into the database
+        word_data.append(format_word(syllables))
+    return word_data
+
+
+def process_html_file(file_path):
+    """
+    Extracts the metrical patterns of a single HTML file. Runs in a worker process, and returns the rows to the writer.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        html_content = file.read()
+    word_data = extract_metrical_patterns(html_content)
+    if word_data is None:
+        word_data = extract_metrical_patterns_soup(html_content)
+    return word_data
+
+
+def preprocess_html_files_and_store_parallel(folder_path, db_path, max_workers=None):
+    """
+    Parses the new and changed HTML files in a pool of max_workers processes (default: one per core) and stores the metrical patterns.
+    The files are processed in alphabetical order, and their rows are inserted in that order by this process alone,
+    in one transaction, so the ids of metrical_patterns are the same on every full run.
+    Each file's rows get consecutive ids, which are recorded in ingested_files together with the file's sha256.
+    """
+    file_names = sorted(f for f in os.listdir(folder_path) if f.endswith('.html'))
+    hashes = {file_name: sha256_file(os.path.join(folder_path, file_name)) for file_name in file_names}
+
     with sqlite3.connect(db_path) as conn:
         cursor = conn.cursor()
-        cursor.executemany('INSERT INTO metrical_patterns (token, metrical_pattern) VALUES (?, ?)', word_data)
+        ingested = dict(cursor.execute('SELECT file, sha256 FROM ingested_files'))
+        to_parse = [file_name for file_name in file_names if ingested.get(file_name) != hashes[file_name]]
+        removed = [file_name for file_name in ingested if file_name not in hashes]
+        print(f"{len(to_parse)} new or changed files to parse, {len(file_names) - len(to_parse)} unchanged, {len(removed)} removed.")
+
+        # stale rows: those of changed files and of files that are gone
+        for file_name in removed + [file_name for file_name in to_parse if file_name in ingested]:
+            delete_file_rows(cursor, file_name)
+
+        if to_parse:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                html_files = [os.path.join(folder_path, file_name) for file_name in to_parse]
+                # Use tqdm to display progress
+                results = tqdm(executor.map(process_html_file, html_files), total=len(html_files), desc="Processing HTML files in parallel")
+                for file_name, word_data in zip(to_parse, results):
+                    first_id = (cursor.execute('SELECT MAX(id) FROM metrical_patterns').fetchone()[0] or 0) + 1
+                    cursor.executemany('INSERT INTO metrical_patterns (id, token, metrical_pattern) VALUES (?, ?, ?)',
+                                       [(first_id + i, token, pattern) for i, (token, pattern) in enumerate(word_data)])
+                    last_id = first_id + len(word_data) - 1 if word_data else None
+                    cursor.execute('INSERT INTO ingested_files (file, sha256, first_id, last_id) VALUES (?, ?, ?, ?)',
+                                   (file_name, hashes[file_name], first_id if word_data else None, last_id))
         conn.commit()
 
-def preprocess_html_files_and_store_parallel(folder_path, db_path):
+
+def ingest_html_files(folder_path, db_path, max_workers=None):
     """
-    Processes HTML files in parallel to store metrical patterns using individual database connections for each thread.
+    Brings the database up to date with the HTML files in the folder.
     """
-    html_files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith('.html')]
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(process_html_file, file_path, db_path) for file_path in html_files]
-        # Use tqdm to display progress
-        for _ in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Processing HTML files in parallel"):
-            pass
+    create_database(db_path)  # Ensure the database is initialized before processing
+    preprocess_html_files_and_store_parallel(folder_path, db_path, max_workers)
+
 
-db_path = 'crawl_hypotactic/metrical_patterns.db'
-folder_path = 'crawl_hypotactic/hypotactic_htmls_greek'
+if __name__ == '__main__':
+    db_path = 'crawl_hypotactic/metrical_patterns.db'
+    folder_path = 'crawl_hypotactic/hypotactic_htmls_greek'
 
-create_database(db_path)  # Ensure the database is initialized before processing
-preprocess_html_files_and_store_parallel(folder_path, db_path)
+    ingest_html_files(folder_path, db_path)
@@ -19,13 +19,8 @@ Only 3183 lines have macrons from ifthimos.
 import csv
 import re
 
-from greek_accentuation.characters import length, base
-
-from utils import only_bases, base_alphabet
-from crawl_wiktionary.macrons_map import macrons_map
-
-
-LONG = '̄'
+from utils import only_bases
+from greek_characters import strip_length_marks
 
 
 ### INITIAL AUXILIARIES
@@ -33,13 +28,11 @@ LONG = '̄'
 
 def strip_length_string(string):
     '''
-    Strips the input string of all length diacritics using the macrons_map dictionary.
+    Strips the input string of all length diacritics (see greek_characters.strip_length_marks, which replaced the macrons_map loop).
     >>> strip_length_string('ᾰᾸᾱᾹῐῘῑῙῠῨῡῩᾰ̓Ᾰ̓ᾰ̔Ᾰ̔ᾰ́ᾰ̀ᾱ̓Ᾱ̓ᾱ̔Ᾱ̔ᾱ́ᾱ̀ᾱͅῐ̓Ῐ̓ῐ̔Ῐ̔ῐ́ῐ̀ῐ̈ῑ̓Ῑ̓ῑ̔Ῑ̔ῑ́ῑ̈ῠ̓ῠ̔Ῠ̔ῠ́ῠ̀ῠ͂ῠ̈ῠ̒ῡ̔Ῡ̔ῡ́ῡ̈')
     >>> αΑαΑιΙιΙυΥυΥἀἈἁἉάὰἀἈἁἉάὰᾳἰἸἱἹίὶϊἰἸἱἹίϊὐὑὙύὺῦϋυ̒ὑὙύϋ
     '''
-    for composite, replacement in macrons_map.items():
-        string = string.replace(composite, replacement)
-    return string
+    return strip_length_marks(string)[0]
 
 
 def process_word(word):
@@ -47,17 +40,9 @@ def process_word(word):
     Processes each word to identify vowel length markers and create a TSV format.
     '''
     
-    modifications = []
-    i = 1  # Initialize character position counter
-    for char in word:
-        if re.search(base_alphabet, base(char)):
-            char_length = length(char)
-            if char_length == LONG:
-                modifications.append(f"_{i}")
-            i += 1  # Only increment for non-length marking characters
-
-    processed_word = strip_length_string(word)
-    return processed_word, modifications
+    processed_word, modifications = strip_length_marks(word)
+    # ifthimos only marks long vowels
+    return processed_word, [modification for modification in modifications if modification[0] == '_']
 
 
 def placements_alpha(line):
@@ -321,7 +306,9 @@ print(f'Should be 6: {format_placement_output('δωματῖτιν	n-s---fa-	δ
 print(f'Should be 1 and 3: {format_placement_output('ᾄξας	n-p---fa-	ᾄξη	ᾱᾱ')}')
 '''
 
-# Example usage
-input_file_path = 'macrons_ifthimos_raw_filter.tsv'
-output_file_path = 'macrons_ifthimos.tsv'
-process_tsv_file(input_file_path, output_file_path)
+
+if __name__ == '__main__':
+    # Example usage
+    input_file_path = 'macrons_ifthimos_raw_filter.tsv'
+    output_file_path = 'macrons_ifthimos.tsv'
+    process_tsv_file(input_file_path, output_file_path)
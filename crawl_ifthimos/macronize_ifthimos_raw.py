@@ -2,87 +2,125 @@
 Create a tsv dictionary from ifthimos with the raw unformatted macron info
 '''
 
+import os
+import sys
 import csv
+import json
+import queue
 import subprocess
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from crawl_journal import CrawlJournal, journal_path_for
 
-def call_ifthimos_macronizer(token, pos):
+# ruby driver that keeps macronize.rb compiled, with its data loaded, and answers token/POS pairs over stdin/stdout
+worker_script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'macronize_worker.rb')
+
+
+class IfthimosWorker:
     '''
-    >>token = 'ἄγνυμι'
-    >>pos = 'v1spia---'
-    >>call_ifthimos_macronizer(token, pos)
-    >>ῡ
+    A long-lived ruby process running macronize_worker.rb, so that ruby and the ifthimos data
+    are loaded once instead of once per token by `ruby macronize.rb token pos`.
+    >>worker = IfthimosWorker()
+    >>worker.macronize_batch([('ἄγνυμι', 'v1spia---'), ('εὐδρακής', 'a-s---mn-')])
+    >>['ῡ', '']
+    >>worker.close()
     '''
-    ifthimos_folder_path = 'ifthimos'
-    # Adjust the command to call the Ruby script from within its directory
-    command = ['ruby', 'macronize.rb', token, pos]
-    # Use the cwd parameter to set the current working directory to the ifthimos subfolder
-    result = subprocess.run(command, capture_output=True, text=True, cwd=ifthimos_folder_path)
-
-    if result.returncode == 0:
-        output = result.stdout.strip()
-        if output == "No match":
-            #print(f"No macronization information found for {token}")
-            return ''
-        else:
-            return output
-    else:
-        print("Error calling ifthimos_macronizer:", result.stderr)
-        return ''
-
-#token = 'εὐδρακής'
-#pos = 'a-s---mn-'
-#print(call_ifthimos_macronizer(token, pos))
-
-#token = 'ἄγνυμι'
-#pos = 'v1spia---'
-#print(call_ifthimos_macronizer(token, pos))
-
-
-def process_row(row):
+    def __init__(self, ifthimos_folder_path='ifthimos'):
+        self.process = subprocess.Popen(['ruby', worker_script_path], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, encoding='utf-8', bufsize=1, cwd=ifthimos_folder_path)
+
+    def macronize_batch(self, pairs):
+        '''
+        Sends all (token, pos) pairs before reading the answers, which come back one line each and in order.
+        Returns the macrons as macronize.rb prints them, stripped, and '' for "No match" and for errors.
+        Batches should be kept small (see process_tsv), so that the answers fit in the pipe while the requests are written.
+        '''
+        self.process.stdin.write(''.join(f"{token}\t{pos}\n" for token, pos in pairs))
+        self.process.stdin.flush()
+
+        macrons = []
+        for token, pos in pairs:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"ifthimos worker exited with code {self.process.poll()}")
+            status, output = json.loads(line)
+            output = output.strip()
+            if status != 'ok':
+                print(f"Error calling ifthimos_macronizer for {token}:", output)
+                macrons.append('')
+            elif output == "No match":
+                macrons.append('')
+            else:
+                macrons.append(output)
+        return macrons
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass  # the worker has already died, and the error was raised by macronize_batch
+        self.process.wait()
+
+
+def pad_row(row):
     '''
-    Process a single row from the TSV file.
-    If the row has fewer than 4 columns, it appends empty strings to ensure there is space for the macron.
+    If the row has fewer than 4 columns, appends empty strings to ensure there is space for the macron.
     '''
-    # Ensure the row has at least 4 columns
     while len(row) < 4:
         row.append('')  # Append empty strings if fewer than 4 columns exist
-
-    if len(row) >= 3:
-        token, tag, lemma = row[0], row[1], row[2]
-        macron = call_ifthimos_macronizer(token, tag)
-        row[3] = macron  # Set macron explicitly in the fourth column
-
     return row
 
 
-def process_tsv(input_file_path, output_file_path, max_workers=10):
+def process_tsv(input_file_path, output_file_path, max_workers=10, batch_size=64):
     '''
-    Process a TSV file to add macron information using the ifthimos macronizer with parallel processing.
-    Reads the file using csv, processes each row with parallelization, except for the header,
-    and then writes the modified rows back to a new TSV file including the unmodified header.
+    Process a TSV file to add macron information using the ifthimos macronizer.
+    Reads the file using csv, sends the rows except for the header in batches to a pool of max_workers
+    long-lived IfthimosWorkers, and then writes the modified rows back to a new TSV file including the unmodified header.
+    Each finished batch is checkpointed in a CrawlJournal, so an interrupted run only redoes the rows that were not finished.
     '''
     with open(input_file_path, 'r', encoding='utf-8', newline='') as infile:
         reader = csv.reader(infile, delimiter='\t')
         header = next(reader)  # Read the first line separately as the header
-        rows = list(reader)  # Read the rest of the data
-
-    # Initialize ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Wrap the executor with tqdm for progress bar
-        results = list(tqdm(executor.map(process_row, rows), total=len(rows), desc="Processing rows"))
-
-    # Write results to output file, including the header
-    with open(output_file_path, 'w', newline='', encoding='utf-8') as outfile:
-        writer = csv.writer(outfile, delimiter='\t')
-        writer.writerow(header)  # Write the header first
-        for row in results:
-            writer.writerow(row)
-
-
-# Example usage
-input_tsv_path = 'macrons_empty.tsv'  # Path to your input TSV file
-output_tsv_path = 'macrons_ifthimos_raw.tsv'  # Path to the output TSV file
-process_tsv(input_tsv_path, output_tsv_path)
\ No newline at end of file
+        rows = [pad_row(row) for row in reader]  # Read the rest of the data
+
+    journal = CrawlJournal(journal_path_for(output_file_path), input_file_path)
+    pending = journal.pending(rows)
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    # Idle workers wait in the queue; each thread takes one for the duration of a batch
+    workers = queue.Queue()
+    for _ in range(max_workers):
+        workers.put(IfthimosWorker())
+
+    def process_batch(batch):
+        worker = workers.get()
+        try:
+            # Rows are padded to 4 columns, so the token is row[0] and the tag row[1]
+            for (row_index, row), macron in zip(batch, worker.macronize_batch([(row[0], row[1]) for row_index, row in batch])):
+                row[3] = macron  # Set macron explicitly in the fourth column
+        finally:
+            workers.put(worker)
+        return batch
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+             tqdm(total=len(rows), initial=len(rows) - len(pending), desc="Processing rows") as progress:
+            for batch in executor.map(process_batch, batches):
+                journal.record_many(batch)
+                progress.update(len(batch))
+    finally:
+        while not workers.empty():
+            workers.get().close()
+
+    # Write results to output file, including the header, in the order of the input
+    journal.write_tsv(output_file_path, header)
+    journal.close()
+
+
+if __name__ == '__main__':
+    # Example usage
+    input_tsv_path = 'macrons_empty.tsv'  # Path to your input TSV file
+    output_tsv_path = 'macrons_ifthimos_raw.tsv'  # Path to the output TSV file
+    process_tsv(input_tsv_path, output_tsv_path)
@@ -0,0 +1,48 @@
+# Long-lived counterpart of ifthimos' macronize.rb, driven by crawl_ifthimos/macronize_ifthimos_raw.py
+#
+# Reads one "token\tpos" request per line from stdin and answers each with one JSON array per line on stdout:
+#     ["ok", <what `ruby macronize.rb token pos` would have printed>]
+#     ["error", <message>]
+# It has to be started from within the ifthimos folder, like macronize.rb.
+# macronize.rb is a script, not a library, so its top level has to run again for each token (it reads ARGV),
+# but it is parsed and compiled only once; everything it pulls in with require (tinycus, genos and their data)
+# is loaded on the first request only.
+#
+# The answers are written to a copy of the original stdout, and file descriptor 1 itself is redirected to a
+# temporary file, so that whatever macronize.rb prints, through $stdout, STDOUT or a child process, is captured
+# as its output and cannot corrupt the protocol.
+
+require 'json'
+require 'tempfile'
+
+$stdin.set_encoding('UTF-8')
+protocol = STDOUT.dup
+protocol.set_encoding('UTF-8')
+protocol.sync = true
+
+captured = Tempfile.new('macronize_worker')
+STDOUT.reopen(captured)
+STDOUT.sync = true
+
+$0 = 'macronize.rb'
+program = RubyVM::InstructionSequence.compile_file('macronize.rb')
+
+$stdin.each_line do |line|
+  token, pos = line.chomp.split("\t", 2)
+  begin
+    captured.truncate(0)
+    captured.rewind
+    ARGV.replace([token, pos].compact)
+    begin
+      program.eval
+    rescue SystemExit => e
+      raise "macronize.rb exited with status #{e.status}" unless e.success?
+    end
+    $stdout = STDOUT  # in case macronize.rb reassigned it
+    STDOUT.flush
+    protocol.puts JSON.generate(['ok', File.read(captured.path, encoding: 'UTF-8')])
+  rescue StandardError, ScriptError => e
+    $stdout = STDOUT
+    protocol.puts JSON.generate(['error', e.message])
+  end
+end
@@ -0,0 +1,97 @@
+'''
+/crawl_journal.py
+
+Checkpoints for the long harvests (crawl_lsj/crawl_lsj_thread.py, crawl_ifthimos/macronize_ifthimos_raw.py),
+so that a crash at 90% costs only the batch in flight, not the 90%.
+
+A CrawlJournal is a small SQLite database next to the output file (output + '.journal.db') with one row per finished input row,
+keyed by its index in the input file. The scripts
+    1. skip the indices already in the journal (pending),
+    2. record each batch of finished rows in one transaction as it completes (record_many),
+    3. write the output TSV from the journal in input order once all rows are done (write_tsv),
+so that the output is the same as that of an uninterrupted run. The journal is kept after that;
+delete it to harvest afresh.
+
+The journal remembers the sha256 of the input file, and refuses to resume with a different input.
+The rows finished so far can be read at any time, also while the harvest is running:
+    sqlite3 macrons_ifthimos_raw.tsv.journal.db "SELECT row FROM finished_rows ORDER BY row_index"
+or written to a TSV of their own with CrawlJournal(...).write_tsv(path, header).
+'''
+
+import csv
+import json
+import sqlite3
+import hashlib
+
+from utils import Colors
+
+
+def sha256_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def journal_path_for(output_path):
+    return f"{output_path}.journal.db"
+
+
+class CrawlJournal:
+    def __init__(self, journal_path, input_path):
+        self.journal_path = journal_path
+        self.conn = sqlite3.connect(journal_path)
+        with self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')  # so that the rows can be read while the harvest writes
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS finished_rows (row_index INTEGER PRIMARY KEY, row TEXT NOT NULL)')
+
+        input_sha256 = sha256_file(input_path)
+        found = self.conn.execute("SELECT value FROM meta WHERE key = 'input_sha256'").fetchone()
+        if found is None:
+            with self.conn:
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('input_sha256', ?)", (input_sha256,))
+        elif found[0] != input_sha256:
+            self.conn.close()
+            raise ValueError(f"{journal_path} was made for another version of {input_path}; delete it to start over")
+
+    def finished_indices(self):
+        return {row_index for (row_index,) in self.conn.execute('SELECT row_index FROM finished_rows')}
+
+    def pending(self, rows):
+        '''
+        (index, row) of the rows that are not in the journal yet.
+        '''
+        finished = self.finished_indices()
+        if finished:
+            print(f"{Colors.GREEN}Resuming from {self.journal_path}: {len(finished)} of {len(rows)} rows already done{Colors.ENDC}")
+        return [(row_index, row) for row_index, row in enumerate(rows) if row_index not in finished]
+
+    def record_many(self, indexed_rows):
+        '''
+        Records (index, row) pairs as finished, in one transaction.
+        '''
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO finished_rows (row_index, row) VALUES (?, ?)',
+                                  [(row_index, json.dumps(row, ensure_ascii=False)) for row_index, row in indexed_rows])
+
+    def finished_rows(self):
+        '''
+        The finished rows in input order.
+        '''
+        for (row,) in self.conn.execute('SELECT row FROM finished_rows ORDER BY row_index'):
+            yield json.loads(row)
+
+    def write_tsv(self, output_path, header=None):
+        '''
+        Writes the finished rows in input order, after the header if there is one.
+        '''
+        with open(output_path, 'w', encoding='utf-8', newline='') as outfile:
+            writer = csv.writer(outfile, delimiter='\t')
+            if header is not None:
+                writer.writerow(header)
+            writer.writerows(self.finished_rows())
+
+    def close(self):
+        self.conn.close()
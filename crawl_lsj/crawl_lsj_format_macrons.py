@@ -30,18 +30,11 @@ def filter_non_empty_fourth_column(input_file_path, output_file_path):
 
 ### crawl_format_macrons logic adapted to a four-column tsv input 
 
-import re
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from greek_accentuation.characters import length, base
-
-from utils import base_alphabet
-from macrons_map import macrons_map
-
-SHORT = '̆'
-LONG = '̄'
+from greek_characters import strip_length_marks
 
 # Define length_count as a global dictionary
 length_count = {'long': 0, 'short': 0}
@@ -49,13 +42,11 @@ length_count = {'long': 0, 'short': 0}
 
 def strip_length_string(string):
     '''
-    Strips the input string of all length diacritics using the macrons_map dictionary.
+    Strips the input string of all length diacritics (see greek_characters.strip_length_marks, which replaced the macrons_map loop).
     >>> strip_length_string('ᾰᾸᾱᾹῐῘῑῙῠῨῡῩᾰ̓Ᾰ̓ᾰ̔Ᾰ̔ᾰ́ᾰ̀ᾱ̓Ᾱ̓ᾱ̔Ᾱ̔ᾱ́ᾱ̀ᾱͅῐ̓Ῐ̓ῐ̔Ῐ̔ῐ́ῐ̀ῐ̈ῑ̓Ῑ̓ῑ̔Ῑ̔ῑ́ῑ̈ῠ̓ῠ̔Ῠ̔ῠ́ῠ̀ῠ͂ῠ̈ῠ̒ῡ̔Ῡ̔ῡ́ῡ̈')
     >>> αΑαΑιΙιΙυΥυΥἀἈἁἉάὰἀἈἁἉάὰᾳἰἸἱἹίὶϊἰἸἱἹίϊὐὑὙύὺῦϋυ̒ὑὙύϋ
     '''
-    for composite, replacement in macrons_map.items():
-        string = string.replace(composite, replacement)
-    return string
+    return strip_length_marks(string)[0]
 
 
 def process_word(word):
@@ -63,21 +54,12 @@ def process_word(word):
     Processes each word to identify vowel length markers and create a TSV format.
     '''
     global length_count  # Declare length_count as global to modify it
-    modifications = []
-    i = 1  # Initialize character position counter
-    for char in word:
-        if re.search(base_alphabet, base(char)):
-            char_length = length(char)
-            if char_length == LONG:
-                modifications.append(f"_{i}")
-                length_count['long'] += 1
-            elif char_length == SHORT:
-                modifications.append(f"^{i}")
-                length_count['short'] += 1
-            i += 1  # Only increment for non-length marking characters
-
-    # Now strip all length diacritics after processing for position markings
-    processed_word = strip_length_string(word)
+
+    # Strip all length diacritics and get their position markings in the same pass
+    processed_word, modifications = strip_length_marks(word)
+    for modification in modifications:
+        length_count['long' if modification[0] == '_' else 'short'] += 1
+
     return processed_word, modifications
 
 
@@ -115,9 +97,10 @@ def process_file(input_file_path, output_file_path):
         print(f"An unexpected error occurred: {e}")
 
 
-input_file_path = 'crawl_lsj/macrons_lsj_raw_old_filter.tsv'
-output_file_path = 'crawl_lsj/macrons_lsj.tsv'
+if __name__ == '__main__':
+    input_file_path = 'crawl_lsj/macrons_lsj_raw_old_filter.tsv'
+    output_file_path = 'crawl_lsj/macrons_lsj.tsv'
 
-#filter_non_empty_fourth_column(input_file_path, output_file_path)
+    #filter_non_empty_fourth_column(input_file_path, output_file_path)
 
-process_file(input_file_path, output_file_path)
\ No newline at end of file
+    process_file(input_file_path, output_file_path)
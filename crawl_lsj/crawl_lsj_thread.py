@@ -1,66 +1,123 @@
-'''
-
-For all nouns, Bailly abrégé has (ὁ)&nbsp; (ἡ)&nbsp; or (τό)&nbsp;
-'''
-
-import csv
-import requests
-from bs4 import BeautifulSoup
-from tqdm import tqdm  # Import tqdm for the progress indicator
-from greek_accentuation.characters import length
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-SHORT = '̆'
-LONG = '̄'
-
-# Function to get the macronized word from the LSJ website
-def get_macronized_word(greek_word):
-    url = f"https://lsj.gr/wiki/{greek_word}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, 'html.parser')
-        span_elements = soup.find_all('span', title="Look up on Google")
-        if span_elements:
-            word = span_elements[0].get_text()
-            return word
-    return None
-
-def has_macron_or_breve(word):
-    if word:
-        for char in word:
-            if length(char) in [SHORT, LONG]:
-                return True
-    return False
-
-def process_row(row):
-    if len(row) == 3:
-        token, tag, lemma = row
-        macronized_word = get_macronized_word(token)
-        # Check if macronized_word has macron or breve
-        if macronized_word and has_macron_or_breve(macronized_word):
-            return row + [macronized_word]
-    return row
-
-def process_file(input_file_path, output_file_path, max_workers=10):
-    with open(input_file_path, 'r', encoding='utf-8') as input_file, \
-         open(output_file_path, 'w', encoding='utf-8', newline='') as output_file:
-        reader = csv.reader(input_file, delimiter='\t')
-        writer = csv.writer(output_file, delimiter='\t')
-
-        # Convert reader to a list for accurate tqdm progress tracking
-        rows = list(reader)
-        
-        # Initialize ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all rows for processing
-            future_to_row = {executor.submit(process_row, row): row for row in rows}
-            
-            # Initialize tqdm progress bar
-            for future in tqdm(as_completed(future_to_row), total=len(rows), desc="Processing", unit="lines"):
-                result = future.result()
-                writer.writerow(result)
-
-# Example usage
-input_file_path = "prepare_tokens/tokens/tokens.tsv"  # Path to your input file
-output_file_path = "crawl_lsj/macrons_lsj_raw.txt"  # Path where you want to save the output file
-process_file(input_file_path, output_file_path)
+'''
+
+For all nouns, Bailly abrégé has (ὁ)&nbsp; (ἡ)&nbsp; or (τό)&nbsp;
+
+The pages are fetched through crawler.Crawler, i.e. with pooled connections, retries with backoff,
+and an on-disk cache of the raw HTML (crawl_cache/lsj), so that a re-run, e.g. after a change
+to parse_macronized_word, does not send a single request. The finished rows are checkpointed
+in crawl_journal.CrawlJournal, so an interrupted run resumes where it stopped.
+
+Usage:
+    python crawl_lsj/crawl_lsj_thread.py
+    python crawl_lsj/crawl_lsj_thread.py --workers 10 --requests-per-second 20
+    python crawl_lsj/crawl_lsj_thread.py --base-url http://localhost:8000/  # e.g. a local server with fixture pages
+'''
+
+import os
+import sys
+import csv
+import argparse
+from bs4 import BeautifulSoup
+from tqdm import tqdm  # Import tqdm for the progress indicator
+from greek_accentuation.characters import length
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils import Colors
+from crawler import Crawler
+from crawl_journal import CrawlJournal, journal_path_for
+
+SHORT = '̆'
+LONG = '̄'
+
+LSJ_BASE_URL = 'https://lsj.gr/wiki/'
+LSJ_CACHE_DIR = 'crawl_cache/lsj'
+
+
+def parse_macronized_word(html):
+    '''
+    The headword of an LSJ page, as given in its "Look up on Google" span.
+    '''
+    soup = BeautifulSoup(html, 'html.parser')
+    span_elements = soup.find_all('span', title="Look up on Google")
+    if span_elements:
+        return span_elements[0].get_text()
+    return None
+
+
+# Function to get the macronized word from the LSJ website
+def get_macronized_word(greek_word, crawler=None, base_url=LSJ_BASE_URL):
+    crawler = crawler or Crawler(cache_dir=LSJ_CACHE_DIR)
+    status, html = crawler.fetch(f"{base_url}{greek_word}")
+    if status == 200:
+        return parse_macronized_word(html)
+    return None
+
+def has_macron_or_breve(word):
+    if word:
+        for char in word:
+            if length(char) in [SHORT, LONG]:
+                return True
+    return False
+
+def process_row(row, status, html):
+    '''
+    Appends the macronized headword to a token, tag, lemma row if its page has one with a macron or breve.
+    '''
+    if len(row) == 3 and status == 200:
+        macronized_word = parse_macronized_word(html)
+        # Check if macronized_word has macron or breve
+        if macronized_word and has_macron_or_breve(macronized_word):
+            return row + [macronized_word]
+    return row
+
+def process_file(input_file_path, output_file_path, crawler=None, base_url=LSJ_BASE_URL, flush_size=500):
+    '''
+    Looks up the token of every three-column row on LSJ. The rows are written in input order.
+    Finished rows are checkpointed in a CrawlJournal every flush_size rows, so an interrupted run picks up where it stopped.
+    '''
+    crawler = crawler or Crawler(cache_dir=LSJ_CACHE_DIR)
+
+    with open(input_file_path, 'r', encoding='utf-8') as input_file:
+        rows = list(csv.reader(input_file, delimiter='\t'))
+
+    journal = CrawlJournal(journal_path_for(output_file_path), input_file_path)
+    pending = journal.pending(rows)
+    pages = crawler.fetch_many(f"{base_url}{row[0]}" for row_index, row in pending if len(row) == 3)
+
+    finished = []
+    failed = 0
+    for row_index, row in tqdm(pending, desc="Processing", unit="lines"):
+        if len(row) == 3:
+            url, status, html = next(pages)
+            if status is None:
+                failed += 1  # not recorded, so that the next run tries again
+                continue
+            finished.append((row_index, process_row(row, status, html)))
+        else:
+            finished.append((row_index, row))
+        if len(finished) >= flush_size:
+            journal.record_many(finished)
+            finished = []
+    journal.record_many(finished)
+
+    print(f"Pages: {crawler.stats}")
+    if failed:
+        print(f"{Colors.RED}{failed} pages could not be fetched; run again to retry them before {output_file_path} is written{Colors.ENDC}")
+    else:
+        journal.write_tsv(output_file_path)
+    journal.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Look up the tokens on LSJ and keep the headwords with macrons or breves.')
+    parser.add_argument('--input', default="prepare_tokens/tokens/tokens.tsv", help='Token, tag, lemma TSV.')
+    parser.add_argument('--output', default="crawl_lsj/macrons_lsj_raw.txt", help='Output TSV.')
+    parser.add_argument('--base-url', default=LSJ_BASE_URL, help='URL that the token is appended to.')
+    parser.add_argument('--cache-dir', default=LSJ_CACHE_DIR, help='Directory of the page cache.')
+    parser.add_argument('--workers', type=int, default=10, help='Number of requests in flight.')
+    parser.add_argument('--requests-per-second', type=float, default=None, help='Rate limit (default: none).')
+
+    args = parser.parse_args()
+
+    crawler = Crawler(cache_dir=args.cache_dir, max_workers=args.workers, requests_per_second=args.requests_per_second)
+    process_file(args.input, args.output, crawler, args.base_url)
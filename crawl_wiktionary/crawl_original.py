@@ -1,17 +1,25 @@
 # Import necessary libraries
-import requests
+import os
+import sys
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from crawler import Crawler
+
+# One crawler for all lookups, so that its connections, rate limit and statistics are shared
+lsj_crawler = Crawler(cache_dir='crawl_cache/lsj')
+
 # Function to get the word from the LSJ website
-def get_word_from_lsj(greek_word):
+def get_word_from_lsj(greek_word, crawler=None):
+    crawler = crawler or lsj_crawler
     # URL construction
     url = f"https://lsj.gr/wiki/{greek_word}"
     
-    # Send a request to the website
-    response = requests.get(url)
-    if response.status_code == 200:
+    # Send a request to the website (or read the page from the cache)
+    status, html = crawler.fetch(url)
+    if status == 200:
         # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(html, 'html.parser')
         
         # Search for the <span> element with the specified title
         span_elements = soup.find_all('span', title="Look up on Google")
@@ -25,6 +33,8 @@ def get_word_from_lsj(greek_word):
     else:
         print("Failed to fetch the webpage or the page doesn't exist.")
 
-# Test the function with an example Greek polytonic word
-test_word = "νεανίας"  # You can replace tahis with any Greek polytonic word
-get_word_from_lsj(test_word)
+
+if __name__ == '__main__':
+    # Test the function with an example Greek polytonic word
+    test_word = "νεανίας"  # You can replace tahis with any Greek polytonic word
+    get_word_from_lsj(test_word)
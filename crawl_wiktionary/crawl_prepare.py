@@ -34,11 +34,12 @@ import crawl_remove_duplicates
 import crawl_sort
 
 
-input_file_path = 'crawl_wiktionary/macrons_wiktionary_raw.txt'
-output_file_path = 'crawl_wiktionary/macrons_wiktionary.txt'
+if __name__ == '__main__':
+    input_file_path = 'crawl_wiktionary/macrons_wiktionary_raw.txt'
+    output_file_path = 'crawl_wiktionary/macrons_wiktionary.txt'
 
-crawl_format_macrons.process_file(input_file_path, 'crawl_wiktionary/macrons_wiktionary_format.txt')
-crawl_remove_duplicates.remove_duplicates('crawl_wiktionary/macrons_wiktionary_format.txt', 'crawl_wiktionary/macrons_wiktionary_no_dup.txt')
-crawl_sort.sort_file('crawl_wiktionary/macrons_wiktionary_no_dup.txt', output_file_path)
+    crawl_format_macrons.process_file(input_file_path, 'crawl_wiktionary/macrons_wiktionary_format.txt')
+    crawl_remove_duplicates.remove_duplicates('crawl_wiktionary/macrons_wiktionary_format.txt', 'crawl_wiktionary/macrons_wiktionary_no_dup.txt')
+    crawl_sort.sort_file('crawl_wiktionary/macrons_wiktionary_no_dup.txt', output_file_path)
 
-print(f"Succé!")
\ No newline at end of file
+    print(f"Succé!")
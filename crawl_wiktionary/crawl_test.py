@@ -10,21 +10,22 @@ from greek_accentuation.characters import length, strip_length
 SHORT = '̆'
 LONG = '̄'
 
-# Test av greek_accentuation's förmåga att kolla macron/breve
+if __name__ == '__main__':
+    # Test av greek_accentuation's förmåga att kolla macron/breve
 
-print(length('ῠ') == SHORT) # True
-print(length('Ῡ') == SHORT) # False
-print(length('Ῡ') == LONG) # True
-print(length('Ᾱ́') == LONG) # True
-print(length('Ᾱ́') == SHORT) # False
-print(length('Ῠ̔́') == SHORT) # True
-print(length('Ῠ̔́') == LONG) # False
-print(length('ῐ́') == SHORT) # True
-print(length('ι') == SHORT) # False
+    print(length('ῠ') == SHORT) # True
+    print(length('Ῡ') == SHORT) # False
+    print(length('Ῡ') == LONG) # True
+    print(length('Ᾱ́') == LONG) # True
+    print(length('Ᾱ́') == SHORT) # False
+    print(length('Ῠ̔́') == SHORT) # True
+    print(length('Ῠ̔́') == LONG) # False
+    print(length('ῐ́') == SHORT) # True
+    print(length('ι') == SHORT) # False
 
-# Verkar fungera finfint! :D
-# Test av att ta bort macron/breve
+    # Verkar fungera finfint! :D
+    # Test av att ta bort macron/breve
 
-print(strip_length('ῡ'))
-print(strip_length('Ᾱ́'))
-print(f"Strip club: " + strip_length('Ῠ̔́')) # Fungerar, men spiritus syns ej vid print i terminalen
\ No newline at end of file
+    print(strip_length('ῡ'))
+    print(strip_length('Ᾱ́'))
+    print(f"Strip club: " + strip_length('Ῠ̔́')) # Fungerar, men spiritus syns ej vid print i terminalen
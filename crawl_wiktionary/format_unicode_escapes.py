@@ -18,7 +18,8 @@ def format_dictionary(input_file_path, output_file_path):
                 # Write lines that are not part of the dictionary unchanged
                 file.write(line)
 
-# Example usage
-input_file_path = 'crawl_wiktionary/macrons_map_complete.py'  # Input file containing the dictionary
-output_file_path = 'crawl_wiktionary/macrons_map_complete2.py'  # Output file for the formatted dictionary
-format_dictionary(input_file_path, output_file_path)
+if __name__ == '__main__':
+    # Example usage
+    input_file_path = 'crawl_wiktionary/macrons_map_complete.py'  # Input file containing the dictionary
+    output_file_path = 'crawl_wiktionary/macrons_map_complete2.py'  # Output file for the formatted dictionary
+    format_dictionary(input_file_path, output_file_path)
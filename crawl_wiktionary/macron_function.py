@@ -55,6 +55,7 @@ def find_base_macron_combinations(input_file_path):
     for res in sorted_results:
         print(res)
 
-# Example usage
-input_file_path = 'crawl_wiktionary/macrons_wiktionary_raw.txt'
-find_base_macron_combinations(input_file_path)
+if __name__ == '__main__':
+    # Example usage
+    input_file_path = 'crawl_wiktionary/macrons_wiktionary_raw.txt'
+    find_base_macron_combinations(input_file_path)
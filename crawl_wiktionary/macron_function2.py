@@ -49,7 +49,8 @@ def find_base_macron_combinations(input_file_path, output_file_path):
 
     print(f"All unique combinations written to {output_file_path}")
 
-# Example usage
-input_file_path = 'crawl_wiktionary/macrons_wiktionary_raw.txt'
-output_file_path = 'combined_macrons_map.py'
-find_base_macron_combinations(input_file_path, output_file_path)
+if __name__ == '__main__':
+    # Example usage
+    input_file_path = 'crawl_wiktionary/macrons_wiktionary_raw.txt'
+    output_file_path = 'combined_macrons_map.py'
+    find_base_macron_combinations(input_file_path, output_file_path)
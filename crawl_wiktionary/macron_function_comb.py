@@ -46,21 +46,22 @@ def replace_composites(input_file_path, output_file_path, macron_map):
 
     print(f"Processed file written to {output_file_path}")
 
-# Example usage
-input_file_path = 'crawl_wiktionary/macrons_wiktionary_test.txt'
-output_file_path = 'crawl_wiktionary/macrons_wiktionary_test_format.txt'
-macron_map = {
-    '\u03B1\u0306': 'α',  
-    '\u0391\u0306': 'Α',  
-    '\u03B1\u0304': 'α',  
-    '\u0391\u0304': 'Α',  
-    '\u03B9\u0306': 'ι',  
-    '\u0399\u0306': 'Ι',  
-    '\u03B9\u0304': 'ι',  
-    '\u0399\u0304': 'Ι',  
-    '\u03C5\u0306': 'υ',  
-    '\u03A5\u0306': 'Υ',  
-    '\u03C5\u0304': 'υ',  
-    '\u03A5\u0304': 'Υ',  
-}
-replace_composites(input_file_path, output_file_path, macron_map)
\ No newline at end of file
+if __name__ == '__main__':
+    # Example usage
+    input_file_path = 'crawl_wiktionary/macrons_wiktionary_test.txt'
+    output_file_path = 'crawl_wiktionary/macrons_wiktionary_test_format.txt'
+    macron_map = {
+        '\u03B1\u0306': 'α',  
+        '\u0391\u0306': 'Α',  
+        '\u03B1\u0304': 'α',  
+        '\u0391\u0304': 'Α',  
+        '\u03B9\u0306': 'ι',  
+        '\u0399\u0306': 'Ι',  
+        '\u03B9\u0304': 'ι',  
+        '\u0399\u0304': 'Ι',  
+        '\u03C5\u0306': 'υ',  
+        '\u03A5\u0306': 'Υ',  
+        '\u03C5\u0304': 'υ',  
+        '\u03A5\u0304': 'Υ',  
+    }
+    replace_composites(input_file_path, output_file_path, macron_map)
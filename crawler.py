@@ -0,0 +1,160 @@
+'''
+/crawler.py
+
+The HTTP side of the crawl scripts (crawl_lsj, crawl_wiktionary), shared so that each of them gets
+pooled keep-alive connections, bounded concurrency, retries and a cache instead of a bare requests.get per word.
+
+>> crawler = Crawler(cache_dir='crawl_cache/lsj')
+>> status, html = crawler.fetch('https://lsj.gr/wiki/νεανίας')
+>> for url, status, html in crawler.fetch_many(urls):
+>>     ...
+
+- Every thread has its own requests.Session, so connections are kept alive and reused (a Session is not thread-safe).
+- At most max_workers requests are in flight, and with requests_per_second set they are also spaced out.
+- Connection errors, timeouts, 429 and 5xx are retried up to max_retries times with exponential backoff and jitter
+  (backoff, 2 * backoff, 4 * backoff, ... seconds, or the server's Retry-After if longer).
+- The raw HTML of every answer that is final (any status but 429 and 5xx; a 404 is an answer too, as most tokens have no LSJ entry)
+  is cached on disk, content-addressed by the sha256 of the URL: cache_dir/ab/abcdef....html, whose first line is the status.
+  A cached URL is never requested again, so a re-run, or a run with a changed parser, costs no network at all.
+  Delete the cache directory (or the file of a URL) to crawl afresh.
+
+base_url lets a script be pointed at a local server serving fixture pages instead of the live site, e.g.
+    python -m http.server 8000 --directory fixtures
+    python crawl_lsj/crawl_lsj_thread.py --base-url http://localhost:8000/
+'''
+
+import os
+import time
+import random
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# statuses that say nothing about the page, only that the server wants us to try again later
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+USER_AGENT = 'macronizer-crawler (http://macronizer.gr/)'
+
+
+class Crawler:
+    def __init__(self, cache_dir='crawl_cache', max_workers=10, max_retries=5, backoff=1.0,
+                 requests_per_second=None, timeout=30):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.min_interval = 1 / requests_per_second if requests_per_second else 0
+        self.timeout = timeout
+
+        self.local = threading.local()
+        self.rate_lock = threading.Lock()
+        self.next_request_time = 0
+        self.stats = {'cached': 0, 'fetched': 0, 'retried': 0, 'failed': 0}
+        self.stats_lock = threading.Lock()
+
+    ### CACHE
+
+    def cache_path(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.html")
+
+    def read_cache(self, url):
+        '''
+        (status, html) of a cached URL, or None.
+        '''
+        try:
+            with open(self.cache_path(url), 'r', encoding='utf-8', newline='') as file:
+                status = int(file.readline())
+                return status, file.read()
+        except FileNotFoundError:
+            return None
+
+    def write_cache(self, url, status, html):
+        cache_path = self.cache_path(url)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # written under a temporary name and renamed, so that an interrupted crawl never leaves half a page in the cache
+        temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8', newline='') as file:
+            file.write(f"{status}\n{html}")
+        os.replace(temp_path, cache_path)
+
+    ### NETWORK
+
+    def session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return session
+
+    def wait_for_slot(self):
+        if not self.min_interval:
+            return
+        with self.rate_lock:
+            now = time.monotonic()
+            wait = self.next_request_time - now
+            self.next_request_time = max(now, self.next_request_time) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def backoff_delay(self, attempt, response=None):
+        delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        return delay
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def fetch(self, url):
+        '''
+        (status, html) of the URL, from the cache if it is there.
+        Returns (None, '') if the URL could not be fetched after all retries; such failures are not cached.
+        '''
+        cached = self.read_cache(url)
+        if cached is not None:
+            self.count('cached')
+            return cached
+
+        for attempt in range(self.max_retries + 1):
+            self.wait_for_slot()
+            response = None
+            try:
+                response = self.session().get(url, timeout=self.timeout)
+            except requests.RequestException:
+                pass
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.count('fetched')
+                    self.write_cache(url, response.status_code, response.text)
+                    return response.status_code, response.text
+
+            if attempt < self.max_retries:
+                self.count('retried')
+                time.sleep(self.backoff_delay(attempt, response))
+
+        self.count('failed')
+        return None, ''
+
+    def fetch_many(self, urls):
+        '''
+        Yields (url, status, html) for each of the URLs, in order, fetching up to max_workers at a time.
+        At most twice as many URLs as workers are taken from urls ahead of the results, so it can be a generator of any length.
+        '''
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = deque()
+            for url in urls:
+                in_flight.append((url, executor.submit(self.fetch, url)))
+                if len(in_flight) >= 2 * self.max_workers:
+                    url, future = in_flight.popleft()
+                    yield (url, *future.result())
+            for url, future in in_flight:
+                yield (url, *future.result())
@@ -9,6 +9,7 @@ all double consonants and mutae-cum-liquidae are treated as closed, i.e.
 import csv
 import re
 import argparse
+from functools import lru_cache
 
 # NB1: there was a bug, an ᾶ in the subscr_i 
 # NB2: requires corpus normalized to not include the oxia variants of άέήίόύώ, only tonos
@@ -26,43 +27,54 @@ patterns = {
 }
 
 
-def preprocess_text(text):
-    # Characters to be ignored
-    ignore_chars = set('\n\'(),-.·;<>[]«»;;··†—‘’' + '×⏑⏓–')
+# Compiled once: a single alternation of all the patterns, in the order of the dict above,
+# so that the first alternative that matches is the same as the first pattern that matched in the old loop
+element_pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in patterns.values()))
+vowel_pattern = re.compile('|'.join(f'(?:{patterns[vowel_type]})' for vowel_type in ['vowels', 'diphth_y', 'diphth_i', 'adscr_i', 'subscr_i']))
+consonant_pattern = re.compile('|'.join(f'(?:{patterns[consonant_type]})' for consonant_type in ['stops', 'liquids', 'nasals', 'double_cons', 'sibilants']))
+
+# Characters to be ignored
+ignore_chars = set('\n\'(),-.·;<>[]«»;;··†—‘’' + '×⏑⏓–')
+ignore_table = str.maketrans('', '', ''.join(ignore_chars))
+
 
+def preprocess_text(text):
     # Removing the ignored characters from the text, but keeping spaces
-    cleaned_text = ''.join([char if char != ' ' else ' ' for char in text.lower() if char not in ignore_chars])
-    return cleaned_text
+    return text.lower().translate(ignore_table)
 
 def divide_into_elements(text):
+    '''
+    Scans the text once, matching the compiled alternation at each position instead of slicing the text for every pattern.
+    '''
     elements = []
     i = 0
-    while i < len(text):
-        matched = False
-        for pattern in patterns.values():
-            match = re.match(pattern, text[i:])
-            if match:
-                matched = True
-                elements.append(match.group())
-                i += len(match.group())
-                break
-
-        if not matched:
-            if text[i] == ' ':
-                elements.append(text[i])
-            else:
-                elements.append(f"UNCLASSIFIED: {text[i]}")
-                print(f"Warning: Unclassified element '{text[i]}' at position {i}")
-            i += 1
+    length = len(text)
+    match = element_pattern.match
+
+    while i < length:
+        element = match(text, i)
+        if element:
+            elements.append(element.group())
+            i = element.end()
+            continue
+
+        if text[i] == ' ':
+            elements.append(text[i])
+        else:
+            elements.append(f"UNCLASSIFIED: {text[i]}")
+            print(f"Warning: Unclassified element '{text[i]}' at position {i}")
+        i += 1
 
     return elements
 
 
+@lru_cache(maxsize=4096)
 def is_vowel(element):
-    return any(re.match(patterns[vowel_type], element) for vowel_type in ['vowels', 'diphth_y', 'diphth_i', 'adscr_i', 'subscr_i'])
+    return vowel_pattern.match(element) is not None
 
+@lru_cache(maxsize=4096)
 def is_consonant(element):
-    return any(re.match(patterns[consonant_type], element) for consonant_type in ['stops', 'liquids', 'nasals', 'double_cons', 'sibilants'])
+    return consonant_pattern.match(element) is not None
 
 def syllabify(divided_text):
     elements = divided_text.split()
@@ -166,9 +178,10 @@ def definitive_syllables(reshuffled_syllables):
 
 ### READING AND WRITING ###
 
-def syllabifier(string):
+@lru_cache(maxsize=65536)
+def syllabify_token(string):
     '''
-    string -> list
+    Cached core of syllabifier(); returns a tuple so that the cached value cannot be mutated by callers.
     '''
     cleaned_text = preprocess_text(string)
     divided_text = divide_into_elements(cleaned_text)
@@ -178,7 +191,14 @@ def syllabifier(string):
     final_reshuffled_text = final_reshuffle(reshuffled_text)
     definitive_text = definitive_syllables(final_reshuffled_text)
 
-    return definitive_text
+    return tuple(definitive_text)
+
+def syllabifier(string):
+    '''
+    string -> list
+    NB: results are memoized per token, so the warning about unclassified characters is only printed the first time.
+    '''
+    return list(syllabify_token(string))
 
 def process_file(input_file_path):
     
@@ -0,0 +1,131 @@
+'''
+/greek_characters.py
+
+A property table of every codepoint in the Greek and Coptic and Greek Extended blocks and of the combining diacritics,
+built once at import (about 500 entries, a millisecond or two) from greek_accentuation.characters:
+
+>> char_properties['ᾄ']
+>> CharProperties(base='α', char_class='vowel', dichronon=False, accent='́', breathing='̓', length=None, iota_subscript='ͅ')
+
+accent, breathing, length and iota_subscript are the combining characters of greek_accentuation.characters
+(e.g. ACUTE, SMOOTH, LONG, YPOGEGRAMMENI), or None. dichronon means that the quantity of the letter is hidden,
+i.e. an α, ι or υ without circumflex, iota subscript or length mark; cf. utils.DICHRONA, the curated set for the corpus.
+
+base_letter_chars are the characters that count as a letter in the macron ordinals, i.e. those with a base in utils.base_alphabet,
+and only_bases_table is the str.translate table behind utils.only_bases: each of them is mapped to its base,
+and everything else is deleted.
+
+strip_length_marks is the one-pass replacement for the macrons_map loops of the crawl format scripts
+(strip_length_string in crawl_wiktionary, crawl_lsj and crawl_ifthimos).
+'''
+
+import re
+import unicodedata
+from functools import lru_cache
+from collections import namedtuple
+
+from greek_accentuation.characters import base, accent, breathing, length, iota_subscript, CIRCUMFLEX, LONG, SHORT
+
+CharProperties = namedtuple('CharProperties', ['base', 'char_class', 'dichronon', 'accent', 'breathing', 'length', 'iota_subscript'])
+
+BASE_LETTERS = 'ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩαβγδεζηθικλμνξοπρσςτυφχψω'  # = utils.base_alphabet
+VOWELS = set('ΑΕΗΙΟΥΩαεηιουω')
+DICHRONA_BASES = set('ΑΙΥαιυ')
+
+CODEPOINT_RANGES = [
+    range(0x0300, 0x0370),  # Combining Diacritical Marks
+    range(0x0370, 0x0400),  # Greek and Coptic
+    range(0x1F00, 0x2000),  # Greek Extended
+    range(0x2126, 0x2127),  # Ω Ohm sign, whose canonical decomposition is the letter
+]
+
+
+def char_class(char, char_base):
+    if char_base in VOWELS:
+        return 'vowel'
+    if char_base in BASE_LETTERS:
+        return 'consonant'
+    if unicodedata.combining(char):
+        return 'mark'
+    return 'other'
+
+
+def build_char_properties():
+    table = {}
+    for codepoint_range in CODEPOINT_RANGES:
+        for codepoint in codepoint_range:
+            char = chr(codepoint)
+            char_base = base(char)
+            char_accent = accent(char)
+            char_length = length(char)
+            char_iota_subscript = iota_subscript(char)
+            table[char] = CharProperties(
+                base=char_base,
+                char_class=char_class(char, char_base),
+                dichronon=char_base in DICHRONA_BASES and char_accent != CIRCUMFLEX and not char_length and not char_iota_subscript,
+                accent=char_accent,
+                breathing=breathing(char),
+                length=char_length,
+                iota_subscript=char_iota_subscript,
+            )
+    return table
+
+
+char_properties = build_char_properties()
+
+
+class DeletingTable(dict):
+    '''
+    A translate table that deletes the characters it has no entry for (and remembers them, so that the next lookup is a plain dict hit).
+    '''
+    def __missing__(self, codepoint):
+        self[codepoint] = None
+        return None
+
+
+base_letter_chars = frozenset(char for char, properties in char_properties.items() if properties.base in BASE_LETTERS)
+
+only_bases_table = DeletingTable((ord(char), char_properties[char].base) for char in base_letter_chars)
+
+
+### LENGTH MARKS
+
+
+length_mark_chars = ''.join(sorted(char for char, properties in char_properties.items() if properties.length and properties.char_class == 'vowel'))  # ᾰᾱῐῑῠῡ and capitals
+
+# a letter with a length mark, precomposed or combining, together with all diacritics that follow it
+length_cluster_pattern = re.compile(f"(?:[{length_mark_chars}]|[^\u0300-\u036f][\u0300-\u036f]*?[{LONG}{SHORT}])[\u0300-\u036f]*")
+
+
+@lru_cache(maxsize=1024)
+def strip_length_cluster(cluster):
+    '''
+    E.g. ᾱ́ returns ('ά', LONG): the cluster is decomposed, its length marks are dropped, and it is recomposed.
+    '''
+    decomposed = unicodedata.normalize('NFD', cluster)
+    mark = LONG if decomposed.find(LONG) != -1 and (decomposed.find(SHORT) == -1 or decomposed.find(LONG) < decomposed.find(SHORT)) else SHORT
+    return unicodedata.normalize('NFC', decomposed.replace(LONG, '').replace(SHORT, '')), mark
+
+
+def strip_length_marks(word):
+    '''
+    Strips the word of its macrons and breves and returns it together with their positions,
+    counted in base letters as in the macron column.
+    >> strip_length_marks('νεᾱνῐ́ᾱς')
+    >> ('νεανίας', ['_3', '^5', '_6'])
+    '''
+    positions = []
+    ordinal = 0
+    counted = 0  # index up to which the base letters have been counted
+
+    def strip(match):
+        nonlocal ordinal, counted
+        start = match.start()
+        ordinal += len(word[counted:start].translate(only_bases_table))
+        counted = start
+        stripped, mark = strip_length_cluster(match.group())
+        if word[start] in base_letter_chars:
+            positions.append(f"{'_' if mark == LONG else '^'}{ordinal + 1}")
+        return stripped
+
+    return length_cluster_pattern.sub(strip, word), positions
@@ -1,14 +1,12 @@
 import os
 import sys
+import pickle
+import hashlib
+import threading
+from functools import lru_cache
 
 from utils import Colors
 
-# Add the greek_inflexion directory to the Python path
-sys.path.append(os.path.abspath('./greek_inflexion'))
-
-# Now import the GreekInflexion module
-from greek_inflexion import GreekInflexion
-
 resource_dir = os.path.abspath('./greek_inflexion')
 stemming_path = os.path.join(resource_dir, 'stemming.yaml')
 
@@ -19,59 +17,195 @@ lxx_path = os.path.join(resource_dir, 'STEM_DATA/lxx_lexicon.yaml')
 morphgnt_path = os.path.join(resource_dir, 'STEM_DATA/morphgnt_lexicon.yaml')
 
 
-# Initialize the GreekInflexion object with full paths
-#inflexion = GreekInflexion(stemming_path, homer_path)
+lexicon_names = [
+    'homer_lexicon.yaml',
+    'ltrg_lexicon.yaml',
+    'lxx_lexicon.yaml',
+    'morphgnt_lexicon.yaml'
+]
 
+# Precompiled results of get_stem, see load_stem_index
+stem_index_path = os.path.join(resource_dir, 'stem_index.pickle')
 
-def get_stem(token, tag):
-    tauber_format = translate_tag_to_tauber_format(tag)
 
-    lexicon_paths = [
-        'homer_lexicon.yaml',
-        'ltrg_lexicon.yaml',
-        'lxx_lexicon.yaml',
-        'morphgnt_lexicon.yaml'
-    ]
-
-    for lexicon_name in lexicon_paths:
-        lexicon_path = os.path.join(resource_dir, 'STEM_DATA', lexicon_name)
-        inflexion = GreekInflexion(stemming_path, lexicon_path)
-        if inflexion.find_stems(token, tauber_format):
-            (stems,) = inflexion.find_stems(token, tauber_format)
+### LEXICA, LOADED ONCE PER PROCESS
+
+
+inflexions = {}
+inflexions_lock = threading.Lock()
+
+
+def load_inflexion(lexicon_name):
+    '''
+    The GreekInflexion object for a lexicon, which parses stemming.yaml and the lexicon YAML
+    on the first call only. Threads (cf. algorithm_stems.count_found_stems) wait for the first one to finish.
+    greek_inflexion itself is imported here too, so that importing this module costs nothing.
+    '''
+    with inflexions_lock:
+        if lexicon_name not in inflexions:
+            if resource_dir not in sys.path:
+                sys.path.append(resource_dir)
+            from greek_inflexion import GreekInflexion
+            lexicon_path = os.path.join(resource_dir, 'STEM_DATA', lexicon_name)
+            inflexions[lexicon_name] = GreekInflexion(stemming_path, lexicon_path)
+        return inflexions[lexicon_name]
+
+
+def find_stem_in_lexica(token, tauber_format):
+    '''
+    Looks the token up in the lexica in order and returns the stem of the first one that has it.
+    '''
+    for lexicon_name in lexicon_names:
+        inflexion = load_inflexion(lexicon_name)
+        found = inflexion.find_stems(token, tauber_format)
+        if found:
+            (stems,) = found
             print(f'{Colors.GREEN}{token} has stem {stems} according to {lexicon_name}{Colors.ENDC}')
             return stems
 
     return None
 
 
-def translate_tag_to_tauber_format(tag):
+### STEM INDEX
+
+
+# (token, tauber_format) -> stem or None, filled by get_stem and by load_stem_index
+stem_index = {}
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def yaml_names():
     '''
-    Translate verb tags to the format used by the greek-inflexion module
-    >>> translate_tag_to_tauber_format('v1spia---'))
-    >>> PIA.1S
+    stemming.yaml and the lexica, relative to resource_dir so that the index survives moving the folder.
+    '''
+    return ['stemming.yaml'] + [os.path.join('STEM_DATA', lexicon_name) for lexicon_name in lexicon_names]
+
+
+def yaml_fingerprint():
+    '''
+    {name: (mtime_ns, size, sha256)} of stemming.yaml and the lexica, which a stem index is only valid for.
+    '''
+    fingerprint = {}
+    for name in yaml_names():
+        path = os.path.join(resource_dir, name)
+        stat = os.stat(path)
+        fingerprint[name] = (stat.st_mtime_ns, stat.st_size, sha256_file(path))
+    return fingerprint
+
+
+def fingerprint_matches(fingerprint):
+    '''
+    Whether the YAML files are still the ones the fingerprint was taken of.
+    A file whose mtime and size are unchanged is taken to be unchanged; otherwise (e.g. after a fresh checkout) its hash decides.
+    '''
+    if set(fingerprint) != set(yaml_names()):
+        return False
+
+    for name, (mtime_ns, size, sha256) in fingerprint.items():
+        path = os.path.join(resource_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+            continue
+        if stat.st_size != size or sha256_file(path) != sha256:
+            return False
+
+    return True
+
+
+def load_stem_index(index_path=stem_index_path):
     '''
-    # Dictionary mapping for each segment of the tag
-    person_map = {'1': '1', '2': '2', '3': '3'}
-    number_map = {'s': 'S', 'p': 'P', 'd': 'D'}
-    tense_map = {
+    Loads a stem index saved by save_stem_index into stem_index, unless the YAML files have changed since.
+    Returns whether it was loaded.
+    '''
+    if not os.path.exists(index_path):
+        return False
+
+    with open(index_path, 'rb') as file:
+        saved = pickle.load(file)
+
+    if not fingerprint_matches(saved['fingerprint']):
+        print(f'{Colors.RED}{index_path} is stale, the lexica have changed{Colors.ENDC}')
+        return False
+
+    stem_index.update(saved['stems'])
+    return True
+
+
+def save_stem_index(index_path=stem_index_path):
+    '''
+    Saves stem_index, i.e. every lookup made so far, together with the fingerprint of the YAML files.
+    '''
+    with open(index_path, 'wb') as file:
+        pickle.dump({'fingerprint': yaml_fingerprint(), 'stems': dict(stem_index)}, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def build_stem_index(pairs, index_path=stem_index_path):
+    '''
+    Precompiles the stems of the (token, tag) pairs, e.g. the whole token list, and saves them.
+    '''
+    load_stem_index(index_path)
+    for token, tag in pairs:
+        get_stem(token, tag)
+    save_stem_index(index_path)
+
+
+###
+
+
+def get_stem(token, tag):
+    tauber_format = translate_tag_to_tauber_format(tag)
+
+    key = (token, tauber_format)
+    if key not in stem_index:
+        stem_index[key] = find_stem_in_lexica(token, tauber_format)
+
+    return stem_index[key]
+
+
+# positions 1–5 of a verb tag -> Tauber's codes, and back
+tag_to_tauber = {
+    'person': {'1': '1', '2': '2', '3': '3'},
+    'number': {'s': 'S', 'p': 'P', 'd': 'D'},
+    'tense': {
         'p': 'P', 'i': 'I', 'r': 'R', 'l': 'L',
         't': 'T', 'f': 'F', 'a': 'A'
-    }
-    mood_map = {
+    },
+    'mood': {
         'i': 'I', 's': 'S', 'o': 'O', 'n': 'N',
         'm': 'M', 'p': 'P'
-    }
-    voice_map = {'a': 'A', 'p': 'P', 'm': 'M', 'e': 'E'}
+    },
+    'voice': {'a': 'A', 'p': 'P', 'm': 'M', 'e': 'E'},
+}
+tauber_to_tag = {name: {code: value for value, code in codes.items()} for name, codes in tag_to_tauber.items()}
 
+
+@lru_cache(maxsize=None)
+def translate_tag_to_tauber_format(tag):
+    '''
+    Translate verb tags to the format used by the greek-inflexion module.
+    Cached, since there are only a few hundred distinct tags.
+    >>> translate_tag_to_tauber_format('v1spia---'))
+    >>> PIA.1S
+    '''
     # Extract individual components from the tag
     if tag[0] != 'v':
         return None  # Return None if it's not a verb tag
 
-    person = person_map.get(tag[1], '')
-    number = number_map.get(tag[2], '')
-    tense = tense_map.get(tag[3], '')
-    mood = mood_map.get(tag[4], '')
-    voice = voice_map.get(tag[5], '')
+    person = tag_to_tauber['person'].get(tag[1], '')
+    number = tag_to_tauber['number'].get(tag[2], '')
+    tense = tag_to_tauber['tense'].get(tag[3], '')
+    mood = tag_to_tauber['mood'].get(tag[4], '')
+    voice = tag_to_tauber['voice'].get(tag[5], '')
 
     # Create the form string according to Tauber's module format
     form = f"{tense}{voice}{mood}.{person}{number}"
@@ -84,19 +218,6 @@ def translate_tauber_to_tag_format(tauber_format):
     >>> translate_tauber_to_tag_format('PAI.1S')
     >>> v1spia---
     '''
-    # Reversing mappings from the previous function
-    number_map = {'S': 's', 'P': 'p', 'D': 'd'}
-    person_map = {'1': '1', '2': '2', '3': '3'}
-    tense_map = {
-        'P': 'p', 'I': 'i', 'R': 'r', 'L': 'l',
-        'T': 't', 'F': 'f', 'A': 'a'
-    }
-    mood_map = {
-        'I': 'i', 'S': 's', 'O': 'o', 'N': 'n',
-        'M': 'm', 'P': 'p'
-    }
-    voice_map = {'A': 'a', 'P': 'p', 'M': 'm', 'E': 'e'}
-
     # Extract components from GreekInflexion format
     if '.' not in tauber_format:
         return None  # Invalid format
@@ -105,18 +226,17 @@ def translate_tauber_to_tag_format(tauber_format):
     if len(tense_mood_voice) < 3 or len(person_number) < 2:
         return None  # Invalid format
 
-    tense = tense_map.get(tense_mood_voice[0], '-')
-    mood = mood_map.get(tense_mood_voice[1], '-')
-    voice = voice_map.get(tense_mood_voice[2], '-')
-    person = person_map.get(person_number[0], '-')
-    number = number_map.get(person_number[1], '-')
+    tense = tauber_to_tag['tense'].get(tense_mood_voice[0], '-')
+    mood = tauber_to_tag['mood'].get(tense_mood_voice[1], '-')
+    voice = tauber_to_tag['voice'].get(tense_mood_voice[2], '-')
+    person = tauber_to_tag['person'].get(person_number[0], '-')
+    number = tauber_to_tag['number'].get(person_number[1], '-')
 
     # Construct the tag format for verbs: v + person + number + tense + mood + voice + '---'
     # The final '---' covers gender, case, and degree which are not specified in the GreekInflexion format.
     return f"v{person}{number}{tense}{mood}{voice}---"
 
 
-
 if __name__ == '__main__':
     # Example usage
     token = 'συνθανεῖν'
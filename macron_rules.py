@@ -0,0 +1,162 @@
+'''
+/macron_rules.py
+
+The rules of algorithms 1–3 (algorithm1_accentual_rules, algorithm2_nominal_forms, algorithm3_prefixes) are declared
+as Rules, and all of them are applied to a MacronTable in one pass by apply_rules, instead of one pass per algorithm:
+
+>> RULES = BREVE_ULTIMA_RULES + NOMINAL_RULES + PREFIX_RULES
+>> apply_rules(table, RULES)
+>> {'breve_ultima': 2611, 'long_fem_alpha': 152, 'short_masc_neut_alpha': 98, 'short_dat': 82, 'brevize_syn': 273}
+
+A Rule puts a macron (length '_') or breve ('^') on the position that its position function gives for the WordAnalysis
+of the token, if all of its conditions hold:
+- tags: a mask of pos_tags.tag_mask, or a tuple of masks of which one must match
+- endings: endings of only_bases(token), e.g. ('ας',)
+- lemma_endings: endings of only_bases(lemma)
+- condition: any further function of the WordAnalysis of the token
+A condition left None always holds. The collated macrons only change where the row has no macron yet at that position;
+each rule counts the rows it changed, and adds its source to the source of those rows (once).
+Adding a rule costs one more rule test on the rows whose tag and ending it applies to, not another pass over the file.
+
+The rules are compiled (RuleSet) into a dispatch table: every distinct tag is mapped once to its tag class,
+the rules whose tag condition it meets, and each tag class to {last letter: rules}, from the rules' endings.
+So each row only looks up the rules that can apply to its tag and last letter, in the order they were declared,
+and the rows of the tags that no rule applies to are never visited (MacronTable.rows_with_tag).
+'''
+
+import unicodedata
+from collections import namedtuple
+
+from collate_macrons import parse_macrons
+from pos_tags import tag_matches
+from utils import only_bases
+from word_analysis import analyze
+
+Rule = namedtuple('Rule', ['name', 'source', 'length', 'position', 'tags', 'endings', 'lemma_endings', 'condition'],
+                  defaults=(None, None, None, None))
+
+
+def last_vowel(analysis):
+    '''
+    Position of the last vowel, the usual position selector.
+    '''
+    return analysis.last_vowel_ordinal
+
+
+def last_vowel_of_bases(analysis):
+    '''
+    Position of the last vowel of only_bases(token), i.e. counted without the diacritics.
+    '''
+    return analyze(analysis.bases).last_vowel_ordinal
+
+
+def rule_tag_matches(rule, tag):
+    if rule.tags is None:
+        return True
+    masks = rule.tags if isinstance(rule.tags, tuple) else (rule.tags,)
+    return any(tag_matches(tag, mask) for mask in masks)
+
+
+def rule_macron(rule, analysis, lemma):
+    '''
+    The macron string that the rule gives the token of analysis, e.g. '^4', or None if its conditions other than the tag fail.
+    '''
+    if rule.endings is not None and not analysis.bases.endswith(rule.endings):
+        return None
+    if rule.lemma_endings is not None and not only_bases(lemma).endswith(rule.lemma_endings):
+        return None
+    if rule.condition is not None and not rule.condition(analysis):
+        return None
+    return f"{rule.length}{rule.position(analysis)}"
+
+
+def apply_rule(rule, token, tag='', lemma=''):
+    '''
+    The macron string that the rule gives a single token, or None.
+    '''
+    if not token or not rule_tag_matches(rule, tag):
+        return None
+    return rule_macron(rule, analyze(unicodedata.normalize('NFC', token)), lemma)
+
+
+class RuleSet:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.tag_classes = {}  # tag -> (rules by last letter, rules for any other last letter)
+        self.dispatch_tables = {}  # tuple of the indices of the rules of a tag class -> the same
+
+    def dispatch(self, tag):
+        '''
+        The rules that can apply to a token with this tag, as ({last letter of only_bases(token): rules}, rules for the other letters).
+        '''
+        found = self.tag_classes.get(tag)
+        if found is None:
+            tag_class = tuple(index for index, rule in enumerate(self.rules) if rule_tag_matches(rule, tag))
+            found = self.dispatch_tables.get(tag_class)
+            if found is None:
+                found = self.dispatch_tables[tag_class] = self.dispatch_table(tag_class)
+            self.tag_classes[tag] = found
+        return found
+
+    def dispatch_table(self, tag_class):
+        any_ending = tuple(self.rules[index] for index in tag_class if self.rules[index].endings is None)
+        last_letters = {ending[-1:] for index in tag_class for ending in self.rules[index].endings or ()}
+        by_last_letter = {
+            letter: tuple(self.rules[index] for index in tag_class
+                          if self.rules[index].endings is None or any(ending[-1:] == letter for ending in self.rules[index].endings))
+            for letter in last_letters
+        }
+        return by_last_letter, any_ending
+
+    def applies_to(self, tag):
+        '''
+        Whether any rule can apply to a token with this tag.
+        '''
+        by_last_letter, any_ending = self.dispatch(tag)
+        return bool(by_last_letter or any_ending)
+
+    def apply(self, table):
+        '''
+        Applies the rules to the rows of a MacronTable in place, in one pass.
+        Rows with fewer than four columns are dropped and all rows are given at least five columns.
+        Returns {rule name: number of rows whose macrons it changed}.
+        '''
+        hits = dict.fromkeys((rule.name for rule in self.rules), 0)
+        table.keep_complete_rows()
+        dispatch_by_tag_id = [self.dispatch(tag) for tag in table.tags.values]
+
+        for i in table.rows_with_tag(self.applies_to):
+            by_last_letter, any_ending = dispatch_by_tag_id[table.tags.ids[i]]
+            token = table.token(i)
+            if not token:
+                continue
+
+            analysis = analyze(unicodedata.normalize('NFC', token))
+            rules = by_last_letter.get(analysis.bases[-1:], any_ending)
+            if not rules:
+                continue
+
+            original_macrons = macrons = table.macrons(i)
+            sources = []
+            for rule in rules:
+                new_macron = rule_macron(rule, analysis, table.lemma(i))
+                if new_macron:
+                    collated = macrons | parse_macrons(new_macron)
+                    if collated != macrons:
+                        macrons = collated
+                        hits[rule.name] += 1
+                        sources.append(rule.source)
+
+            if macrons != original_macrons:
+                table.set_macrons(i, macrons)
+                for source in dict.fromkeys(sources):
+                    table.add_source(i, source, once=True)
+
+        return hits
+
+
+def apply_rules(table, rules):
+    '''
+    RuleSet(rules).apply(table)
+    '''
+    return RuleSet(rules).apply(table)
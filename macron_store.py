@@ -0,0 +1,192 @@
+'''
+/macron_store.py
+
+MacronStore owns macrons.db, so that the preparation script, the algorithms and the app
+share one indexed table instead of each opening their own connection or rescanning TSVs.
+
+The table annotated_tokens has the columns of the macron TSVs,
+    token, tag, lemma, macrons, source
+plus bases, i.e. only_bases(token), which is stored so that it can be indexed.
+There are indices on token, (token, tag), lemma and bases, and the database is in WAL mode,
+so that the app can read while a script is writing.
+Opening a store changes nothing: the schema, the indices and WAL mode are only set up (create_schema) by the first write,
+or by macrons_prepare.py, so that reading the versioned macrons.db leaves it as it is.
+
+>> store = MacronStore()
+>> store.get_many(['ψυχή'])
+>> {'ψυχή': [['ψυχή', 'n-s---fn-', 'ψυχή', '_2', 'wiktionary']]}
+>> store.upsert_many([['ψυχή', 'n-s---fn-', 'ψυχή', '_2', 'manual']])
+>> store.close()
+
+'''
+
+import sqlite3
+import threading
+
+from utils import only_bases
+from collate_macrons import read_macron_tsv, write_macron_tsv
+
+COLUMNS = ['token', 'tag', 'lemma', 'macrons', 'source']
+
+# sqlite caches the compiled statement of each distinct SQL string, so keeping them constant makes them prepared statements
+SELECT_ROWS = "SELECT token, tag, lemma, COALESCE(macrons, ''), COALESCE(source, '') FROM annotated_tokens"
+SELECT_BY_TOKENS = SELECT_ROWS + ' WHERE token IN ({}) ORDER BY id'
+SELECT_BY_BASES = SELECT_ROWS + ' WHERE bases = ? ORDER BY id'
+# IS rather than =, so that rows with a NULL tag or lemma are matched too
+UPDATE_ROW = 'UPDATE annotated_tokens SET macrons = ?, source = ? WHERE token IS ? AND tag IS ? AND lemma IS ?'
+UPDATE_FIRST_ROW = '''UPDATE annotated_tokens SET macrons = ?, source = ?
+WHERE id = (SELECT id FROM annotated_tokens WHERE token = ? ORDER BY id LIMIT 1)'''
+INSERT_ROW = 'INSERT INTO annotated_tokens (token, tag, lemma, macrons, source, bases) VALUES (?, ?, ?, ?, ?, ?)'
+
+# get_many asks for at most this many tokens per query, which keeps the number of distinct statements at two
+BATCH_SIZE = 500
+
+
+def pad_row(row):
+    '''
+    A row of the macron TSVs as the five values stored, with the macrons as a string (they may be a MacronSet).
+    '''
+    row = list(row) + [None] * (5 - len(row))
+    token, tag, lemma, macrons, source = row[:5]
+    return token, tag, lemma, None if macrons is None else str(macrons), source
+
+
+class MacronStore:
+    def __init__(self, db_path='macrons.db'):
+        self.db_path = db_path
+        # one connection shared by all threads (e.g. those of the Flask app), serialized by the lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.schema_created = False
+        with self.lock:
+            exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'annotated_tokens'").fetchone()
+        if not exists:
+            self.create_schema()  # a new database
+
+    def create_schema(self):
+        '''
+        Creates annotated_tokens and its indices if missing. A macrons.db created before
+        the bases column existed gets it added and filled in. Called by the methods that write.
+        '''
+        if self.schema_created:
+            return
+        self.schema_created = True
+        with self.lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS annotated_tokens (
+                id INTEGER PRIMARY KEY,
+                token TEXT NOT NULL,
+                tag TEXT,
+                lemma TEXT,
+                macrons TEXT,
+                source TEXT,
+                bases TEXT
+            )
+            ''')
+
+            columns = [row[1] for row in self.conn.execute('PRAGMA table_info(annotated_tokens)')]
+            if 'bases' not in columns:
+                self.conn.execute('ALTER TABLE annotated_tokens ADD COLUMN bases TEXT')
+
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_annotated_tokens_token ON annotated_tokens (token)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_annotated_tokens_token_tag ON annotated_tokens (token, tag)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_annotated_tokens_lemma ON annotated_tokens (lemma)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_annotated_tokens_bases ON annotated_tokens (bases)')
+
+            tokens = [row[0] for row in self.conn.execute('SELECT DISTINCT token FROM annotated_tokens WHERE bases IS NULL')]
+            self.conn.executemany('UPDATE annotated_tokens SET bases = ? WHERE token = ?', [(only_bases(token), token) for token in tokens])
+
+    def get_many(self, tokens):
+        '''
+        All rows of each of the tokens, in table order, as {token: [[token, tag, lemma, macrons, source], ...]}.
+        Tokens not in the table are left out.
+        '''
+        tokens = list(dict.fromkeys(tokens))
+        found = {}
+        with self.lock:
+            for i in range(0, len(tokens), BATCH_SIZE):
+                batch = tokens[i:i + BATCH_SIZE]
+                batch += [None] * (BATCH_SIZE - len(batch))  # pad, so that every query is the same statement
+                for row in self.conn.execute(SELECT_BY_TOKENS.format(', '.join('?' * BATCH_SIZE)), batch):
+                    found.setdefault(row[0], []).append(list(row))
+        return found
+
+    def has_column(self, column):
+        with self.lock:
+            return column in [row[1] for row in self.conn.execute('PRAGMA table_info(annotated_tokens)')]
+
+    def has_macrons(self):
+        '''
+        Whether any row has macrons, i.e. whether the collation has been loaded into the database.
+        '''
+        if not self.has_column('macrons'):
+            return False
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM annotated_tokens WHERE macrons != '' LIMIT 1").fetchone() is not None
+
+    def get_by_bases(self, token):
+        '''
+        All rows whose token has the same base letters as token, e.g. ἄγε and ἀγέ.
+        In a database without the bases column (which is only added by a write), the rows are filtered here instead.
+        '''
+        bases = only_bases(token)
+        if not self.has_column('bases'):
+            return [row for row in self.read_rows() if only_bases(row[0]) == bases]
+        with self.lock:
+            return [list(row) for row in self.conn.execute(SELECT_BY_BASES, (bases,))]
+
+    def upsert_many(self, rows):
+        '''
+        Sets the macrons and source of every row with the same token, tag and lemma,
+        and inserts the rows that are not in the table yet. All in one transaction.
+        Returns the number of rows inserted.
+        '''
+        self.create_schema()
+        inserted = 0
+        with self.lock, self.conn:
+            for token, tag, lemma, macrons, source in map(pad_row, rows):
+                if self.conn.execute(UPDATE_ROW, (macrons, source, token, tag, lemma)).rowcount == 0:
+                    self.conn.execute(INSERT_ROW, (token, tag, lemma, macrons, source, only_bases(token)))
+                    inserted += 1
+        return inserted
+
+    def update_first_row(self, token, macrons, source):
+        '''
+        Sets the macrons and source of the first row of the token (in table order) only.
+        Returns whether the token was found.
+        '''
+        self.create_schema()
+        with self.lock, self.conn:
+            return self.conn.execute(UPDATE_FIRST_ROW, (str(macrons), source, token)).rowcount > 0
+
+    def read_rows(self):
+        '''
+        All rows in table order, like the rows returned by collate_macrons.read_macron_tsv but with the macrons unparsed.
+        '''
+        with self.lock:
+            return [list(row) for row in self.conn.execute(SELECT_ROWS + ' ORDER BY id')]
+
+    def write_rows(self, rows):
+        '''
+        Replaces the contents of the table with rows, in order, in one transaction.
+        Used where a script would otherwise write out a whole TSV.
+        '''
+        self.create_schema()
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM annotated_tokens')
+            self.conn.executemany(INSERT_ROW, [(*row, only_bases(row[0])) for row in map(pad_row, rows)])
+
+    def import_tsv(self, input_tsv):
+        '''
+        Replaces the contents of the table with the rows of a macron TSV, e.g. the output of the collation.
+        '''
+        header, rows = read_macron_tsv(input_tsv)
+        self.write_rows(rows)
+        return len(rows)
+
+    def export_tsv(self, output_tsv, header=COLUMNS):
+        write_macron_tsv(output_tsv, header, self.read_rows())
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,113 @@
+'''
+ALGORITHMIC MACRONIZING, ALL PARTS IN ONE PASS
+
+Runs algorithms 1–5 in memory on macrons_wiki_hypo_ifth_lsj.tsv, which is read once,
+and writes only the final output. Previously each stage read and wrote a full TSV:
+
+    macrons_wiki_hypo_ifth_lsj.tsv
+    ==> algorithm1_accentual_rules.py ==> macrons_alg1_ultima.tsv
+    ==> algorithm2_nominal_forms.py   ==> macrons_alg2_nominal.tsv
+    ==> algorithm3_prefixes.py        ==> macrons_alg3_prefix.tsv
+    ==> algorithm4_barytone.py        ==> macrons_alg4_barytone.tsv
+    ==> algorithm5_generalize_threads.py ==> macrons_alg5_generalize_threads.tsv
+
+The rules of algorithms 1–3 are applied together, in one pass, by the rule engine of macron_rules.py (stage rules),
+followed by algorithms 4 and 5. The stages are registered in STAGES in that order, each with the name of the file it used to write
+(the rules stage with that of algorithm 3), so that the intermediate files can still be dumped for debugging with --dump.
+With --db, the rows are instead read from and written back to macrons.db through MacronStore.
+In between, the rows are held in a MacronTable (macron_table.py), column by column.
+
+Usage:
+    python macronize_pipeline.py
+    python macronize_pipeline.py --input macrons_wiki_hypo_ifth_lsj.tsv --output macrons_alg5_generalize_threads.tsv --dump dumps/
+    python macronize_pipeline.py --db macrons.db
+'''
+
+import os
+import argparse
+
+from utils import Colors
+from macron_table import MacronTable
+from macron_store import MacronStore, COLUMNS
+from macron_rules import RuleSet
+from algorithm1_accentual_rules import BREVE_ULTIMA_RULES
+from algorithm2_nominal_forms import NOMINAL_RULES
+from algorithm3_prefixes import PREFIX_RULES
+from algorithm4_barytone import inherit_barytone_macrons
+from algorithm5_generalize_threads import generalize_cognates
+
+
+# the rules of algorithms 1–3, in the order the algorithms ran
+RULES = RuleSet(BREVE_ULTIMA_RULES + NOMINAL_RULES + PREFIX_RULES)
+
+# (name, function applied in place to the MacronTable, file the stage used to write)
+STAGES = [
+    ('rules', RULES.apply, 'macrons_alg3_prefix.tsv'),
+    ('barytone', inherit_barytone_macrons, 'macrons_alg4_barytone.tsv'),
+    ('cognate', generalize_cognates, 'macrons_alg5_generalize_threads.tsv'),
+]
+
+
+def run_stages(table, dump_dir=None, stages=STAGES):
+    '''
+    Applies the stages in order to the MacronTable, in place.
+    If dump_dir is given, the table is also written there after each stage, under the stage's old file name.
+    Returns a dict with the counts reported by each stage (for the rules stage, a dict of the hits of each rule).
+    '''
+    counts = {}
+
+    for name, stage, dump_name in stages:
+        counts[name] = stage(table)
+        reported = counts[name].items() if isinstance(counts[name], dict) else [(name, counts[name])]
+        for counted, count in reported:
+            print(f"{Colors.GREEN}{counted}: {count}{Colors.ENDC}")
+
+        if dump_dir:
+            os.makedirs(dump_dir, exist_ok=True)
+            table.write_tsv(os.path.join(dump_dir, dump_name))
+
+    return counts
+
+
+def run_pipeline(input_tsv, output_tsv, dump_dir=None, stages=STAGES):
+    '''
+    Applies the stages in order to the rows of input_tsv and writes the result to output_tsv.
+    '''
+    table = MacronTable.read_tsv(input_tsv)  # the macron column is parsed into bitmasks once, here
+    counts = run_stages(table, dump_dir, stages)
+
+    table.write_tsv(output_tsv)
+    print(f"{Colors.GREEN}Processed file saved as: {output_tsv}{Colors.ENDC}")
+
+    return counts
+
+
+def run_pipeline_on_store(db_path, dump_dir=None, stages=STAGES):
+    '''
+    Like run_pipeline, but reads the rows from macrons.db and writes them back to it.
+    '''
+    store = MacronStore(db_path)
+    table = MacronTable.from_rows(store.read_rows(), header=COLUMNS)
+
+    counts = run_stages(table, dump_dir, stages)
+
+    store.write_rows(table.rows())
+    store.close()
+    print(f"{Colors.GREEN}Processed rows saved to: {db_path}{Colors.ENDC}")
+
+    return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run algorithms 1–5 in one pass.')
+    parser.add_argument('--input', default='macrons_wiki_hypo_ifth_lsj.tsv', help='Collated macrons TSV.')
+    parser.add_argument('--output', default='macrons_alg5_generalize_threads.tsv', help='Final output TSV.')
+    parser.add_argument('--dump', default=None, help='Directory to which the intermediate TSVs are written after each stage.')
+    parser.add_argument('--db', default=None, help='Read the rows from and write them back to this macrons.db instead of TSVs.')
+
+    args = parser.parse_args()
+
+    if args.db:
+        run_pipeline_on_store(args.db, args.dump)
+    else:
+        run_pipeline(args.input, args.output, args.dump)
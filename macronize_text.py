@@ -0,0 +1,254 @@
+'''
+MACRONIZING RUNNING TEXT
+
+Puts the macrons of the finished dictionary (by default macrons_alg5_generalize_threads.tsv, the output of
+macronize_pipeline.py, or a macrons.db) on arbitrary Greek text:
+
+>> macronize_text('ἄγ’, ὦ τέκνον, ψυχή')
+>> 'ᾰ̓́γ’, ὦ τέκνον, ψῡχή'
+
+The text is split into tokens the way the token list was made, i.e. on whitespace and on the characters of
+utils.Punctuation, while the elision marks of utils.Elision stay part of the token. Any other characters that are not
+letters at the start or end of a token (brackets, quotes, colons, exclamation marks...) are set aside and put back
+after the lookup, and the token is looked up in NFC, so that decomposed text is macronized too.
+Each token is looked up in a MacronIndex, a dict from token to macronized token, which is built once per index file and cached;
+a macron (U+0304) or breve (U+0306) is combined with the letter at each ordinal of the macron column,
+if it is one of the dichrona α, ι, υ (some sources also mark η and ω, which need no mark).
+
+Tokens that are not in the dictionary as they stand are looked up in lower case (e.g. at the start of a sentence),
+and otherwise left as they are.
+
+Whole corpora are macronized with macronize_corpus (--output-dir), which streams each file in chunks of lines
+to a pool of processes. Each process has the index once: inherited from the parent where processes are forked,
+built by the initializer where they are spawned. The chunks are written back in their original order.
+
+Usage:
+    python macronize_text.py euripides_medea.txt > euripides_medea_macrons.txt
+    cat euripides_medea.txt | python macronize_text.py --index macrons.db
+    python macronize_text.py tragedies/*.txt --output-dir tragedies_macrons --workers 8
+'''
+
+import os
+import re
+import sys
+import argparse
+import unicodedata
+from collections import deque
+from itertools import islice
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import Colors, Elision, punctuation_chars_set
+from greek_characters import base_letter_chars, char_properties
+from collate_macrons import MacronSet, parse_macrons, read_macron_tsv
+from macron_store import MacronStore
+
+LONG = '̄'  # combining macron
+SHORT = '̆'  # combining breve
+
+default_index_path = 'macrons_alg5_generalize_threads.tsv'
+
+dichrona_bases = set('αιυΑΙΥ')
+
+# a token is anything between whitespace and punctuation; elision marks are not punctuation
+token_pattern = re.compile(f"[^\\s{re.escape(''.join(sorted(punctuation_chars_set)))}]+")
+
+
+def apply_macrons(token, macrons):
+    '''
+    Combines a macron or breve with the base letter at each ordinal of the macron column, if it is α, ι or υ.
+    >> apply_macrons('ψυχή', '_2_4')
+    >> 'ψῡχή'
+    '''
+    if isinstance(macrons, str):
+        macrons = parse_macrons(macrons)
+    if not macrons:
+        return token
+
+    chars = list(token)
+    ordinal = 0
+    for i, char in enumerate(token):
+        if char in base_letter_chars:
+            ordinal += 1
+            if ordinal in macrons and char_properties[char].base in dichrona_bases:
+                mark = LONG if macrons.longs >> ordinal & 1 else SHORT
+                decomposed = unicodedata.normalize('NFD', char)
+                # the mark goes right after the letter, before breathings and accents, as in crawl_wiktionary/macrons_map.py
+                chars[i] = unicodedata.normalize('NFC', decomposed[0] + mark + decomposed[1:])
+    return ''.join(chars)
+
+
+def merge_token_macrons(macron_sets):
+    '''
+    The macrons of a token that appears in several rows (with different tags or lemmata):
+    all positions that some row has, except those that are long in one row and short in another.
+    >> str(merge_token_macrons([parse_macrons('^1^3'), parse_macrons('^1_3_5')]))
+    >> '^1_5'
+    '''
+    longs = shorts = 0
+    for macrons in macron_sets:
+        longs |= macrons.longs
+        shorts |= macrons.shorts
+    conflicts = longs & shorts
+    return MacronSet(longs & ~conflicts, shorts & ~conflicts)
+
+
+def is_word_char(char):
+    '''
+    Letters and combining marks (category L or M), which includes the elision mark ʼ (U+02BC).
+    '''
+    return unicodedata.category(char)[0] in 'LM'
+
+
+def split_affixes(token):
+    '''
+    (leading non-letters, word, trailing non-letters) of a token; an elision mark ’ at the end stays with the word.
+    >> split_affixes('«ψυχή»!')
+    >> ('«', 'ψυχή', '»!')
+    '''
+    start = 0
+    while start < len(token) and not is_word_char(token[start]):
+        start += 1
+    end = len(token)
+    while end > start and not is_word_char(token[end - 1]) and token[end - 1] != Elision.ELISION1:
+        end -= 1
+    return token[:start], token[start:end], token[end:]
+
+
+class MacronIndex:
+    '''
+    Token -> macronized token, for all tokens with macrons in the dictionary.
+    '''
+    def __init__(self, rows):
+        macron_sets = {}
+        for row in rows:
+            if len(row) >= 4 and row[3]:
+                macrons = parse_macrons(row[3]) if isinstance(row[3], str) else row[3]
+                macron_sets.setdefault(row[0], []).append(macrons)
+
+        self.macrons = {token: merge_token_macrons(sets) for token, sets in macron_sets.items()}
+        self.macronized = {token: apply_macrons(token, macrons) for token, macrons in self.macrons.items()}
+
+    def __len__(self):
+        return len(self.macronized)
+
+    def macronize_word(self, word):
+        '''
+        The macronized NFC form of a word without leading or trailing punctuation, or the word as it is if it has no macrons.
+        '''
+        word_nfc = unicodedata.normalize('NFC', word)
+        macronized = self.macronized.get(word_nfc)
+        if macronized is not None:
+            return macronized
+
+        key = word_nfc.replace(Elision.ELISION2, Elision.ELISION1)
+        macrons = self.macrons.get(key) or self.macrons.get(key.lower())
+        if macrons is None:
+            if key.endswith(Elision.ELISION1) and len(key) > 1:
+                # a closing quotation mark rather than an elision
+                stripped = self.macronize_word(word_nfc[:-1])
+                if stripped != word_nfc[:-1]:
+                    return stripped + word_nfc[-1]
+            return word
+
+        macronized = self.macronized[word_nfc] = apply_macrons(word_nfc, macrons)
+        return macronized
+
+    def macronize_token(self, token):
+        prefix, word, suffix = split_affixes(token)
+        if not word:
+            return token
+        return prefix + self.macronize_word(word) + suffix
+
+    def macronize_text(self, text):
+        return token_pattern.sub(lambda match: self.macronize_token(match.group()), text)
+
+
+@lru_cache(maxsize=None)
+def load_macron_index(index_path=default_index_path):
+    '''
+    Builds the MacronIndex of a macron TSV or of a macrons.db, once per path.
+    '''
+    if index_path.endswith('.db'):
+        store = MacronStore(index_path)
+        rows = store.read_rows()
+        store.close()
+    else:
+        header, rows = read_macron_tsv(index_path)
+    return MacronIndex(rows)
+
+
+def macronize_text(text, index_path=default_index_path):
+    return load_macron_index(index_path).macronize_text(text)
+
+
+### CORPUS MODE
+
+
+worker_index = None
+
+
+def init_worker(index_path):
+    global worker_index
+    worker_index = load_macron_index(index_path)  # a cache hit if the process was forked from one that had it
+
+
+def macronize_chunk(chunk):
+    return worker_index.macronize_text(chunk)
+
+
+def read_chunks(file_path, chunk_lines):
+    '''
+    Yields the file in chunks of whole lines, so that no token is cut in two.
+    '''
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        while True:
+            lines = list(islice(file, chunk_lines))
+            if not lines:
+                return
+            yield ''.join(lines)
+
+
+def macronize_corpus(input_paths, output_dir, index_path=default_index_path, num_workers=None, chunk_lines=2000):
+    '''
+    Macronizes each input file into a file of the same name in output_dir, using num_workers processes
+    (default: one per core). At most two chunks per process are in flight, so files of any size are streamed,
+    and the results are written in the order of the chunks.
+    '''
+    num_workers = num_workers or os.cpu_count()
+    load_macron_index(index_path)  # loaded before the pool is started, so that forked workers share it
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker, initargs=(index_path,)) as executor:
+        for input_path in input_paths:
+            output_path = os.path.join(output_dir, os.path.basename(input_path))
+            with open(output_path, 'w', encoding='utf-8', newline='') as outfile:
+                in_flight = deque()
+                for chunk in read_chunks(input_path, chunk_lines):
+                    in_flight.append(executor.submit(macronize_chunk, chunk))
+                    if len(in_flight) >= 2 * num_workers:
+                        outfile.write(in_flight.popleft().result())
+                while in_flight:
+                    outfile.write(in_flight.popleft().result())
+            print(f"{Colors.GREEN}Macronized {input_path} into {output_path}{Colors.ENDC}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Macronize Greek text with the macron dictionary.')
+    parser.add_argument('files', nargs='*', help='Text files to macronize (default: stdin). The result is written to stdout.')
+    parser.add_argument('--index', default=default_index_path, help='Macron TSV or macrons.db to look the tokens up in.')
+    parser.add_argument('--output-dir', default=None, help='Corpus mode: write each file macronized into this directory, using a process pool.')
+    parser.add_argument('--workers', type=int, default=None, help='Number of processes in corpus mode (default: one per core).')
+
+    args = parser.parse_args()
+
+    if args.output_dir:
+        macronize_corpus(args.files, args.output_dir, args.index, args.workers)
+        sys.exit()
+
+    index = load_macron_index(args.index)
+    if not args.files:
+        sys.stdout.write(index.macronize_text(sys.stdin.read()))
+    for file_path in args.files:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            sys.stdout.write(index.macronize_text(file.read()))
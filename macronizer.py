@@ -0,0 +1,130 @@
+'''
+/macronizer.py
+
+One entry point for the steps of building and using the macron dictionary, run from the root of the repository:
+
+    python macronizer.py prepare                 # macrons_prepare.py: create macrons.db from the token list
+    python macronizer.py collate --streaming     # collation/macrons_collate.py: collate the macron sources
+    python macronizer.py algorithms --db macrons.db   # macronize_pipeline.py: algorithms 1–5
+    python macronizer.py stats macrons_alg5_generalize_threads.tsv   # stats.py
+    python macronizer.py serve                   # app.py: the web interface
+    python macronizer.py macronize medea.txt     # macronize_text.py: put the macrons on running text
+    python macronizer.py build                   # build.py: rebuild the stages whose inputs or code have changed
+
+Each command runs the script of its step as if it had been started itself, with the arguments that follow the command
+(so that e.g. python macronizer.py algorithms --help shows the options of macronize_pipeline.py).
+Nothing but the standard library is imported before a command is chosen, and then only the modules of that command:
+pyuca, bs4, pandas, plotly, flask and greek_inflexion are loaded by the code that needs them, never on import.
+
+The cold start is kept in check by the startup command, which times in fresh interpreters
+python macronizer.py --help and the import of the module of each command, less the start of a bare interpreter,
+and exits with 1 if any of them is over the budget or cannot be imported:
+
+    python macronizer.py startup --budget 0.5
+'''
+
+import os
+import sys
+import time
+import runpy
+import argparse
+import subprocess
+
+# command -> (module run as __main__, description)
+COMMANDS = {
+    'prepare': ('macrons_prepare', 'Create macrons.db and fill it with the token list.'),
+    'collate': ('collation.macrons_collate', 'Collate all sources of macrons into the token list.'),
+    'algorithms': ('macronize_pipeline', 'Run algorithms 1–5 on the collated macrons.'),
+    'stats': ('stats', 'Count the dichrona and macrons of a macron TSV.'),
+    'serve': ('app', 'Serve the web interface.'),
+    'macronize': ('macronize_text', 'Macronize Greek text with the macron dictionary.'),
+    'build': ('build', 'Rebuild the stages of the pipeline whose inputs or code have changed.'),
+}
+
+# seconds a command may add to the start of a bare interpreter
+STARTUP_BUDGET = 0.5
+
+root_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_command(command, args):
+    '''
+    Runs the module of the command as __main__, with args as its command line.
+    '''
+    module_name, description = COMMANDS[command]
+    if root_dir not in sys.path:
+        sys.path.insert(0, root_dir)
+    sys.argv = [sys.argv[0]] + args  # runpy puts the path of the module in sys.argv[0]
+    runpy.run_module(module_name, run_name='__main__', alter_sys=True)
+
+
+def time_python(code_args, repeat=3):
+    '''
+    The fastest of repeat runs of a fresh interpreter with code_args, in seconds, and the output of the last one if it failed, else None.
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable] + code_args, cwd=root_dir, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            return elapsed, (result.stderr or result.stdout).strip().splitlines()[-1:]
+        best = elapsed if best is None else min(best, elapsed)
+    return best, None
+
+
+def check_startup(budget=STARTUP_BUDGET):
+    '''
+    Times the cold start of the CLI and the import of the module of each command, less the start of a bare interpreter.
+    Returns the number of them that are over budget or fail.
+    '''
+    from utils import Colors
+
+    baseline, _ = time_python(['-c', 'pass'])
+    print(f"Bare interpreter: {baseline:.3f}s; budget per command: {budget:.3f}s on top of it")
+
+    checks = [('macronizer.py --help', ['macronizer.py', '--help'])]
+    checks += [(f"import {module_name}", ['-c', f'import {module_name}']) for module_name, description in COMMANDS.values()]
+
+    failures = 0
+    for label, code_args in checks:
+        elapsed, error = time_python(code_args)
+        if error is not None:
+            failures += 1
+            print(f"{Colors.RED}{label:40s} failed: {' '.join(error)}{Colors.ENDC}")
+            continue
+        overhead = elapsed - baseline
+        color = Colors.GREEN if overhead <= budget else Colors.RED
+        failures += overhead > budget
+        print(f"{color}{label:40s} {overhead:6.3f}s{Colors.ENDC}")
+
+    return failures
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='macronizer.py',
+        description='Build and use the macron dictionary.',
+        epilog='\n'.join(f"  {command:12s}{description}" for command, (module_name, description) in COMMANDS.items())
+               + f"\n  {'startup':12s}Check the cold start of the commands against a budget.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('command', choices=list(COMMANDS) + ['startup'], metavar='command', help='One of the commands below.')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='Arguments of the command; see macronizer.py <command> --help.')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'startup':
+        budget_parser = argparse.ArgumentParser(prog='macronizer.py startup')
+        budget_parser.add_argument('--budget', type=float, default=STARTUP_BUDGET, help='Seconds a command may add to the start of a bare interpreter.')
+        budget = budget_parser.parse_args(args.args).budget
+        sys.exit(1 if check_startup(budget) else 0)
+
+    run_command(args.command, args.args)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,55 +7,52 @@ token, tag, lemma, macrons, source
 
 The last two are filled by macrons_collate.py.
 
+The database is owned by MacronStore (/macron_store.py), which also sets up its indices.
+
 '''
-import sqlite3
 import csv
+import argparse
 from utils import Colors
+from macron_store import MacronStore
 
 
 def create_output_database(db_path="macrons.db"):
     """
     Creates the output database called 'macrons' for storing tokens along with tag, lemma, macrons, and source.
     """
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS annotated_tokens (
-            id INTEGER PRIMARY KEY,
-            token TEXT NOT NULL,
-            tag TEXT,
-            lemma TEXT,
-            macrons TEXT,
-            source TEXT
-        )
-        ''')
-        conn.commit()
+    store = MacronStore(db_path)
+    store.create_schema()
+    store.close()
     print("Database and table created successfully.")
 
-# Call the function to create the database and table
-create_output_database()
-
 def populate_db_with_tokens(db_path, tokens_path):
     """
-    Populates the database with data from the tokens text file.
+    Populates the database with data from the tokens text file, replacing what was there.
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
     total_lines = 0
+    rows = []
     with open(tokens_path, encoding='utf-8') as file:
         reader = csv.reader(file, delimiter='\t')
         for row in reader:
             total_lines += 1
             if len(row) >= 3:
-                # Insert the data into the database
-                cursor.execute('''INSERT INTO annotated_tokens (token, tag, lemma) VALUES (?, ?, ?)''', (row[0], row[1], row[2]))
+                rows.append(row[:3])
 
-    # Commit changes and close the database connection
-    conn.commit()
-    conn.close()
+    # Insert the data into the database in one transaction
+    store = MacronStore(db_path)
+    store.write_rows(rows)
+    store.close()
 
     print(f"{Colors.GREEN}Total lines processed and inserted: {total_lines}{Colors.ENDC}")
 
-# Example function call
-populate_db_with_tokens("macrons.db", "prepare_tokens/tokens/tokens_nfc.tsv")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Create macrons.db and fill it with the token list.')
+    parser.add_argument('--db', default='macrons.db', help='Database to create.')
+    parser.add_argument('--tokens', default='prepare_tokens/tokens/tokens_nfc.tsv', help='Token, tag, lemma TSV.')
+
+    args = parser.parse_args()
+
+    create_output_database(args.db)
+    populate_db_with_tokens(args.db, args.tokens)
+
@@ -22,7 +22,9 @@ def normalize_tsv_to_nfc(input_file_path, output_file_path):
 
     print(f"Normalization complete. Output saved to: {output_file_path}")
 
-# Example usage
-input_tsv_path = 'crawl_wiktionary/macrons_wiktionary_test_format.tsv'  # Update this path
-output_tsv_path = 'crawl_wiktionary/macrons_wiktionary_test_format_nfc.tsv'  # Update this path
-normalize_tsv_to_nfc(input_tsv_path, output_tsv_path)
+
+if __name__ == '__main__':
+    # Example usage
+    input_tsv_path = 'crawl_wiktionary/macrons_wiktionary_test_format.tsv'  # Update this path
+    output_tsv_path = 'crawl_wiktionary/macrons_wiktionary_test_format_nfc.tsv'  # Update this path
+    normalize_tsv_to_nfc(input_tsv_path, output_tsv_path)
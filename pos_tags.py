@@ -0,0 +1,100 @@
+'''
+/pos_tags.py
+
+The 9-character morphological tags of the token list (OdyCy, in the Perseus/AGDT format), e.g.
+    n-p---fa-   noun, plural, feminine, accusative
+    v1spia---   verb, 1st person, singular, present, indicative, active
+decoded once into an integer with one bit per value of each position, so that a condition on tags is a single AND
+instead of a regex match:
+
+>> plural_fem_acc = tag_mask(part_of_speech='na', number='p', gender='f', case='a')   # was ^[na].p...fa.$
+>> tag_matches('n-p---fa-', plural_fem_acc)
+>> True
+>> tag_matches('n-s---fa-', plural_fem_acc)
+>> False
+
+Every position of a decoded tag has exactly one bit set: that of its value, or of '-', or of other (any character not listed
+in FIELDS). A mask is the union of the bits that a condition excludes, so a tag meets it if it has none of them:
+    decode_tag(tag) & mask == 0
+Tags that are not 9 characters long (e.g. '' for a token without analysis) have the INVALID bit, which every mask excludes,
+as a regex anchored with ^...$ would never have matched them.
+'''
+
+from functools import lru_cache
+
+
+# (name, values) of the positions of the tag, in order; '-' is allowed everywhere and means not applicable
+FIELDS = [
+    ('part_of_speech', 'nvtadlgcrpmieux'),
+    ('person', '123'),
+    ('number', 'spd'),
+    ('tense', 'pirltfa'),
+    ('mood', 'isnmpo'),
+    ('voice', 'apme'),
+    ('gender', 'mfnc'),
+    ('case', 'ngdavl'),
+    ('degree', 'pcs'),
+]
+
+TAG_LENGTH = len(FIELDS)
+
+FIELD_NAMES = [name for name, values in FIELDS]
+
+
+def assign_bits(fields):
+    '''
+    A dict per position from its values, '-' and None (any other character) to their bits, and the next bit free.
+    '''
+    field_bits = []
+    bit = 1
+    for name, values in fields:
+        bits = {}
+        for value in ('-', None, *values):
+            bits[value] = bit
+            bit <<= 1
+        field_bits.append(bits)
+    return field_bits, bit
+
+
+# FIELD_BITS[position][value] is the bit of that value; INVALID is the bit of tags that are not 9 characters long
+FIELD_BITS, INVALID = assign_bits(FIELDS)
+
+# all the bits of each position
+FIELD_MASKS = [sum(bits.values()) for bits in FIELD_BITS]
+
+
+@lru_cache(maxsize=None)
+def decode_tag(tag):
+    '''
+    >> bin(decode_tag('n-p---fa-')).count('1')
+    >> 9
+    '''
+    if not tag or len(tag) != TAG_LENGTH:
+        return INVALID
+
+    bits = 0
+    for field_bits, value in zip(FIELD_BITS, tag):
+        bits |= field_bits.get(value, field_bits[None])
+    return bits
+
+
+def tag_mask(**allowed):
+    '''
+    The mask of a condition given as position name=allowed values, e.g. case='gd' for genitive or dative;
+    the positions not named may have any value.
+    >> tag_mask(part_of_speech='n', case='d')   # was ^n......d.$
+    '''
+    mask = INVALID
+    for name, values in allowed.items():
+        position = FIELD_NAMES.index(name)
+        field_bits = FIELD_BITS[position]
+        unknown = set(values) - set(field_bits)
+        if unknown:
+            raise ValueError(f"{''.join(sorted(unknown))} not a value of {name}")
+        mask |= FIELD_MASKS[position] & ~sum(field_bits[value] for value in values)
+    return mask
+
+
+def tag_matches(tag, mask):
+    return not decode_tag(tag) & mask
+
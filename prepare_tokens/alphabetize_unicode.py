@@ -3,25 +3,118 @@ Alphabetizing a polytonic Greek dictionary after token and then lemma.
 
 For porting the Unicode Collation Algorithm to python, see:
 https://github.com/jtauber/pyuca
+
+external_sort sorts TSV rows that do not fit in memory: sorted runs of chunk_rows rows are written
+to temporary files and merged. It is used by the streaming collation in collation/macrons_collate.py,
+and by sort_greek_file when it is given chunk_rows.
+
+The pyuca keys come from utils.sort_key, i.e. one shared Collator and a cache, so a lemma that has a hundred forms
+is keyed once. sort_greek_file can also write the sorted rows with their keys in a first column (keyed_output_path);
+such a file is sorted again, e.g. after rows have been appended to it, by sort_keyed_file without computing any keys.
 '''
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import csv
-from pyuca import Collator
-from utils import Colors
+import heapq
+import tempfile
+from itertools import islice, chain
+from functools import lru_cache
+from operator import itemgetter
+from utils import Colors, sort_key
 
-def sort_greek_file(input_file_path, output_file_path):
-    c = Collator()
 
-    with open(input_file_path, 'r', encoding='utf-8') as infile:
-        rows = list(csv.reader(infile, delimiter='\t'))
+def write_run(rows, key, temp_dir, run_number):
+    run_path = os.path.join(temp_dir, f"run_{run_number}.tsv")
+    with open(run_path, 'w', newline='', encoding='utf-8') as run_file:
+        csv.writer(run_file, delimiter='\t').writerows(sorted(rows, key=key))
+    return run_path
+
+
+def read_run(run_path):
+    with open(run_path, 'r', newline='', encoding='utf-8') as run_file:
+        yield from csv.reader(run_file, delimiter='\t')
+
+
+def external_sort(rows, key, chunk_rows=100000, temp_dir=None):
+    '''
+    Yields the rows (lists of strings) sorted by key, with at most chunk_rows of them in memory:
+    each chunk is sorted and written to a temporary TSV, and the chunks are merged with heapq.merge.
+    The sort is stable. If all rows fit in one chunk (always, if chunk_rows is None), nothing is written to disk.
+    '''
+    rows = iter(rows)
+    chunk = list(islice(rows, chunk_rows))
+    next_chunk = list(islice(rows, chunk_rows))
+    if not next_chunk:
+        yield from sorted(chunk, key=key)
+        return
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as run_dir:
+        run_paths = []
+        while chunk:
+            run_paths.append(write_run(chunk, key, run_dir, len(run_paths)))
+            chunk, next_chunk = next_chunk, list(islice(rows, chunk_rows))
+        # merge keeps the order of the runs for equal keys, so the sort stays stable
+        yield from heapq.merge(*(read_run(run_path) for run_path in run_paths), key=key)
+
+@lru_cache(maxsize=1 << 17)
+def encoded_sort_key(string):
+    '''
+    The pyuca sort key of a string as a string of four hex digits per weight, which sorts as the key does
+    (all weights are below 0x10000), so that keys can be written to a TSV column and compared without being parsed.
+    '''
+    return ''.join(f"{weight:04x}" for weight in sort_key(string))
+
 
-    sorted_rows = sorted(rows, key=lambda row: (c.sort_key(row[2]), c.sort_key(row[0])) if len(row) >= 3 else ('', ''))
+def row_sort_key(row):
+    '''
+    Lemma, then token, as one string: the space sorts before any hex digit, so that a lemma sorts before its extensions.
+    '''
+    if len(row) < 3:
+        return ''
+    return f"{encoded_sort_key(row[2])} {encoded_sort_key(row[0])}"
+
+
+def write_sorted_rows(keyed_rows, output_file_path, keyed_output_path=None):
+    # the first sorted row only comes once all input has been read, so the output file may be the input file
+    keyed_rows = iter(keyed_rows)
+    first_row = next(keyed_rows, None)
+    keyed_rows = chain([first_row], keyed_rows) if first_row is not None else iter(())
 
     with open(output_file_path, 'w', newline='', encoding='utf-8') as outfile:
         writer = csv.writer(outfile, delimiter='\t')
-        writer.writerows(sorted_rows)
+        keyed_writer = None
+        if keyed_output_path:
+            keyed_file = open(keyed_output_path, 'w', newline='', encoding='utf-8')
+            keyed_writer = csv.writer(keyed_file, delimiter='\t')
+        for keyed_row in keyed_rows:
+            writer.writerow(keyed_row[1:])
+            if keyed_writer:
+                keyed_writer.writerow(keyed_row)
+        if keyed_writer:
+            keyed_file.close()
+
+
+def sort_greek_file(input_file_path, output_file_path, chunk_rows=None, keyed_output_path=None):
+    '''
+    Sorts the rows by lemma (third column) and then token (first column).
+    With chunk_rows, at most that many rows are held in memory (external_sort); otherwise the file is sorted in memory.
+    With keyed_output_path, the sorted rows are also written there with their key as the first column.
+    '''
+    with open(input_file_path, 'r', encoding='utf-8') as infile:
+        keyed_rows = ([row_sort_key(row)] + row for row in csv.reader(infile, delimiter='\t'))
+        write_sorted_rows(external_sort(keyed_rows, key=itemgetter(0), chunk_rows=chunk_rows), output_file_path, keyed_output_path)
+
+    print(f"{Colors.GREEN}Sorted file saved to {output_file_path}{Colors.ENDC}")
+
+
+def sort_keyed_file(keyed_input_path, output_file_path, chunk_rows=None, keyed_output_path=None):
+    '''
+    Like sort_greek_file, for a file written with keyed_output_path: the keys are read, not computed.
+    '''
+    with open(keyed_input_path, 'r', newline='', encoding='utf-8') as infile:
+        keyed_rows = csv.reader(infile, delimiter='\t')
+        write_sorted_rows(external_sort(keyed_rows, key=itemgetter(0), chunk_rows=chunk_rows), output_file_path, keyed_output_path)
 
     print(f"{Colors.GREEN}Sorted file saved to {output_file_path}{Colors.ENDC}")
 
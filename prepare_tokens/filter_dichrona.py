@@ -39,6 +39,7 @@ import re # for the regex patterns
 # local imports
 from utils import Colors, DICHRONA # /utils.py
 from erics_syllabifier import patterns, syllabifier
+from word_analysis import analyze, real_dichrona_positions # /word_analysis.py
 
 # END OF IMPORTS
 
@@ -60,42 +61,21 @@ def ultima(word):
     >> ultima('ποτιδέρκομαι')
     >> μαι
     '''
-    list_of_syllables = syllabifier(word)
-    ultima = list_of_syllables[-1]
-
-    return ultima
+    return analyze(word).ultima
 
 def properispomenon(word):
     '''
     >> properispomenon('ὗσον')
     >> True
     '''
-    list_of_syllables = syllabifier(word)
-    if len(list_of_syllables) >= 2: 
-        penultima = list_of_syllables[-2]
-        circumflexes = r'[ᾶῆῖῦῶἇἆἦἧἶἷὖὗὦὧἦἧἆἇὧὦᾆᾇᾷᾖᾗᾦᾧῷῇ]'
-        if re.search(circumflexes, penultima):
-            return True
-        else:
-            return False
-    else:
-        return False
+    return analyze(word).properispomenon
 
 def proparoxytone(word):
     '''
     >> proparoxytone('ποτιδέρκομαι')
     >> True
     '''
-    list_of_syllables = syllabifier(word)
-    if len(list_of_syllables) >= 3: 
-        antepenultima = list_of_syllables[-3]
-        acutes = r'[άέήόίύώἄἅἔἕὄὅἤἥἴἵὔὕὤὥΐΰᾄᾅᾴᾔᾕῄᾤᾥῴ]'
-        if re.search(acutes, antepenultima):
-            return True
-        else:
-            return False
-    else:
-        return False
+    return analyze(word).proparoxytone
 
 
 
@@ -155,23 +135,7 @@ def word_with_real_dichrona(s):
     - bool: True if the string contains a necessary DICHRONA character; 
             False otherwise.
     """
-    for i, char in enumerate(s):
-        if char in DICHRONA:
-
-            # Form pairs to check for diphthongs and adscriptum
-            prev_pair = s[i-1:i+1] if i > 0 else ''
-            next_pair = s[i:i+2] if i < len(s) - 1 else ''
-
-            # Check if the character is part of a diphthong or has adscriptum
-            if (prev_pair and (is_diphthong(prev_pair) or has_iota_adscriptum(prev_pair))) or \
-               (next_pair and (is_diphthong(next_pair) or has_iota_adscriptum(next_pair))):
-                continue  # Skip if any of these conditions are true
-
-            # If the character passes all checks, the string contains a necessary DICHRONA character
-            return True
-
-    # If the loop completes without returning True, no necessary DICHRONA character was found
-    return False
+    return bool(real_dichrona_positions(s))
 
 def properispomenon_with_dichronon_only_in_ultima(string):
     """
@@ -311,10 +311,6 @@ def process_file(input_file_path, output_file_path):
 
 ### USAGE
 
-
-input_file_path = 'prepare_tokens/tokens/tragedies_300595.txt'  # Your input file path
-output_file_path = 'prepare_tokens/tokens/tragedies_300595_fix_elision_hyphen.txt'  # Your output file path
-
 """
 3 april, 15:19; Elisions fixed: 16351. Token breaks fixed: 762. Conjectures fixed: 17.
 # Manually fixed:
@@ -333,8 +329,10 @@ output_file_path = 'prepare_tokens/tokens/tragedies_300595_fix_elision_hyphen.tx
     βασιλείοισιν	a-p---md-	βασιλείοισιν (from βασιλείοιςιν)
 
 """
-    
-#input_file_path = 'prepare_tokens/tokens/test_elision.txt'
-#output_file_path = 'prepare_tokens/tokens/test_elision_output.txt'
 
-process_file(input_file_path, output_file_path)
\ No newline at end of file
+if __name__ == '__main__':
+    input_file_path = 'prepare_tokens/tokens/tragedies_300595.txt'  # Your input file path
+    output_file_path = 'prepare_tokens/tokens/tragedies_300595_fix_elision_hyphen.txt'  # Your output file path
+    #input_file_path = 'prepare_tokens/tokens/test_elision.txt'
+    #output_file_path = 'prepare_tokens/tokens/test_elision_output.txt'
+    process_file(input_file_path, output_file_path)
@@ -22,11 +22,12 @@ def normalize_delimiters(input_file_path, output_file_path):
     
     return lines_processed, replacements_made
 
-# Paths to your input and output files
-input_file_path = 'prepare_tokens/tokens/tokens_alph.txt'
-output_file_path = 'prepare_tokens/tokens/tokens_alph_delimiters.txt'
+if __name__ == '__main__':
+    # Paths to your input and output files
+    input_file_path = 'prepare_tokens/tokens/tokens_alph.txt'
+    output_file_path = 'prepare_tokens/tokens/tokens_alph_delimiters.txt'
 
-lines_processed, replacements_made = normalize_delimiters(input_file_path, output_file_path)
+    lines_processed, replacements_made = normalize_delimiters(input_file_path, output_file_path)
 
-print(f"Total lines processed: {lines_processed}")
-print(f"Total replacements made: {replacements_made}")
+    print(f"Total lines processed: {lines_processed}")
+    print(f"Total replacements made: {replacements_made}")
@@ -25,9 +25,6 @@ from tqdm import tqdm
 from utils import Colors, with_spiritus
 
 
-log_file_path = 'prepare_tokens/tokens.log'
-logging.basicConfig(filename=log_file_path, level=logging.INFO, format='%(message)s')
-
 all_consonants = r'[ΒΓΔΖΘΚΛΜΝΞΠΡΣΤΦΧΨβγδζθκλμνξπρστφχψ]' # except final sigma
 
 # Define the patterns to match final sigma at non-final positions
@@ -79,6 +76,8 @@ def split_tokens_with_wrong_sigma(input_file_path, output_file_path):
     print(f"{Colors.RED}Buggy lines printed: {count_buggy_lines_printed}{Colors.ENDC}")
 
 if __name__ == "__main__":
+    log_file_path = 'prepare_tokens/tokens.log'
+    logging.basicConfig(filename=log_file_path, level=logging.INFO, format='%(message)s')
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     input_file_path = 'prepare_tokens/tokens/tokens.txt'
     output_file_path = 'tokens_wrong_sigma.txt'
@@ -282,41 +282,6 @@ def filter_dichrona(input_file_path):
     return output_lines, filtered_out_lines
 
 
-# Example diphthongs
-print(is_diphthong("αὐ"))  # Should return True if matching diphth_y pattern
-print(is_diphthong("εἰ"))  # Should return True if matching diphth_i pattern
-print(is_diphthong("ασ"))  # Expected False, not a diphthong pattern
-print(is_diphthong("ἄι"))  # Expected False, not a diphthong pattern
-
-# Example iotas
-print(has_iota_subscriptum("ᾳ"))  # Expected True for subscript iota
-print(has_iota_adscriptum("ἀι"))  # Expected True for adscript iota
-print(has_iota_subscriptum("α"))  # Expected False, no iota
-print(has_iota_adscriptum("αἰ"))  # Expected False
-
-print(f'Examples of is_necessary:')
-print(word_with_real_dichrona("μακραί"))  # Return
-print(word_with_real_dichrona("ἐλύθη"))  # Return
-print(word_with_real_dichrona("αἰ"))  # None
-print(word_with_real_dichrona("ἀι"))  # None
-print(word_with_real_dichrona("νεφέλᾳ"))  # None
-
-print(ultima('πατρός')) # τρός, it sees muta cum liquida as single
-print(ultima('ποτιδέρκομαι')) #
-print(ultima('ὅττι')) # 
-print(ultima('τλὰς')) # 
-
-print(f'Example of properispomenon_with_dichronon_only_in_ultima:')
-print(properispomenon_with_dichronon_only_in_ultima('ἀπῦσαν')) # False (nonsense word)
-print(proparoxytone_with_dichronon_only_in_ultima('ἀπέπεπαν')) # False (nonsense word)
-print(properispomenon_with_dichronon_only_in_ultima('αὖθις')) # True!!! :)
-print(proparoxytone_with_dichronon_only_in_ultima('αἰπέπεπαν')) # True!!!
-
-#debug = proparoxytone_with_dichronon_only_in_ultima('α')
-#print(debug)
-
-#print(filter_dichrona('prepare_tokens/tokens/test_filter.txt', 'prepare_tokens/tokens/test_filter_output.txt', 'prepare_tokens/tokens/test_filter_filtered.txt'))
-
 from erics_syllabifier import syllabifier
 
 def properispomenon(word):
@@ -335,7 +300,6 @@ def properispomenon(word):
     else:
         return False
     
-print(properispomenon('ὗσον'))
 
 def proparoxytone(word):
     '''
@@ -353,4 +317,39 @@ def proparoxytone(word):
     else:
         return False
 
-print(proparoxytone('ποτιδέρκομαι'))
\ No newline at end of file
+
+if __name__ == '__main__':
+    # Example diphthongs
+    print(is_diphthong("αὐ"))  # Should return True if matching diphth_y pattern
+    print(is_diphthong("εἰ"))  # Should return True if matching diphth_i pattern
+    print(is_diphthong("ασ"))  # Expected False, not a diphthong pattern
+    print(is_diphthong("ἄι"))  # Expected False, not a diphthong pattern
+
+    # Example iotas
+    print(has_iota_subscriptum("ᾳ"))  # Expected True for subscript iota
+    print(has_iota_adscriptum("ἀι"))  # Expected True for adscript iota
+    print(has_iota_subscriptum("α"))  # Expected False, no iota
+    print(has_iota_adscriptum("αἰ"))  # Expected False
+
+    print(f'Examples of is_necessary:')
+    print(word_with_real_dichrona("μακραί"))  # Return
+    print(word_with_real_dichrona("ἐλύθη"))  # Return
+    print(word_with_real_dichrona("αἰ"))  # None
+    print(word_with_real_dichrona("ἀι"))  # None
+    print(word_with_real_dichrona("νεφέλᾳ"))  # None
+
+    print(ultima('πατρός')) # τρός, it sees muta cum liquida as single
+    print(ultima('ποτιδέρκομαι')) #
+    print(ultima('ὅττι')) # 
+    print(ultima('τλὰς')) # 
+
+    print(f'Example of properispomenon_with_dichronon_only_in_ultima:')
+    print(properispomenon_with_dichronon_only_in_ultima('ἀπῦσαν')) # False (nonsense word)
+    print(proparoxytone_with_dichronon_only_in_ultima('ἀπέπεπαν')) # False (nonsense word)
+    print(properispomenon_with_dichronon_only_in_ultima('αὖθις')) # True!!! :)
+    print(proparoxytone_with_dichronon_only_in_ultima('αἰπέπεπαν')) # True!!!
+
+    #debug = proparoxytone_with_dichronon_only_in_ultima('α')
+    #print(debug)
+
+    #print(filter_dichrona('prepare_tokens/tokens/test_filter.txt', 'prepare_tokens/tokens/test_filter_output.txt', 'prepare_tokens/tokens/test_filter_filtered.txt'))
@@ -1,7 +1,3 @@
-import normalize
-
-normalize.normalize_columns('prepare_tokens/tokens/test_norm.txt', 'prepare_tokens/tokens/test_.txt')
-
 TONOS_OXIA_PLUS_DIALYTIKA = {
     '\u03ac': '\u1f71', # ά
     '\u03ad': '\u1f73', # έ
@@ -39,16 +35,19 @@ def tonos_oxia_converter(text, reverse=False):
 #test_text = "άέήίόύώΐΰ"
 #tonos_oxia_converter(test_text)
 
-# Create a test string using the left-hand entries (keys) of the dictionary
-test_string = ''.join(TONOS_OXIA_PLUS_DIALYTIKA.keys())
 
-# Optionally, print the test string to verify its contents
-print("Test string with tonos characters:", test_string)
-print("Escape codes:", ' '.join(f"\\u{ord(c):04x}" for c in test_string))
+if __name__ == '__main__':
+    import normalize
 
-# Use the tonos_oxia_converter function to convert the test string
-converted_string = tonos_oxia_converter(test_string)
-print("Converted string with oxia characters:", converted_string)
+    normalize.normalize_columns('prepare_tokens/tokens/test_norm.txt', 'prepare_tokens/tokens/test_.txt')
 
+    # Create a test string using the left-hand entries (keys) of the dictionary
+    test_string = ''.join(TONOS_OXIA_PLUS_DIALYTIKA.keys())
 
+    # Optionally, print the test string to verify its contents
+    print("Test string with tonos characters:", test_string)
+    print("Escape codes:", ' '.join(f"\\u{ord(c):04x}" for c in test_string))
 
+    # Use the tonos_oxia_converter function to convert the test string
+    converted_string = tonos_oxia_converter(test_string)
+    print("Converted string with oxia characters:", converted_string)
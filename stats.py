@@ -4,9 +4,12 @@ Some tools to generate the stats needed for keeping track of progress (through t
 
 import csv
 import re
+import argparse
 
 from erics_syllabifier import syllabifier
 from utils import Colors, open_syllable, DICHRONA, base_alphabet, base
+from word_analysis import analyze
+from collate_macrons import parse_macrons
 
 # from macrons_alg3_prefix_as_set import macrons_alg3_prefix
 
@@ -16,13 +19,7 @@ def non_hidden_quantity(word):
     >>> non_hidden_quantity('δυστυχές')
     >>> ['τυ']
     '''
-    non_hidden_quantities = []
-    syllables = syllabifier(word)
-    if syllables:
-        for syllable in syllables:
-            if open_syllable(syllable) and any(char in DICHRONA for char in syllable):
-                non_hidden_quantities.append(syllable)
-    return non_hidden_quantities
+    return list(analyze(word).non_hidden_quantities)
 
 
 def extract_macron_positions(macron_column):
@@ -33,8 +30,7 @@ def extract_macron_positions(macron_column):
     >>> []
     '''
     # Extract integers from the macron column (_4^6 format)
-    pattern = re.compile(r'[_^](\d+)')
-    return [int(match.group(1)) for match in pattern.finditer(macron_column)]
+    return parse_macrons(macron_column).positions()
 
 #print(extract_macron_positions('_4^6'))
 #print(extract_macron_positions(''))
@@ -54,16 +50,14 @@ def macronized_non_hidden_dichrona(line):
     macron_positions = extract_macron_positions(columns[3])
     count = 0
 
-    for syllable in non_hidden_quantity(token):
+    wa = analyze(token)
+    for syllable in wa.non_hidden_quantities:
         syllable_start_index = token.find(syllable)
-        position_counter = 0
-        for index, char in enumerate(token):
-            if re.search(base_alphabet, base(char)):
-                position_counter += 1
-            if syllable_start_index <= index < syllable_start_index + len(syllable):
-                if char in DICHRONA and position_counter in macron_positions:
-                    count += 1
-                    break  # We only count this syllable once
+        # ordinals[index] is the position of the character in the macron column
+        for index in range(max(syllable_start_index, 0), min(syllable_start_index + len(syllable), len(token))):
+            if token[index] in DICHRONA and wa.ordinals[index] in macron_positions:
+                count += 1
+                break  # We only count this syllable once
 
     return count
 
@@ -167,7 +161,6 @@ def total_non_hidden_quantities_in_tsv(input_tsv):
 
 
 def count_macrons_in_tsv(input_tsv):
-    macron_pattern = re.compile(r'[\^_](\d{1,2})')  # Matches ^1 to ^99 or _1 to _99
     total_macrons = 0
 
     with open(input_tsv, mode='r', encoding='utf-8', newline='') as infile:
@@ -180,9 +173,7 @@ def count_macrons_in_tsv(input_tsv):
                 continue
 
             if row and len(row) >= 4:
-                macron_column = row[3]
-                macrons = macron_pattern.findall(macron_column)
-                total_macrons += len(macrons)
+                total_macrons += len(parse_macrons(row[3]))
 
     return total_macrons
 
@@ -205,10 +196,29 @@ def count_unique_first_column(input_tsv):
 
     return len(unique_values)
 
-#input_tsv = 'test_files/macrons_test.tsv'
-input_tsv = 'macrons_alg5_generalize_threads.tsv'
-#input_tsv = 'macrons_wiki_hypo_ifth_lsj.tsv'
-print(f'There are non-hidden dichrona: {total_non_hidden_quantities_in_tsv(input_tsv)}')
-print(f'out of which {Colors.GREEN}{macronized_non_hidden_dichrona_in_tsv(input_tsv)}{Colors.ENDC} are macronized.')
-print(f'Macrons: {count_macrons_in_tsv(input_tsv)}')
-print(f"Number of unique first column values: {count_unique_first_column(input_tsv)}")
+def print_stats(input_tsv):
+    print(f'There are non-hidden dichrona: {total_non_hidden_quantities_in_tsv(input_tsv)}')
+    print(f'out of which {Colors.GREEN}{macronized_non_hidden_dichrona_in_tsv(input_tsv)}{Colors.ENDC} are macronized.')
+    print(f'Macrons: {count_macrons_in_tsv(input_tsv)}')
+    print(f"Number of unique first column values: {count_unique_first_column(input_tsv)}")
+
+
+def write_stats(input_tsv, output_path):
+    '''
+    The same numbers as print_stats, written to a file (the stats stage of build.py).
+    '''
+    with open(output_path, 'w', encoding='utf-8') as outfile:
+        outfile.write(f'Non-hidden dichrona: {total_non_hidden_quantities_in_tsv(input_tsv)}\n')
+        outfile.write(f'Macronized non-hidden dichrona: {macronized_non_hidden_dichrona_in_tsv(input_tsv)}\n')
+        outfile.write(f'Macrons: {count_macrons_in_tsv(input_tsv)}\n')
+        outfile.write(f"Unique first column values: {count_unique_first_column(input_tsv)}\n")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Count the dichrona and macrons of a macron TSV.')
+    # e.g. test_files/macrons_test.tsv or macrons_wiki_hypo_ifth_lsj.tsv
+    parser.add_argument('input', nargs='?', default='macrons_alg5_generalize_threads.tsv', help='Macron TSV.')
+
+    args = parser.parse_args()
+
+    print_stats(args.input)
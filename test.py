@@ -30,8 +30,10 @@ def count_lacking_spiritus(tsv_file_path, output_file_path):
 
     return count
 
-# Example usage:
-tsv_file_path = 'crawl_wiktionary/macrons_wiktionary_nfc.tsv'
-output_file_path = 'crawl_wiktionary/macrons_wiktionary_no_spiritus.tsv'
-total_entries_lacking_spiritus = count_lacking_spiritus(tsv_file_path, output_file_path)
-print(f'Total entries lacking spiritus: {total_entries_lacking_spiritus}')
\ No newline at end of file
+
+if __name__ == '__main__':
+    # Example usage:
+    tsv_file_path = 'crawl_wiktionary/macrons_wiktionary_nfc.tsv'
+    output_file_path = 'crawl_wiktionary/macrons_wiktionary_no_spiritus.tsv'
+    total_entries_lacking_spiritus = count_lacking_spiritus(tsv_file_path, output_file_path)
+    print(f'Total entries lacking spiritus: {total_entries_lacking_spiritus}')
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the modules of the repository are imported from its root, as the scripts do when run from there
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
@@ -0,0 +1,113 @@
+'''
+Crawler against a stub HTTP server (http.server) serving the pages of tests/fixtures/crawler.
+Paths under /unavailable/ answer 503 with Retry-After to their first requests, and every answer can be delayed,
+so that retries, the cache and the concurrency of fetch_many can be checked without a network.
+'''
+
+import os
+import time
+import threading
+from collections import Counter
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+from crawler import Crawler
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'crawler')
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests[self.path] += 1
+            count = server.requests[self.path]
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delays.get(self.path, server.delay))
+            if self.path.startswith('/unavailable/') and count <= server.failures:
+                self.send_response(503)
+                self.send_header('Retry-After', str(server.retry_after))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.path = self.path.replace('/unavailable/', '/', 1)
+            super().do_GET()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(FixtureHandler, directory=FIXTURES))
+    server.lock = threading.Lock()
+    server.requests = Counter()
+    server.in_flight = server.max_in_flight = 0
+    server.delay = 0
+    server.delays = {}
+    server.failures = 2
+    server.retry_after = 1
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_retries_503_after_retry_after(server, tmp_path):
+    crawler = Crawler(cache_dir=str(tmp_path), max_retries=3, backoff=0.01)
+    start = time.monotonic()
+    status, html = crawler.fetch(f"{server.base_url}/unavailable/alpha.html")
+    elapsed = time.monotonic() - start
+
+    assert status == 200 and '<h1>alpha</h1>' in html
+    assert server.requests['/unavailable/alpha.html'] == 3
+    assert crawler.stats['retried'] == 2
+    # the backoff of 0.01s is overridden by Retry-After: 1 on each of the two retries
+    assert elapsed >= 2 * server.retry_after
+
+
+def test_gives_up_after_max_retries(server, tmp_path):
+    server.retry_after = 0
+    crawler = Crawler(cache_dir=str(tmp_path), max_retries=1, backoff=0.01)
+    assert crawler.fetch(f"{server.base_url}/unavailable/beta.html") == (None, '')
+    assert crawler.stats['failed'] == 1
+    # a failure is not cached, so the next crawl asks again and gets the page
+    assert crawler.fetch(f"{server.base_url}/unavailable/beta.html")[0] == 200
+
+
+def test_cache_is_reused_without_request(server, tmp_path):
+    url = f"{server.base_url}/gamma.html"
+    first = Crawler(cache_dir=str(tmp_path)).fetch(url)
+    missing = Crawler(cache_dir=str(tmp_path)).fetch(f"{server.base_url}/missing.html")
+
+    second_crawler = Crawler(cache_dir=str(tmp_path))
+    assert second_crawler.fetch(url) == first
+    assert second_crawler.fetch(f"{server.base_url}/missing.html") == missing
+    assert missing[0] == 404  # a 404 is an answer, and cached too
+    assert server.requests['/gamma.html'] == 1
+    assert server.requests['/missing.html'] == 1
+    assert second_crawler.stats == {'cached': 2, 'fetched': 0, 'retried': 0, 'failed': 0}
+
+
+def test_fetch_many_in_order_with_bounded_concurrency(server, tmp_path):
+    names = ['alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta']
+    urls = [f"{server.base_url}/{name}.html" for name in names]
+    server.delay = 0.05
+    server.delays = {'/alpha.html': 0.3}  # the first answer comes last
+
+    crawler = Crawler(cache_dir=str(tmp_path), max_workers=2)
+    results = list(crawler.fetch_many(iter(urls)))
+
+    assert [url for url, status, html in results] == urls
+    assert all(f"<h1>{name}</h1>" in html for name, (url, status, html) in zip(names, results))
+    assert server.max_in_flight == 2
+    assert sum(server.requests.values()) == len(urls)
@@ -0,0 +1,72 @@
+'''
+The tag views of MacronTable (tag_rows, rows_with_tag) and RuleSet.apply, which visits only the rows they select.
+'''
+
+import pytest
+
+from collate_macrons import parse_macrons
+from macron_rules import Rule, RuleSet, last_vowel
+from macron_table import MacronTable
+from pos_tags import tag_mask
+
+ROWS = [
+    ['χώρᾳ', 'n-s---fd-', 'χώρα', '', 'wiktionary'],
+    ['λέγω', 'v1spia---', 'λέγω', '', 'wiktionary'],
+    ['θεᾷ', 'n-s---fd-', 'θεά', '', 'lsj'],
+    ['καλῷ', 'a-s---md-', 'καλός', '', 'lsj'],
+    ['χώραν', 'n-s---fa-', 'χώρα', '_2', 'wiktionary'],
+    ['ἀεί', '', '', '', ''],
+]
+
+
+@pytest.fixture
+def table():
+    return MacronTable.from_rows([list(row) for row in ROWS], header=['token', 'tag', 'lemma', 'macron', 'source'])
+
+
+def test_tag_rows_by_tag_id(table):
+    rows_by_tag = {table.tags.values[tag_id]: list(rows) for tag_id, rows in enumerate(table.tag_rows())}
+    assert rows_by_tag == {'n-s---fd-': [0, 2], 'v1spia---': [1], 'a-s---md-': [3], 'n-s---fa-': [4], '': [5]}
+
+
+@pytest.mark.parametrize('predicate', [
+    tag_mask(part_of_speech='na', case='d'),
+    r'^[na]......d.$',
+    lambda tag: tag[-2:-1] == 'd',
+])
+def test_rows_with_tag(table, predicate):
+    assert table.rows_with_tag(predicate) == [0, 2, 3]
+
+
+def test_rows_with_tag_after_retain(table):
+    assert table.rows_with_tag(tag_mask(part_of_speech='n')) == [0, 2, 4]
+    table.retain([1, 2, 4])
+    assert table.rows_with_tag(tag_mask(part_of_speech='n')) == [1, 2]
+
+
+def test_invalid_tags_match_no_mask(table):
+    assert 5 not in table.rows_with_tag(tag_mask())
+    assert table.rows_with_tag(lambda tag: not tag) == [5]
+
+
+def test_rule_set_applies_to_selected_rows_only(table):
+    long_dative = Rule('long_dative', 'test', '_', last_vowel, tags=tag_mask(part_of_speech='n', case='d'))
+    rules = RuleSet([long_dative])
+    assert [rules.applies_to(tag) for tag in ('n-s---fd-', 'a-s---md-', '')] == [True, False, False]
+
+    hits = rules.apply(table)
+
+    assert hits == {'long_dative': 2}
+    assert table.row(0)[3:] == [parse_macrons('_4'), 'wiktionary,test']
+    assert table.row(2)[3:] == [parse_macrons('_3'), 'lsj,test']
+    assert [table.row(i)[3:] for i in (1, 3, 4)] == [
+        [parse_macrons(''), 'wiktionary'], [parse_macrons(''), 'lsj'], [parse_macrons('_2'), 'wiktionary']]
+
+
+def test_macrons_beyond_64_bits():
+    table = MacronTable.from_rows([['α', '', '', '_2'], ['β', '', '', '^70']])
+    assert table.macrons(1) == parse_macrons('^70')
+    table.retain([0])
+    table.set_macrons(0, parse_macrons('_2_64'))
+    assert str(table.macrons(0)) == '_2_64'
+    assert table.row(0)[3] == parse_macrons('_2_64')
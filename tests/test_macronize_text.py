@@ -0,0 +1,47 @@
+import unicodedata
+
+import pytest
+
+from macronize_text import MacronIndex, split_affixes
+
+ROWS = [
+    ['ψυχή', 'n-s---fn-', 'ψυχή', '_2', 'wiktionary'],
+    ['ἄγε', 'v2spma---', 'ἄγω', '^1', 'hypotactic'],
+]
+
+
+@pytest.fixture
+def index():
+    return MacronIndex(ROWS)
+
+
+def test_nfc_token(index):
+    assert index.macronize_text('ψυχή') == 'ψῡχή'
+
+
+def test_nfd_text_is_macronized(index):
+    nfd = unicodedata.normalize('NFD', 'ὦ ψυχή')
+    assert index.macronize_text(nfd) == unicodedata.normalize('NFD', 'ὦ ') + 'ψῡχή'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('(ψυχή)', '(ψῡχή)'),
+    ('«ψυχή»', '«ψῡχή»'),
+    ('ψυχή:', 'ψῡχή:'),
+    ('ψυχή!', 'ψῡχή!'),
+    ('‘ψυχή’', '‘ψῡχή’'),
+    ('ψυχή, ψυχή.', 'ψῡχή, ψῡχή.'),
+])
+def test_punctuation_around_token(index, text, expected):
+    assert index.macronize_text(text) == expected
+
+
+def test_unknown_token_is_unchanged(index):
+    text = unicodedata.normalize('NFD', '(λόγος)')
+    assert index.macronize_text(text) == text
+
+
+def test_split_affixes_keeps_elision():
+    assert split_affixes('«ἄγ’»') == ('«', 'ἄγ’', '»')
+    assert split_affixes('ψυχή!') == ('', 'ψυχή', '!')
+    assert split_affixes('—') == ('—', '', '')
@@ -58,7 +58,8 @@ def elided_tokens(input_file_path, output_file_path):
     print(f"{Colors.GREEN}Lines ending with incorrect final consonants: {incorrect_consonant_count}{Colors.ENDC}")
 
 
-# Usage
-input_file_path = 'prepare_tokens/tokens/tragedies_300595_fix_elision_hyphen_manualfix.txt'  # Update this to your actual input file path
-output_file_path = 'tokens_elided.txt'  # The path where you want to save the filtered lines
-elided_tokens(input_file_path, output_file_path)
+if __name__ == '__main__':
+    # Usage
+    input_file_path = 'prepare_tokens/tokens/tragedies_300595_fix_elision_hyphen_manualfix.txt'  # Update this to your actual input file path
+    output_file_path = 'tokens_elided.txt'  # The path where you want to save the filtered lines
+    elided_tokens(input_file_path, output_file_path)
@@ -5,10 +5,11 @@ Classes, sets and constants for use in many scripts
 '''
 
 import re
-from pyuca import Collator
+from functools import lru_cache
 from greek_accentuation.characters import base
 
 from erics_syllabifier import syllabifier
+from greek_characters import only_bases_table
 
 class Colors:
     GREEN = '\033[1;32m'  # Green
@@ -33,9 +34,12 @@ base_alphabet = r'[ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩαβγδεζ
 def only_bases(word):
     '''
     E.g. ᾰ̓ᾱ́ᾰτᾰ returns ααατα.
-    Dependencies: greek_accentuation.characters.base and re
+    A single str.translate with the table of /greek_characters.py, which maps every character whose base is in base_alphabet to that base.
+    Given a list of syllables, it returns the bases of their first characters, as it always has (cf. algorithm5_generalize_threads.cognate_key).
     '''
-    return ''.join([base(char) for char in word if re.search(base_alphabet, base(char))])
+    if isinstance(word, str):
+        return word.translate(only_bases_table)
+    return ''.join([item[:1].translate(only_bases_table) for item in word])
 
 
 def initial_base(word):
@@ -48,11 +52,27 @@ def initial_base(word):
     return base(word[0]) + word[1:]
 
 
-def sort_polytonic_string(input_string):
-    c = Collator()
+@lru_cache(maxsize=None)
+def get_collator():
+    '''
+    The one pyuca Collator, built on first use (building one parses the whole allkeys table).
+    pyuca is imported here rather than at the top, so that importing utils stays cheap.
+    '''
+    from pyuca import Collator
+    return Collator()
 
+
+@lru_cache(maxsize=1 << 17)
+def sort_key(string):
+    '''
+    pyuca sort key of a string, memoized, since the same lemmata and tokens are sorted again and again.
+    '''
+    return get_collator().sort_key(string)
+
+
+def sort_polytonic_string(input_string):
     characters = list(input_string)
-    sorted_characters = sorted(characters, key=lambda char: c.sort_key(char))
+    sorted_characters = sorted(characters, key=sort_key)
     sorted_string = ''.join(sorted_characters)
 
     return sorted_string
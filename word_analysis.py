@@ -0,0 +1,175 @@
+'''
+/word_analysis.py
+
+Everything the algorithms need to know about a token, computed once per token.
+
+The same token used to be syllabified and re-scanned by filter_dichrona.ultima, properispomenon, proparoxytone,
+algorithm1_accentual_rules.word_with_real_dichrona, ordinal_last_vowel and stats.non_hidden_quantity,
+each from scratch. analyze(token) builds a WordAnalysis once and caches it, so that all algorithm stages
+and the stats share the work:
+
+>> wa = analyze('ἀγάλματα')
+>> wa.syllables
+>> ('ἀ', 'γάλ', 'μα', 'τα')
+>> wa.spans
+>> ((0, 1), (1, 4), (4, 6), (6, 8))
+>> wa.ordinals
+>> (1, 2, 3, 4, 5, 6, 7, 8)
+>> wa.proparoxytone, wa.properispomenon
+>> (True, False)
+>> wa.real_dichrona
+>> (0, 2, 5, 7)
+>> wa.last_vowel_ordinal
+>> 8
+
+'''
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from utils import DICHRONA, only_bases, all_vowels, open_syllable
+from erics_syllabifier import patterns, syllabifier, preprocess_text
+from greek_characters import base_letter_chars
+
+# same classes as the local ones in prepare_tokens/filter_dichrona.py
+circumflexes = r'[ᾶῆῖῦῶἇἆἦἧἶἷὖὗὦὧἦἧἆἇὧὦᾆᾇᾷᾖᾗᾦᾧῷῇ]'
+acutes = r'[άέήόίύώἄἅἔἕὄὅἤἥἴἵὔὕὤὥΐΰᾄᾅᾴᾔᾕῄᾤᾥῴ]'
+
+circumflex_pattern = re.compile(circumflexes)
+acute_pattern = re.compile(acutes)
+vowel_pattern = re.compile(all_vowels)
+
+# a pair of characters that is a diphthong or has an iota adscriptum, i.e. hides the quantity of a dichronon
+hiding_pair_pattern = re.compile('|'.join(f"(?:{patterns[pattern]})" for pattern in ['diphth_y', 'diphth_i', 'adscr_i']))
+
+
+@lru_cache(maxsize=65536)
+def real_dichrona_positions(s):
+    '''
+    Indices of the characters in s that are in DICHRONA and neither form a diphthong
+    nor have an adscriptum together with a neighbouring character.
+    word_with_real_dichrona(s) is simply bool(real_dichrona_positions(s)).
+    >> real_dichrona_positions('παιδεία')
+    >> (6,)
+    '''
+    positions = []
+    for i, char in enumerate(s):
+        if char in DICHRONA:
+
+            # Form pairs to check for diphthongs and adscriptum
+            prev_pair = s[i-1:i+1] if i > 0 else ''
+            next_pair = s[i:i+2] if i < len(s) - 1 else ''
+
+            if (prev_pair and hiding_pair_pattern.match(prev_pair)) or \
+               (next_pair and hiding_pair_pattern.match(next_pair)):
+                continue
+
+            positions.append(i)
+
+    return tuple(positions)
+
+
+def syllable_spans(token, syllables):
+    '''
+    The (start, end) indices in the token of each syllable.
+    The syllabifier lowercases the token and drops punctuation and elision marks,
+    so the syllables are mapped back through the indices of the characters it kept.
+    Returns None if they cannot be aligned (e.g. because of unclassified characters).
+    '''
+    kept = [i for i, char in enumerate(token) if preprocess_text(char)]
+    if ''.join(syllables) != preprocess_text(token) or len(kept) != sum(len(syllable) for syllable in syllables):
+        return None
+
+    spans = []
+    start = 0
+    for syllable in syllables:
+        end = start + len(syllable)
+        spans.append((kept[start], kept[end - 1] + 1))
+        start = end
+    return tuple(spans)
+
+
+def base_ordinals(token):
+    '''
+    For each character of the token, the ordinal (counting from 1) of the last base letter up to and including it.
+    This is the numbering used in the macron column, so a dichronon at index i is written e.g. _{ordinals[i]}.
+    '''
+    ordinals = []
+    counter = 0
+    for char in token:
+        if char in base_letter_chars:
+            counter += 1
+        ordinals.append(counter)
+    return tuple(ordinals)
+
+
+def last_vowel_ordinal(token, bases):
+    '''
+    See algorithm1_accentual_rules.ordinal_last_vowel, which this is the cached version of.
+    NB: like the original, this counts down one per character, base letter or not.
+    '''
+    ordinal = len(bases)
+    for char in reversed(token):
+        if vowel_pattern.search(char):
+            return ordinal
+        ordinal -= 1
+    return None
+
+
+@dataclass(frozen=True)
+class WordAnalysis:
+    token: str
+    syllables: tuple
+    spans: tuple                  # (start, end) of each syllable in the token, or None
+    bases: str                    # only_bases(token)
+    ordinals: tuple               # base-letter ordinal of each character in the token
+    properispomenon: bool
+    proparoxytone: bool
+    real_dichrona: tuple          # indices of real dichrona in the token
+    ultima_real_dichrona: bool    # whether the ultima, taken on its own, has a real dichronon
+    last_vowel_ordinal: int
+    non_hidden_quantities: tuple  # open syllables with dichrona
+
+    @property
+    def ultima(self):
+        return self.syllables[-1]
+
+    @property
+    def accent_class(self):
+        if self.properispomenon:
+            return 'properispomenon'
+        if self.proparoxytone:
+            return 'proparoxytone'
+        return None
+
+
+@lru_cache(maxsize=65536)
+def analyze(token):
+    '''
+    Builds (once per token) the WordAnalysis shared by the algorithms and the stats.
+    '''
+    syllables = tuple(syllabifier(token))
+    bases = only_bases(token)
+
+    properispomenon = len(syllables) >= 2 and bool(circumflex_pattern.search(syllables[-2]))
+    proparoxytone = len(syllables) >= 3 and bool(acute_pattern.search(syllables[-3]))
+
+    non_hidden_quantities = tuple(
+        syllable for syllable in syllables
+        if open_syllable(syllable) and any(char in DICHRONA for char in syllable)
+    )
+
+    return WordAnalysis(
+        token=token,
+        syllables=syllables,
+        spans=syllable_spans(token, syllables),
+        bases=bases,
+        ordinals=base_ordinals(token),
+        properispomenon=properispomenon,
+        proparoxytone=proparoxytone,
+        real_dichrona=real_dichrona_positions(token),
+        ultima_real_dichrona=bool(syllables) and bool(real_dichrona_positions(syllables[-1])),
+        last_vowel_ordinal=last_vowel_ordinal(token, bases),
+        non_hidden_quantities=non_hidden_quantities,
+    )